@@ -1,5 +1,20 @@
-from django.contrib import admin
-from .models import Appointment, Owner, Pet, Veterinarian, MedicalRecord, Billing, User
+from django.contrib import admin, messages
+from .models import (
+    Appointment, Owner, Pet, Species, Veterinarian, MedicalRecord, Billing, User, AppointmentStatus, PaymentStatus,
+)
+from .transitions import apply_transition
+
+
+class TransitionActionsMixin:
+    """Admin actions moving the selected rows to a status with one UPDATE, by the transition table."""
+
+    def transition(self, request, queryset, status):
+        result = apply_transition(queryset, status)
+        noun = self.model._meta.verbose_name_plural
+        self.message_user(request, f"{result.updated} {noun} marked {status.label}.", messages.SUCCESS)
+        if result.skipped:
+            self.message_user(request, f"{result.skipped} {noun} were left unchanged: their status cannot change "
+                                       f"to {status.label}.", messages.WARNING)
 
 
 @admin.register(Owner)
@@ -8,6 +23,12 @@ class OwnerAdmin(admin.ModelAdmin):
     search_fields = ('first_name', 'last_name', 'email')
 
 
+@admin.register(Species)
+class SpeciesAdmin(admin.ModelAdmin):
+    list_display = ('species_id', 'name')
+    search_fields = ('name',)
+
+
 @admin.register(Pet)
 class PetAdmin(admin.ModelAdmin):
     list_display = ('pet_id', 'name', 'owner', 'species', 'breed', 'date_of_birth')
@@ -22,10 +43,23 @@ class VeterinarianAdmin(admin.ModelAdmin):
 
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(TransitionActionsMixin, admin.ModelAdmin):
     list_display = ('appointment_id', 'pet', 'owner', 'vet', 'appointment_date', 'status')
     list_filter = ('status', 'appointment_date')
     search_fields = ('pet__name', 'owner__first_name', 'owner__last_name')
+    actions = ['mark_completed', 'mark_cancelled', 'mark_scheduled']
+
+    @admin.action(description="Mark selected appointments as completed")
+    def mark_completed(self, request, queryset):
+        self.transition(request, queryset, AppointmentStatus.COMPLETED)
+
+    @admin.action(description="Mark selected appointments as cancelled")
+    def mark_cancelled(self, request, queryset):
+        self.transition(request, queryset, AppointmentStatus.CANCELLED)
+
+    @admin.action(description="Reschedule selected cancelled appointments")
+    def mark_scheduled(self, request, queryset):
+        self.transition(request, queryset, AppointmentStatus.SCHEDULED)
 
 
 @admin.register(MedicalRecord)
@@ -36,10 +70,19 @@ class MedicalRecordAdmin(admin.ModelAdmin):
 
 
 @admin.register(Billing)
-class BillingAdmin(admin.ModelAdmin):
+class BillingAdmin(TransitionActionsMixin, admin.ModelAdmin):
     list_display = ('bill_id', 'appointment', 'total_amount', 'payment_status', 'payment_date')
     list_filter = ('payment_status', 'payment_date')
-    search_fields = ('appointment__pet__name', 'payment_status')
+    search_fields = ('appointment__pet__name',)
+    actions = ['mark_paid', 'mark_overdue']
+
+    @admin.action(description="Mark selected bills as paid")
+    def mark_paid(self, request, queryset):
+        self.transition(request, queryset, PaymentStatus.PAID)
+
+    @admin.action(description="Mark selected bills as overdue")
+    def mark_overdue(self, request, queryset):
+        self.transition(request, queryset, PaymentStatus.OVERDUE)
 
 
 @admin.register(User)
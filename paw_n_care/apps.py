@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PawNCareConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'paw_n_care'
+
+    def ready(self):
+        # Connect the signal receivers that maintain the derived tables
+        from paw_n_care import signals  # noqa: F401
+        # Connect the SQLite tuning of new connections
+        from paw_n_care import sqlite  # noqa: F401
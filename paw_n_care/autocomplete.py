@@ -0,0 +1,86 @@
+"""Prefix lookups behind the typeahead fields of the appointment, medical record and billing forms.
+
+Names are matched on the indexed ``search_name`` columns with a range
+condition (``>= prefix`` and ``< prefix + U+10FFFF``) rather than ``LIKE``,
+so SQLite can answer them from the index whatever the case sensitivity of
+``LIKE``. Only ``limit`` rows are ever read.
+"""
+from typing import Any, Callable, Dict, List
+
+from django.db.models import Q
+
+from paw_n_care.models import Appointment, Owner, Pet, Veterinarian
+from paw_n_care.utils import normalize_name
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+
+
+def prefix_filter(field: str, prefix: str) -> Q:
+    """Return the index-friendly condition matching the values of ``field`` that start with ``prefix``."""
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + '\U0010ffff'})
+
+
+def _id_filter(field: str, query: str) -> Q:
+    """Return the condition matching ``field`` to ``query`` when it is a number, or nothing."""
+    return Q(**{field: int(query)}) if query.isdigit() else Q(pk__in=[])
+
+
+def pet_results(query: str, limit: int) -> List[Dict[str, Any]]:
+    pets = Pet.objects.filter(prefix_filter('search_name', normalize_name(query)) | _id_filter('pet_id', query)) \
+        .values('pet_id', 'name', 'owner__first_name') \
+        .order_by('search_name', 'pet_id')[:limit]
+    return [{'id': pet['pet_id'],
+             'label': f"{pet['name']} | owner: {pet['owner__first_name']} (Pet ID: {pet['pet_id']})"}
+            for pet in pets]
+
+
+def owner_results(query: str, limit: int) -> List[Dict[str, Any]]:
+    owners = Owner.objects.filter(prefix_filter('search_name', normalize_name(query)) | _id_filter('owner_id', query)) \
+        .values('owner_id', 'first_name', 'last_name') \
+        .order_by('search_name', 'owner_id')[:limit]
+    return [{'id': owner['owner_id'],
+             'label': f"{owner['first_name']} {owner['last_name']} (Owner ID: {owner['owner_id']})"}
+            for owner in owners]
+
+
+def vet_results(query: str, limit: int) -> List[Dict[str, Any]]:
+    vets = Veterinarian.objects.filter(prefix_filter('search_name', normalize_name(query)) | _id_filter('vet_id', query)) \
+        .values('vet_id', 'first_name', 'last_name') \
+        .order_by('search_name', 'vet_id')[:limit]
+    return [{'id': vet['vet_id'],
+             'label': f"Dr.{vet['first_name']} {vet['last_name']} (Vet ID: {vet['vet_id']})"}
+            for vet in vets]
+
+
+def appointment_results(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Match appointments on their ID or on the name of their pet, most recent first."""
+    pet_ids = Pet.objects.filter(prefix_filter('search_name', normalize_name(query))).values('pet_id')
+    appointments = Appointment.objects.filter(
+        Q(pet_id__in=pet_ids) | _id_filter('appointment_id', query)
+    ).values('appointment_id', 'pet__name', 'vet__first_name') \
+        .order_by('-appointment_date', '-appointment_id')[:limit]
+    return [{'id': appointment['appointment_id'],
+             'label': f"Appointment ID: {appointment['appointment_id']} | {appointment['pet__name']} "
+                      f"by Dr.{appointment['vet__first_name']}"}
+            for appointment in appointments]
+
+
+AUTOCOMPLETE_SOURCES: Dict[str, Callable[[str, int], List[Dict[str, Any]]]] = {
+    'pets': pet_results,
+    'owners': owner_results,
+    'vets': vet_results,
+    'appointments': appointment_results,
+}
+
+
+def autocomplete(source: str, query: str, limit: Any = None) -> List[Dict[str, Any]]:
+    """Return at most ``limit`` ``{'id', 'label'}`` suggestions of ``source`` for ``query``."""
+    query = query.strip()
+    if not query:
+        return []
+    try:
+        limit = min(max(int(limit), 1), MAX_LIMIT)
+    except (TypeError, ValueError):
+        limit = DEFAULT_LIMIT
+    return AUTOCOMPLETE_SOURCES[source](query, limit)
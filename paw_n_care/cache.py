@@ -0,0 +1,94 @@
+"""Versioned cache of search result pages.
+
+Each model has a version counter stored in the cache. The key of a cached
+page includes the versions of every model its search configuration reads, so
+bumping a counter on save or delete makes all the affected pages unreachable
+instead of deleting them one by one. Versions start from the current time in
+milliseconds, so a counter evicted from the cache never comes back with a
+value that was already used.
+
+Pages read from a replica are cached apart from the primary's, and only for
+``settings.REPLICA_STICKY_SECONDS``: the replica may still be behind the
+version a page is stored under.
+"""
+import hashlib
+import time
+from typing import Any, Callable, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+
+from paw_n_care.pagination import KeysetPage, paginate
+
+SEARCH_CACHE_TIMEOUT = 60 * 15
+
+
+def _version_key(model) -> str:
+    return f'paw_n_care:version:{model._meta.label_lower}'
+
+
+def model_version(model) -> int:
+    """Return the current version counter of ``model``."""
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_model_version(model):
+    """Invalidate every cached page that reads ``model``.
+
+    The counter is bumped immediately, so the current transaction sees its own
+    writes, and again after commit, so a page computed by another request from
+    the data before the commit is not stored under the new version.
+    """
+    _bump(model)
+    transaction.on_commit(lambda: _bump(model))
+
+
+def _bump(model):
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def searched_models(search_config: Dict[str, Any]) -> List[Any]:
+    """Return the model of a search configuration and every model reached by its field paths."""
+    root = search_config['model']
+    models = {root._meta.label_lower: root}
+    paths = (search_config['all_fields'] + search_config['values_fields']
+             + list(search_config['field_mappings'].values()))
+    for path in paths:
+        model = root
+        for name in path.split('__')[:-1]:
+            model = model._meta.get_field(name).related_model
+            models[model._meta.label_lower] = model
+    return [models[label] for label in sorted(models)]
+
+
+def search_cache_key(search_config: Dict[str, Any], search_category: str, search_query: str,
+                     sort: str, cursor: str, database: str = DEFAULT_DB_ALIAS) -> str:
+    """Return the cache key of one search page read from ``database`` under the current model versions."""
+    versions = '.'.join(str(model_version(model)) for model in searched_models(search_config))
+    normalized_query = search_query.strip().lower()
+    digest = hashlib.md5('\0'.join([search_category, normalized_query, sort, cursor]).encode()).hexdigest()
+    return f"paw_n_care:search:{database}:{search_config['model']._meta.label_lower}:{versions}:{digest}"
+
+
+def cached_search_page(request, search_config: Dict[str, Any], search_category: str, search_query: str,
+                       build_queryset: Callable[[], Any]) -> KeysetPage:
+    """Return the requested page of a search, computing it with ``build_queryset`` on a cache miss."""
+    database = router.db_for_read(search_config['model'])
+    key = search_cache_key(search_config, search_category, search_query,
+                           request.GET.get('sort', ''), request.GET.get('cursor', ''), database)
+    page = cache.get(key)
+    if page is None:
+        page = paginate(request, build_queryset(), search_config)
+        timeout = SEARCH_CACHE_TIMEOUT if database == DEFAULT_DB_ALIAS else settings.REPLICA_STICKY_SECONDS
+        cache.set(key, page, timeout)
+    return page
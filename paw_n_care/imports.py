@@ -0,0 +1,326 @@
+"""Bulk import of appointments from CSV, creating the missing owners and pets.
+
+Each CSV row describes one appointment together with its owner and pet.
+Owners are matched on their email address (case-insensitively) and then on
+their phone number, pets on their owner and normalized name. The rows that
+match nothing create the owner or pet, so the owner and pet columns are only
+required for them.
+
+Rows are read ``batch_size`` at a time: every batch looks up its owners, pets
+and vets with a few ``IN`` queries and inserts the new rows with
+``bulk_create``. Rows booking a vet already booked at that time, in the
+database or earlier in the file, are rejected. The whole file is imported in
+one transaction, and a row that cannot be imported is reported with its line
+number instead of aborting the others.
+"""
+import csv
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from paw_n_care import rollups, scheduling
+from paw_n_care.cache import bump_model_version
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, Gender, Owner, Pet, Species, Veterinarian, choice_value,
+)
+from paw_n_care.search import SEARCH_INDEXES
+from paw_n_care.utils import normalize_name
+
+IMPORT_BATCH_SIZE = 2000
+# Values per IN lookup, below the variable limit of every supported backend
+LOOKUP_CHUNK_SIZE = 500
+
+IMPORT_COLUMNS = [
+    'appointment_date', 'appointment_time', 'vet_id', 'reason', 'status',
+    'owner_email', 'owner_phone', 'owner_first_name', 'owner_last_name', 'owner_address',
+    'pet_name', 'species', 'breed', 'date_of_birth', 'gender', 'weight',
+]
+# Columns every file must have; the other owner and pet columns are needed to create new ones
+REQUIRED_COLUMNS = ['appointment_date', 'appointment_time', 'vet_id', 'reason', 'status', 'pet_name']
+
+
+class RowError(ValueError):
+    """A CSV row that cannot be imported."""
+
+
+@dataclass
+class ImportResult:
+    """Numbers of rows read and created by an import, and the rejected rows as ``(line, message)``."""
+    rows: int = 0
+    appointments: int = 0
+    owners: int = 0
+    pets: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def _clean(model, name: str, value, column: str):
+    """Convert ``value`` with the model field ``name`` and run its validators."""
+    try:
+        return model._meta.get_field(name).clean(value, None)
+    except ValidationError as error:
+        raise RowError(f"{column}: {' '.join(error.messages)}")
+
+
+def _choice(choices, value, column: str):
+    try:
+        return choice_value(choices, value)
+    except ValueError:
+        raise RowError(f"{column}: {value!r} is not one of {', '.join(choices.labels)}.")
+
+
+def _chunks(values: Iterable[Any], size: int = LOOKUP_CHUNK_SIZE):
+    values = iter(values)
+    while chunk := list(islice(values, size)):
+        yield chunk
+
+
+def parse_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Return the appointment values and owner and pet keys of a CSV row."""
+    row = {column: (value or '').strip() for column, value in row.items() if column}
+    email, phone = row.get('owner_email', '').lower(), ''.join(row.get('owner_phone', '').split())
+    if not email and not phone:
+        raise RowError("owner_email or owner_phone is required.")
+    try:
+        vet_id = int(row['vet_id'])
+    except ValueError:
+        raise RowError(f"vet_id: {row['vet_id']!r} is not a number.")
+    return {
+        'row': row,
+        'email': email,
+        'phone': phone,
+        'pet_key': normalize_name(row['pet_name']),
+        'vet_id': vet_id,
+        'appointment_date': _clean(Appointment, 'appointment_date', row['appointment_date'], 'appointment_date'),
+        'appointment_time': _clean(Appointment, 'appointment_time', row['appointment_time'], 'appointment_time'),
+        'reason': _clean(Appointment, 'reason', row['reason'], 'reason'),
+        'status': _choice(AppointmentStatus, row['status'], 'status'),
+    }
+
+
+class AppointmentImporter:
+    """Import CSV rows of appointments, creating the owners and pets they do not match."""
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.result = ImportResult()
+        self.vet_ids = set()
+        self.species = {}
+
+    def run(self, stream) -> ImportResult:
+        """Import the CSV file ``stream`` (text) and return the result.
+
+        Raises ``ValueError`` when the header lacks a required column.
+        """
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None:
+            raise ValueError("The file is empty.")
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}.")
+
+        rows = ((reader.line_num, row) for row in reader)
+        touched = {Owner: set(), Pet: set(), Appointment: set()}
+        with transaction.atomic():
+            while chunk := list(islice(rows, self.batch_size)):
+                for model, pks in self.import_batch(self.parse_batch(chunk)).items():
+                    touched[model] |= pks
+            for model, pks in touched.items():
+                SEARCH_INDEXES[model].refresh(pks)
+            # bulk_create bypasses the signals that invalidate the cached pages
+            if self.result.appointments:
+                changed = (Owner, Pet, Veterinarian, Appointment)
+            else:
+                changed = [model for model, count in ((Owner, self.result.owners), (Pet, self.result.pets)) if count]
+            for model in changed:
+                bump_model_version(model)
+        self.result.errors.sort()
+        return self.result
+
+    def parse_batch(self, rows) -> List[Tuple[int, Dict[str, Any]]]:
+        """Parse ``(line, row)`` pairs, recording the rows that cannot be read."""
+        batch = []
+        for line, row in rows:
+            self.result.rows += 1
+            try:
+                batch.append((line, parse_row(row)))
+            except RowError as error:
+                self.reject(line, error)
+        return batch
+
+    def reject(self, line: int, error: RowError):
+        self.result.errors.append((line, str(error)))
+
+    def import_batch(self, batch) -> Dict[Any, set]:
+        """Insert the owners, pets and appointments of one batch and return the touched primary keys."""
+        self.load_vets({values['vet_id'] for _, values in batch})
+        batch = [(line, values) for line, values in batch if self.check_vet(line, values)]
+        self.resolve_owners(batch)
+        batch = [(line, values) for line, values in batch if 'owner' in values]
+        self.resolve_pets(batch)
+        batch = [(line, values) for line, values in batch if 'pet' in values]
+        # Only the rows about to be inserted may take a slot from the later ones
+        batch = self.check_slots(batch)
+        owners, pets = self.create_owners_and_pets(batch)
+
+        appointments = Appointment.objects.bulk_create([
+            Appointment(
+                pet_id=values['pet'].pk, owner_id=values['pet'].owner_id, vet_id=values['vet_id'],
+                appointment_date=values['appointment_date'], appointment_time=values['appointment_time'],
+                reason=values['reason'], status=values['status'],
+            )
+            for _, values in batch
+        ], batch_size=self.batch_size)
+        self.result.appointments += len(appointments)
+        # The signals that maintain the rollups and counters do not run for bulk inserts
+        rollups.apply_contributions_in_bulk(
+            contribution for appointment in appointments
+            for contribution in rollups.appointment_contributions(appointment)
+        )
+        # Owner documents list the names of their pets
+        return {
+            Owner: {owner.pk for owner in owners} | {pet.owner_id for pet in pets},
+            Pet: {pet.pk for pet in pets},
+            Appointment: {appointment.pk for appointment in appointments},
+        }
+
+    def load_vets(self, vet_ids):
+        unknown = vet_ids - self.vet_ids
+        for chunk in _chunks(unknown):
+            self.vet_ids.update(Veterinarian.objects.filter(pk__in=chunk).values_list('pk', flat=True))
+
+    def check_vet(self, line, values) -> bool:
+        if values['vet_id'] in self.vet_ids:
+            return True
+        self.reject(line, RowError(f"vet_id: no veterinarian {values['vet_id']}."))
+        return False
+
+    def check_slots(self, batch) -> List[Tuple[int, Dict[str, Any]]]:
+        """Reject the rows booking a vet already booked then, by the database or an earlier row of the file."""
+        conflicts = scheduling.find_conflicts([
+            Appointment(vet_id=values['vet_id'], appointment_date=values['appointment_date'],
+                        appointment_time=values['appointment_time'], status=values['status'])
+            for _, values in batch
+        ])
+        for index in sorted(conflicts):
+            line, values = batch[index]
+            self.reject(line, RowError(
+                f"appointment_time: vet {values['vet_id']} is already booked within "
+                f"{settings.APPOINTMENT_DURATION_MINUTES} minutes of {values['appointment_time']:%H:%M}."))
+        return [row for index, row in enumerate(batch) if index not in conflicts]
+
+    def create_owners_and_pets(self, batch) -> Tuple[List[Owner], List[Pet]]:
+        """Insert the new owners and pets the rows of ``batch`` book for, and return them."""
+        owners = list({id(values['owner']): values['owner'] for _, values in batch
+                       if values['owner'].pk is None}.values())
+        pets = list({id(values['pet']): values['pet'] for _, values in batch if values['pet'].pk is None}.values())
+        Owner.objects.bulk_create(owners, batch_size=self.batch_size)
+        # The new pets of new owners take the keys the owners were just given
+        Pet.objects.bulk_create(pets, batch_size=self.batch_size)
+        self.result.owners += len(owners)
+        self.result.pets += len(pets)
+        return owners, pets
+
+    def resolve_owners(self, batch):
+        """Set ``values['owner']`` on the rows whose owner exists or can be built; new owners are not saved yet."""
+        known = {}
+        emails = {values['email'] for _, values in batch if values['email']}
+        phones = {values['phone'] for _, values in batch if values['phone']}
+        for chunk in _chunks(emails):
+            for owner in Owner.objects.annotate(email_key=Lower('email')).filter(email_key__in=chunk) \
+                    .only('owner_id').order_by('owner_id'):
+                known.setdefault(('email', owner.email_key), owner)
+        for chunk in _chunks(phones):
+            for owner in Owner.objects.filter(phone_number__in=chunk).only('owner_id', 'phone_number') \
+                    .order_by('owner_id'):
+                known.setdefault(('phone', owner.phone_number), owner)
+
+        for line, values in batch:
+            keys = [key for key in (('email', values['email']), ('phone', values['phone'])) if key[1]]
+            owner = next((known[key] for key in keys if key in known), None)
+            if owner is None:
+                try:
+                    # A new owner has only new pets, so a row with an invalid pet must not create its owner
+                    values['pet_fields'] = self.pet_fields(values)
+                    owner = self.build_owner(values)
+                except RowError as error:
+                    self.reject(line, error)
+                    continue
+            for key in keys:
+                # Later rows of the file find the owner by either its email or its phone
+                known.setdefault(key, owner)
+            values['owner'] = owner
+
+    @staticmethod
+    def build_owner(values) -> Owner:
+        row = values['row']
+        owner = Owner(
+            first_name=_clean(Owner, 'first_name', row.get('owner_first_name'), 'owner_first_name'),
+            last_name=_clean(Owner, 'last_name', row.get('owner_last_name'), 'owner_last_name'),
+            address=_clean(Owner, 'address', row.get('owner_address'), 'owner_address'),
+            phone_number=_clean(Owner, 'phone_number', values['phone'], 'owner_phone'),
+            email=_clean(Owner, 'email', values['email'], 'owner_email'),
+            registration_date=timezone.now(),
+        )
+        owner.search_name = owner.build_search_name()
+        return owner
+
+    def resolve_pets(self, batch):
+        """Set ``values['pet']`` on the rows whose pet exists or can be built; new pets are not saved yet."""
+        known = {}
+        owner_ids = {values['owner'].pk for _, values in batch if values['owner'].pk is not None}
+        for chunk in _chunks(owner_ids):
+            for pet in Pet.objects.filter(owner_id__in=chunk).only('pet_id', 'owner_id', 'search_name') \
+                    .order_by('pet_id'):
+                known.setdefault((pet.owner_id, pet.search_name), pet)
+
+        for line, values in batch:
+            owner = values['owner']
+            # New owners, which have no key yet, are told apart by identity
+            key = (owner.pk if owner.pk is not None else ('new', id(owner)), values['pet_key'])
+            pet = known.get(key)
+            if pet is None:
+                try:
+                    pet = self.build_pet(values)
+                except RowError as error:
+                    self.reject(line, error)
+                    continue
+                known[key] = pet
+            values['pet'] = pet
+
+    def pet_fields(self, values) -> Dict[str, Any]:
+        """Return the field values of the new pet described by a row."""
+        row = values['row']
+        return {
+            'name': _clean(Pet, 'name', row['pet_name'], 'pet_name'),
+            'species_id': self.species_id(row.get('species', '')),
+            'breed': _clean(Pet, 'breed', row.get('breed', '').lower(), 'breed'),
+            'date_of_birth': _clean(Pet, 'date_of_birth', row.get('date_of_birth'), 'date_of_birth'),
+            'gender': _choice(Gender, row.get('gender', ''), 'gender'),
+            'weight': _clean(Pet, 'weight', row.get('weight'), 'weight'),
+        }
+
+    def build_pet(self, values) -> Pet:
+        fields = values.get('pet_fields') or self.pet_fields(values)
+        pet = Pet(owner=values['owner'], **fields)
+        pet.search_name = pet.build_search_name()
+        return pet
+
+    def species_id(self, name: str) -> int:
+        name = Species.normalize(name)
+        if not name:
+            raise RowError("species: This field cannot be blank.")
+        if name not in self.species:
+            self.species[name] = Species.get_for_name(name).species_id
+        return self.species[name]
+
+
+def import_appointments(stream, batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """Import the appointments of the CSV file ``stream``; see :class:`AppointmentImporter`."""
+    return AppointmentImporter(batch_size).run(stream)
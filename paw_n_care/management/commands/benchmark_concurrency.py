@@ -0,0 +1,203 @@
+"""Benchmark concurrent readers and front-desk writers under each SQLite tuning profile."""
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from paw_n_care.models import Appointment, AppointmentStatus, Pet, Veterinarian
+from paw_n_care.search import APPOINTMENT_SEARCH_CONFIG, handle_search
+from paw_n_care.sqlite import PROFILES, apply_pragmas, profile_pragmas
+from paw_n_care.stats import collect_statistics
+
+SEARCH_TERMS = ['bella', 'max', 'checkup', 'vaccin', 'luna', 'skin', 'coco', 'dental']
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway SQLite file with generate_data, then run reader threads (searches and the "
+            "statistic page) against writer threads creating appointments, once per SQLite profile, and "
+            "report read latency, throughput and \"database is locked\" errors.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--appointments', type=int, default=10000,
+                            help="Number of appointments generated before the run.")
+        parser.add_argument('--profiles', default=','.join(PROFILES),
+                            help="Comma-separated SQLite profiles to compare.")
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help="Seconds each profile is measured for.")
+        parser.add_argument('--readers', type=int, default=4,
+                            help="Number of reader threads.")
+        parser.add_argument('--writers', type=int, default=2,
+                            help="Number of writer threads.")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed of generate_data and of the simulated traffic.")
+        parser.add_argument('--output', default=None,
+                            help="File the JSON results are written to.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("benchmark_concurrency only applies to SQLite databases.")
+        profiles = [profile for profile in options['profiles'].split(',') if profile]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}.")
+        self.options = options
+
+        # Locking only shows on a database file, so the test database is not kept in memory
+        directory = tempfile.mkdtemp()
+        original_test_name = connection.settings_dict['TEST']['NAME']
+        original_options = dict(connection.settings_dict['OPTIONS'])
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        results = {}
+        try:
+            self.stdout.write(f"Seeding {options['appointments']} appointments...")
+            call_command('generate_data', appointments=options['appointments'], seed=options['seed'],
+                         stdout=StringIO())
+            self.pets = list(Pet.objects.values_list('pet_id', 'owner_id'))
+            self.vet_ids = list(Veterinarian.objects.values_list('vet_id', flat=True))
+            self.last_appointment_id = Appointment.objects.order_by('-pk').values_list('pk', flat=True).first()
+            for profile in profiles:
+                self.stdout.write(f"Measuring the {profile} profile...")
+                results[profile] = self.run_profile(profile)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST']['NAME'] = original_test_name
+            connection.settings_dict['OPTIONS'].clear()
+            connection.settings_dict['OPTIONS'].update(original_options)
+            os.rmdir(directory)
+            teardown_test_environment()
+
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({'options': {key: options[key] for key in (
+                    'appointments', 'duration', 'readers', 'writers', 'seed')}, 'profiles': results}, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+    def run_profile(self, profile):
+        """Run the readers and writers for ``--duration`` seconds under ``profile`` and return the figures."""
+        pragmas = profile_pragmas(profile)
+        # Connections opened by the threads read their options from this shared settings dictionary
+        options = connection.settings_dict['OPTIONS']
+        options.pop('transaction_mode', None)
+        if profile == 'production':
+            options['transaction_mode'] = 'IMMEDIATE'
+        connection.close()
+        # The journal mode is stored in the database file, so it is switched back explicitly
+        apply_pragmas(connection, {'journal_mode': pragmas.get('journal_mode', 'DELETE')})
+        connection.close()
+
+        figures = {'reads': [], 'writes': [], 'locked': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + self.options['duration']
+        with override_settings(SQLITE_PROFILE=profile, SQLITE_OPTIMIZE_INTERVAL=0):
+            threads = [
+                threading.Thread(target=self.worker, args=(self.read, number, deadline, figures['reads'], figures, lock))
+                for number in range(self.options['readers'])
+            ] + [
+                threading.Thread(target=self.worker, args=(self.write, number, deadline, figures['writes'], figures,
+                                                           lock))
+                for number in range(self.options['writers'])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        duration = self.options['duration']
+        return {
+            'pragmas': pragmas,
+            'reads': len(figures['reads']),
+            'reads_per_s': round(len(figures['reads']) / duration, 1),
+            'read_median_ms': round(statistics.median(figures['reads']), 3) if figures['reads'] else 0,
+            'read_p95_ms': round(_percentile(figures['reads'], 95), 3),
+            'read_max_ms': round(max(figures['reads'], default=0), 3),
+            'writes': len(figures['writes']),
+            'writes_per_s': round(len(figures['writes']) / duration, 1),
+            'write_p95_ms': round(_percentile(figures['writes'], 95), 3),
+            'locked_errors': figures['locked'],
+            'other_errors': figures['errors'],
+        }
+
+    def worker(self, action, number, deadline, timings, figures, lock):
+        """Repeat ``action`` until ``deadline``, recording its latency and the lock errors it hits."""
+        rng = random.Random(f"{self.options['seed']}-{action.__name__}-{number}")
+        try:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    action(rng)
+                except OperationalError as error:
+                    with lock:
+                        figures['locked' if 'locked' in str(error) else 'errors'] += 1
+                    continue
+                with lock:
+                    timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            # Every thread has its own connection
+            connection.close()
+
+    def read(self, rng):
+        """Run one search of the home page or compute the statistic page."""
+        if rng.random() < 0.2:
+            collect_statistics(rng.choice(self.vet_ids))
+        else:
+            results, _, _ = handle_search(Appointment.objects.all(), 'all_categories', rng.choice(SEARCH_TERMS),
+                                          APPOINTMENT_SEARCH_CONFIG)
+            list(results[:settings.PAGE_SIZE])
+
+    def write(self, rng):
+        """Book or edit one appointment the way the front desk does, derived tables included."""
+        try:
+            self.book_or_edit(rng)
+        except ValidationError:
+            # A refused double booking is a write the front desk completed too
+            pass
+
+    def book_or_edit(self, rng):
+        if rng.random() < 0.5:
+            # Edits read the row before writing it, which is when a deferred transaction hits a locked database
+            with transaction.atomic():
+                appointment = Appointment.objects.filter(pk=rng.randint(1, self.last_appointment_id)).first()
+                if appointment:
+                    appointment.status = rng.choice(AppointmentStatus.values)
+                    appointment.save()
+            return
+        pet_id, owner_id = rng.choice(self.pets)
+        with transaction.atomic():
+            Appointment.objects.create(
+                pet_id=pet_id, owner_id=owner_id, vet_id=rng.choice(self.vet_ids),
+                appointment_date=timezone.localdate() + timedelta(days=rng.randint(0, 30)),
+                appointment_time=f'{rng.randint(8, 17):02d}:{rng.choice([0, 15, 30, 45]):02d}',
+                reason='Walk-in', status=AppointmentStatus.SCHEDULED,
+            )
+
+    def report(self, results):
+        self.stdout.write(f"\n{'profile':<12}{'reads/s':>9}{'read p50':>10}{'read p95':>10}{'read max':>10}"
+                          f"{'writes/s':>10}{'locked':>8}{'errors':>8}")
+        for profile, figures in results.items():
+            self.stdout.write(f"{profile:<12}{figures['reads_per_s']:>9.1f}{figures['read_median_ms']:>10.1f}"
+                              f"{figures['read_p95_ms']:>10.1f}{figures['read_max_ms']:>10.1f}"
+                              f"{figures['writes_per_s']:>10.1f}{figures['locked_errors']:>8}"
+                              f"{figures['other_errors']:>8}")
@@ -0,0 +1,188 @@
+"""Benchmark every page of the application against generated datasets of several sizes."""
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, reverse
+
+from paw_n_care import urls as paw_n_care_urls
+from paw_n_care.models import Appointment, Pet, Owner, MedicalRecord, Billing
+
+# Model whose first row fills each URL parameter
+URL_PARAMETERS = {
+    'appointment_id': Appointment,
+    'pet_id': Pet,
+    'owner_id': Owner,
+    'medical_record_id': MedicalRecord,
+    'billing_id': Billing,
+}
+# Extra GET parameters for the URLs that need them to do any work
+URL_QUERIES = {
+    'autocomplete': {'q': 'b'},
+}
+# Home views are also measured with a search, which is their expensive path
+SEARCH_URLS = ['home', 'pet-home', 'owner-home', 'medical-record-home', 'billing-home']
+SEARCH_QUERY = {'search-dropdown': 'all_categories', 'search-query': 'bella'}
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway test database at each scale with generate_data and record the latency, query "
+            "count and peak memory of every URL of the application as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='1000,10000',
+                            help="Comma-separated numbers of appointments to generate, e.g. 10000,100000,1000000.")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Number of timed requests per URL.")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed passed to generate_data.")
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="Keep the cache between requests instead of measuring cold pages.")
+        parser.add_argument('--output', default='benchmark.json',
+                            help="File the JSON results are written to.")
+        parser.add_argument('--compare', default=None,
+                            help="Previous results file to compare the median latencies against.")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(scale) for scale in options['scales'].split(',')]
+        except ValueError:
+            raise CommandError("--scales must be a comma-separated list of integers.")
+        self.repeat = max(1, options['repeat'])
+        self.warm_cache = options['warm_cache']
+
+        results = {
+            'meta': {
+                'created': datetime.now(dt_timezone.utc).isoformat(),
+                'django': django.get_version(),
+                'vendor': connection.vendor,
+                'seed': options['seed'],
+                'repeat': self.repeat,
+                'warm_cache': self.warm_cache,
+            },
+            'scales': {},
+        }
+
+        # The benchmark never touches the configured database
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            for scale in scales:
+                call_command('flush', interactive=False, verbosity=0)
+                self.stdout.write(f"Seeding {scale} appointments...")
+                call_command('generate_data', appointments=scale, seed=options['seed'], stdout=StringIO())
+                results['scales'][str(scale)] = self.measure_urls()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2)
+        self.report(results)
+        if options['compare']:
+            with open(options['compare']) as previous:
+                self.compare(json.load(previous), results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+    def benchmark_targets(self):
+        """Yield ``(label, path, query)`` for every named URL of the app, plus a search on each home view."""
+        seen = set()
+        for pattern in paw_n_care_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or pattern.name in seen:
+                continue
+            seen.add(pattern.name)
+            kwargs = {}
+            for parameter in pattern.pattern.converters:
+                if parameter in URL_PARAMETERS:
+                    model = URL_PARAMETERS[parameter]
+                    kwargs[parameter] = model.objects.order_by('pk').values_list('pk', flat=True).first()
+                elif parameter == 'source':
+                    kwargs[parameter] = 'pets'
+            if any(value is None for value in kwargs.values()):
+                continue
+            path = reverse(f'{paw_n_care_urls.app_name}:{pattern.name}', kwargs=kwargs)
+            yield pattern.name, path, URL_QUERIES.get(pattern.name, {})
+            if pattern.name in SEARCH_URLS:
+                yield f'{pattern.name}?search', path, SEARCH_QUERY
+
+    def measure_urls(self):
+        # A broken page is reported with its status code instead of aborting the run
+        client = Client(raise_request_exception=False)
+        measurements = {}
+        for label, path, query in self.benchmark_targets():
+            measurements[label] = self.measure(client, path, query)
+            self.stdout.write(f"  {label}: {measurements[label]['median_ms']:.1f} ms, "
+                              f"{measurements[label]['queries']} queries")
+        return measurements
+
+    def measure(self, client, path, query):
+        """Return the latency, query count and peak Python memory of ``GET path``."""
+        timings = []
+        status_code = None
+        query_count = None
+        for _ in range(self.repeat):
+            if not self.warm_cache:
+                cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.get(path, query)
+                timings.append((time.perf_counter() - start) * 1000)
+            status_code = response.status_code
+            query_count = len(queries)
+
+        # Tracing slows the request down, so memory is measured on a separate request
+        if not self.warm_cache:
+            cache.clear()
+        tracemalloc.start()
+        try:
+            client.get(path, query)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'path': path,
+            'query': query,
+            'status': status_code,
+            'queries': query_count,
+            'min_ms': round(min(timings), 3),
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(_percentile(timings, 95), 3),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def report(self, results):
+        for scale, measurements in results['scales'].items():
+            self.stdout.write(f"\n{scale} appointments")
+            self.stdout.write(f"{'url':<28}{'status':>7}{'median ms':>12}{'p95 ms':>10}{'queries':>9}{'peak KB':>11}")
+            for label, measurement in measurements.items():
+                self.stdout.write(f"{label:<28}{measurement['status']:>7}{measurement['median_ms']:>12.1f}"
+                                  f"{measurement['p95_ms']:>10.1f}{measurement['queries']:>9}"
+                                  f"{measurement['peak_memory_kb']:>11.1f}")
+
+    def compare(self, previous, current):
+        """Print the change of median latency and query count of every URL measured in both runs."""
+        self.stdout.write("\nChange against the previous run")
+        for scale, measurements in current['scales'].items():
+            for label, measurement in measurements.items():
+                before = previous.get('scales', {}).get(scale, {}).get(label)
+                if not before or not before['median_ms']:
+                    continue
+                change = (measurement['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+                self.stdout.write(f"{scale:>8} {label:<28}{change:>+8.1f}% "
+                                  f"queries {before['queries']} -> {measurement['queries']}")
@@ -0,0 +1,312 @@
+"""Generate a deterministic synthetic clinic dataset for scale testing."""
+import random
+from collections import defaultdict
+from itertools import accumulate
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from paw_n_care.cache import bump_model_version
+from paw_n_care.models import (
+    Owner, Pet, Species, Veterinarian, Appointment, MedicalRecord, Billing,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus,
+)
+from paw_n_care.search import SearchIndex
+
+FIRST_NAMES = [
+    'Anan', 'Busaba', 'Chayakarn', 'Dao', 'Ekkachai', 'Fah', 'Ganya', 'Hathai', 'Itsara', 'Jiraporn',
+    'Kritsada', 'Lamai', 'Malee', 'Nitipong', 'Orathai', 'Piyawan', 'Rattana', 'Somchai', 'Thanawat', 'Wasan',
+    'Alex', 'Emma', 'James', 'Olivia', 'Noah', 'Sophia', 'Liam', 'Mia', 'Lucas', 'Zoe',
+]
+LAST_NAMES = [
+    'Boonmee', 'Chaiyaporn', 'Hengsuwan', 'Jaidee', 'Kaewmanee', 'Limsakul', 'Meesuk', 'Phromma',
+    'Rattanakorn', 'Saelim', 'Srisuk', 'Thongdee', 'Wongsawat', 'Yodsuwan', 'Brown', 'Garcia', 'Lee',
+    'Martin', 'Smith', 'Taylor',
+]
+PET_NAMES = [
+    'Bailey', 'Bella', 'Benny', 'Biscuit', 'Buddy', 'Charlie', 'Coco', 'Daisy', 'Ginger', 'Kitty', 'Leo',
+    'Luna', 'Max', 'Maximus', 'Milo', 'Mochi', 'Nala', 'Oreo', 'Peanut', 'Pepper', 'Rocky', 'Simba',
+    'Snowy', 'Teddy', 'Tiger', 'Toby',
+]
+SPECIALIZATIONS = [
+    'Veterinary Medicine', 'Veterinary Surgery', 'Veterinary Pathology', 'Veterinary Public Health',
+    'Veterinary Dermatology', 'Exotic Animal Medicine',
+]
+STREETS = ['Sukhumvit Road', 'Phahonyothin Road', 'Ngamwongwan Road', 'Ratchadaphisek Road', 'Silom Road']
+
+# Species: (weight, breeds, body weight range in kg)
+SPECIES = {
+    'Dog': (45, ['Beagle', 'Boxer', 'Bulldog', 'Cocker Spaniel', 'German Shepherd', 'Golden Retriever',
+                 'Labrador', 'Poodle', 'Rottweiler'], (3, 45)),
+    'Cat': (35, ['Bengal', 'British Shorthair', 'Maine Coon', 'Persian', 'Ragdoll', 'Siamese'], (2.5, 8)),
+    'Bird': (8, ['Canary', 'Cockatiel', 'Lovebird', 'Parakeet'], (0.03, 0.5)),
+    'Rabbit': (6, ['Holland Lop', 'Netherland Dwarf', 'Rex'], (1, 5)),
+    'Hamster': (4, ['Dwarf', 'Syrian'], (0.05, 0.2)),
+    'Turtle': (2, ['Box Turtle', 'Red-Eared Slider'], (0.2, 3)),
+}
+# Conditions: (weight, diagnosis, treatment, prescribed medication)
+CONDITIONS = [
+    (7, 'Arthritis', 'Joint Supplements', 'Non-steroidal anti-inflammatory drugs (NSAIDs)'),
+    (7, 'Allergies', 'Antihistamines', 'Immunosuppressive Medications'),
+    (5, 'Heartworm Disease', 'Melarsomine dihydrochloride', 'Antibiotics, Steroids'),
+    (5, 'Liver Disease', 'Intravenous fluids, diet changes, antibiotics', 'Antibiotics'),
+    (5, 'Chronic Kidney Disease', 'Fluid Therapy', 'Cerenia, ondansetron, omeprazole'),
+    (4, 'Diabetes', 'Insulin Therapy', 'Insulin Injections'),
+    (4, 'Ear Infection', 'Ear Cleaning', 'Antibiotics'),
+    (3, 'Hip Dysplasia', 'Surgical Repair', 'Tramadol'),
+    (3, 'Pancreatitis', 'IV fluids, low-fat diet', 'Antiemetic medications'),
+    (1, 'Cataracts', 'Surgery', 'Anti-Inflammatory Eye Drops, Post-operative Pain Medication'),
+]
+REASONS = [
+    'The pet came with frequent vomiting and diarrhea.',
+    'The pet came with difficulty moving and joint stiffness.',
+    'The pet showed signs of ear infection with constant scratching.',
+    'The pet showed signs of skin irritation.',
+    'The pet experienced loss of appetite.',
+    'The pet came with symptoms of fever.',
+    'The pet was sneezing frequently.',
+    'The pet came with a wound on its paw.',
+    'Annual checkup and vaccination.',
+]
+# Past appointments only; appointments after the end date are always scheduled
+APPOINTMENT_STATUSES = {
+    AppointmentStatus.COMPLETED: 70, AppointmentStatus.CANCELLED: 15, AppointmentStatus.SCHEDULED: 15,
+}
+PAYMENT_STATUSES = {PaymentStatus.PAID: 60, PaymentStatus.PENDING: 25, PaymentStatus.OVERDUE: 15}
+PAYMENT_METHODS = {PaymentMethod.CREDIT_CARD: 45, PaymentMethod.CASH: 35, PaymentMethod.BANK_TRANSFER: 20}
+
+# Share of completed appointments that get a medical record and a bill
+MEDICAL_RECORD_RATE = 0.85
+BILLING_RATE = 0.95
+# Draws of a vet, day and time looking for a free slot before the appointment is generated as cancelled
+SLOT_ATTEMPTS = 50
+
+
+def _distribution(weights):
+    """Return the keys and cumulative weights of ``weights``, ready for :func:`_draw`."""
+    return list(weights), list(accumulate(weights.values()))
+
+
+def _draw(rng, distribution):
+    """Return a key drawn proportionally to its weight."""
+    keys, cum_weights = distribution
+    return rng.choices(keys, cum_weights=cum_weights)[0]
+
+
+class Command(BaseCommand):
+    help = ("Generate a deterministic synthetic dataset of owners, pets, vets, appointments, medical records "
+            "and bills, then rebuild the rollups and the search index.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--appointments', type=int, default=10000,
+                            help="Number of appointments to generate; the other tables are sized from it.")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Random seed; the same seed and end date always give the same data.")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                            help="Last day of the generated history (YYYY-MM-DD, default today).")
+        parser.add_argument('--years', type=int, default=3,
+                            help="Length of the generated appointment history.")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Number of rows inserted per bulk_create and per transaction.")
+        parser.add_argument('--skip-derived', action='store_true',
+                            help="Do not rebuild the rollups and the search index afterwards.")
+
+    def handle(self, *args, **options):
+        appointment_count = options['appointments']
+        if appointment_count < 1:
+            raise CommandError("--appointments must be at least 1.")
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.end_date = options['end_date'] or timezone.localdate()
+        self.start_date = self.end_date - timedelta(days=365 * options['years'])
+
+        owner_count = max(1, appointment_count // 8)
+        pet_count = max(1, owner_count * 3 // 2)
+        vet_count = max(4, appointment_count // 2500)
+
+        vet_ids = self.generate_vets(vet_count)
+        owner_ids = self.generate_owners(owner_count)
+        pet_owners = self.generate_pets(pet_count, owner_ids)
+        counts = self.generate_appointments(appointment_count, pet_owners, vet_ids)
+        self.reset_sequences()
+
+        for model in (Owner, Pet, Veterinarian, Appointment, MedicalRecord, Billing):
+            bump_model_version(model)
+        if not options['skip_derived']:
+            # bulk_create bypasses the signals that maintain the derived tables
+            call_command('rebuild_rollups', stdout=self.stdout)
+            call_command('repair_counters', stdout=self.stdout)
+            if SearchIndex.enabled():
+                call_command('rebuild_search_index', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {vet_count} vets, {owner_count} owners, {pet_count} pets, {appointment_count} appointments, "
+            f"{counts['records']} medical records and {counts['bills']} bills."
+        ))
+
+    def next_pk(self, model) -> int:
+        pk_name = model._meta.pk.name
+        return (model.objects.aggregate(last=Max(pk_name))['last'] or 0) + 1
+
+    def insert(self, model, rows):
+        """Insert ``rows`` in ``batch_size`` chunks, one transaction per chunk."""
+        for start in range(0, len(rows), self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(rows[start:start + self.batch_size], batch_size=self.batch_size)
+
+    def aware(self, day, moment=time(9)):
+        return timezone.make_aware(datetime.combine(day, moment))
+
+    def random_day(self, start, end):
+        return start + timedelta(days=self.rng.randrange((end - start).days + 1))
+
+    def generate_vets(self, count):
+        rng = self.rng
+        first_pk = self.next_pk(Veterinarian)
+        vets = []
+        for vet_id in range(first_pk, first_pk + count):
+            vet = Veterinarian(
+                vet_id=vet_id,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                specialization=rng.choice(SPECIALIZATIONS),
+                license_number=f'{rng.randrange(10 ** 10):010d}',
+                phone_number=f'08{rng.randrange(10 ** 8):08d}',
+                email=f'vet{vet_id}@pawncare.example.com',
+            )
+            vet.search_name = vet.build_search_name()
+            vets.append(vet)
+        self.insert(Veterinarian, vets)
+        return [vet.vet_id for vet in vets]
+
+    def generate_owners(self, count):
+        rng = self.rng
+        first_pk = self.next_pk(Owner)
+        owners = []
+        for owner_id in range(first_pk, first_pk + count):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            owner = Owner(
+                owner_id=owner_id,
+                first_name=first_name,
+                last_name=last_name,
+                address=f'{rng.randint(1, 999)} {rng.choice(STREETS)}, Bangkok',
+                phone_number=f'08{rng.randrange(10 ** 8):08d}',
+                email=f'{first_name}.{last_name}{owner_id}@example.com'.lower(),
+                registration_date=self.aware(self.random_day(self.start_date, self.end_date)),
+            )
+            owner.search_name = owner.build_search_name()
+            owners.append(owner)
+        self.insert(Owner, owners)
+        return [owner.owner_id for owner in owners]
+
+    def generate_pets(self, count, owner_ids):
+        """Create ``count`` pets, at least one per owner, and return their ``(pet_id, owner_id)`` pairs."""
+        rng = self.rng
+        first_pk = self.next_pk(Pet)
+        species_distribution = _distribution({species: weight for species, (weight, _, _) in SPECIES.items()})
+        species_ids = {name: Species.get_for_name(name).species_id for name in SPECIES}
+        pets, pet_owners = [], []
+        for number in range(count):
+            pet_id = first_pk + number
+            owner_id = owner_ids[number] if number < len(owner_ids) else rng.choice(owner_ids)
+            species = _draw(rng, species_distribution)
+            _, breeds, (min_weight, max_weight) = SPECIES[species]
+            pet = Pet(
+                pet_id=pet_id,
+                owner_id=owner_id,
+                name=rng.choice(PET_NAMES),
+                species_id=species_ids[species],
+                breed=rng.choice(breeds),
+                date_of_birth=self.end_date - timedelta(days=rng.randint(60, 15 * 365)),
+                gender=rng.choice(Gender.values),
+                weight=Decimal(str(round(rng.uniform(min_weight, max_weight), 2))),
+            )
+            pet.search_name = pet.build_search_name()
+            pets.append(pet)
+            pet_owners.append((pet_id, owner_id))
+        self.insert(Pet, pets)
+        return pet_owners
+
+    def generate_appointments(self, count, pet_owners, vet_ids):
+        """Create the appointments with their medical records and bills, one transaction per batch."""
+        rng = self.rng
+        # Some vets are busier than others, and some pets visit far more often
+        vet_distribution = _distribution({vet_id: rng.uniform(0.5, 2.0) for vet_id in vet_ids})
+        condition_distribution = _distribution({condition[1:]: condition[0] for condition in CONDITIONS})
+        status_distribution = _distribution(APPOINTMENT_STATUSES)
+        payment_status_distribution = _distribution(PAYMENT_STATUSES)
+        payment_method_distribution = _distribution(PAYMENT_METHODS)
+        last_day = self.end_date + timedelta(days=30)
+        next_appointment, next_record, next_bill = (
+            self.next_pk(Appointment), self.next_pk(MedicalRecord), self.next_pk(Billing)
+        )
+        counts = {'records': 0, 'bills': 0}
+        # Start minutes of the appointments of each vet and day
+        booked = defaultdict(list)
+        duration = settings.APPOINTMENT_DURATION_MINUTES
+
+        for batch_start in range(0, count, self.batch_size):
+            appointments, records, bills = [], [], []
+            for _ in range(min(self.batch_size, count - batch_start)):
+                pet_id, owner_id = pet_owners[int(len(pet_owners) * rng.random() ** 1.5)]
+                # A vet is never booked twice at the same time
+                for _ in range(SLOT_ATTEMPTS):
+                    vet_id = _draw(rng, vet_distribution)
+                    day = self.random_day(self.start_date, last_day)
+                    moment = time(rng.randint(8, 17), rng.choice([0, 15, 30, 45]))
+                    minute = moment.hour * 60 + moment.minute
+                    free = all(abs(minute - other) >= duration for other in booked[vet_id, day])
+                    if free:
+                        break
+                status = AppointmentStatus.SCHEDULED if day > self.end_date else _draw(rng, status_distribution)
+                if not free:
+                    status = AppointmentStatus.CANCELLED
+                elif status != AppointmentStatus.CANCELLED:
+                    booked[vet_id, day].append(minute)
+                appointments.append(Appointment(
+                    appointment_id=next_appointment, pet_id=pet_id, owner_id=owner_id, vet_id=vet_id,
+                    appointment_date=day, appointment_time=moment, reason=rng.choice(REASONS), status=status,
+                ))
+
+                if status == AppointmentStatus.COMPLETED and rng.random() < MEDICAL_RECORD_RATE:
+                    diagnosis, treatment, medication = _draw(rng, condition_distribution)
+                    records.append(MedicalRecord(
+                        record_id=next_record, appointment_id=next_appointment, pet_id=pet_id, vet_id=vet_id,
+                        visit_date=self.aware(day, moment), diagnosis=diagnosis, treatment=treatment,
+                        prescribed_medication=medication if rng.random() < 0.9 else None,
+                        notes=f'Follow-up for {diagnosis.lower()} in {rng.randint(1, 8)} weeks.',
+                    ))
+                    next_record += 1
+                if status == AppointmentStatus.COMPLETED and rng.random() < BILLING_RATE:
+                    bills.append(Billing(
+                        bill_id=next_bill, appointment_id=next_appointment,
+                        total_amount=Decimal(str(round(min(rng.lognormvariate(7, 0.6), 99999), 2))),
+                        payment_status=_draw(rng, payment_status_distribution),
+                        payment_method=_draw(rng, payment_method_distribution),
+                        payment_date=self.aware(day, moment) + timedelta(hours=rng.randint(1, 72)),
+                    ))
+                    next_bill += 1
+                next_appointment += 1
+
+            with transaction.atomic():
+                Appointment.objects.bulk_create(appointments, batch_size=self.batch_size)
+                MedicalRecord.objects.bulk_create(records, batch_size=self.batch_size)
+                Billing.objects.bulk_create(bills, batch_size=self.batch_size)
+            counts['records'] += len(records)
+            counts['bills'] += len(bills)
+            self.stdout.write(f"Inserted {batch_start + len(appointments)} of {count} appointments.")
+        return counts
+
+    def reset_sequences(self):
+        """Move the primary-key sequences past the explicit keys used above (a no-op on SQLite)."""
+        models = [Owner, Pet, Veterinarian, Appointment, MedicalRecord, Billing]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
@@ -0,0 +1,32 @@
+"""Import appointments, with their new owners and pets, from a CSV file."""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from paw_n_care.imports import IMPORT_BATCH_SIZE, IMPORT_COLUMNS, import_appointments
+
+
+class Command(BaseCommand):
+    help = ("Import a CSV of appointments in one transaction. Owners are matched by email or phone and pets by "
+            "owner and name; the missing ones are created with batched inserts. Rows that cannot be imported "
+            f"are reported and skipped. Columns: {', '.join(IMPORT_COLUMNS)}.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file to import (UTF-8, with a header row).")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help="Number of rows looked up and inserted together.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = import_appointments(stream, options['batch_size'])
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.appointments} of {result.rows} appointments, creating {result.owners} owners and "
+            f"{result.pets} pets, in {time.perf_counter() - start:.1f} s; {len(result.errors)} rows skipped."
+        ))
@@ -0,0 +1,208 @@
+"""Load JSON fixtures with batched inserts instead of one save per object."""
+import json
+import time
+from collections import Counter, defaultdict
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import DateTimeField
+from django.utils import timezone
+
+from paw_n_care.cache import bump_model_version
+from paw_n_care.models import SearchNameModel
+from paw_n_care.search import SearchIndex
+
+DATA_DIR = Path(__file__).resolve().parents[2] / 'data'
+# Characters read from a fixture file at a time
+READ_SIZE = 1 << 20
+
+
+def iter_fixture(path, read_size: int = READ_SIZE):
+    """Yield the objects of a JSON fixture file one at a time.
+
+    The file must hold a top-level array of objects, as written by
+    ``dumpdata``. It is read in blocks of ``read_size`` characters and each
+    object is decoded as soon as it is complete, so the whole file is never
+    held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as stream:
+        buffer, position, started = '', 0, False
+        while True:
+            # Skip the whitespace, the opening bracket and the commas between objects
+            while position == len(buffer) or buffer[position] in ' \t\r\n,[':
+                if position == len(buffer):
+                    buffer, position = stream.read(read_size), 0
+                    if not buffer:
+                        raise CommandError(f"{path}: unexpected end of file.")
+                    continue
+                if buffer[position] == '[':
+                    if started:
+                        raise CommandError(f"{path}: nested arrays are not fixture objects.")
+                    started = True
+                elif not started:
+                    raise CommandError(f"{path}: a fixture must be a JSON array.")
+                position += 1
+            if not started:
+                raise CommandError(f"{path}: a fixture must be a JSON array.")
+            if buffer[position] == ']':
+                return
+            if buffer[position] != '{':
+                raise CommandError(f"{path}: fixture entries must be JSON objects.")
+            while True:
+                try:
+                    entry, position = decoder.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError as error:
+                    # The object continues in the next block
+                    more = stream.read(read_size)
+                    if not more:
+                        raise CommandError(f"{path}: {error}")
+                    buffer, position = buffer[position:] + more, 0
+            yield entry
+            if position > read_size:
+                buffer, position = buffer[position:], 0
+
+
+class Command(BaseCommand):
+    help = ("Load JSON fixtures (by default paw_n_care/data/*.json) in foreign-key order with batched "
+            "bulk_create in one transaction, reset the primary-key sequences, then rebuild the rollups, "
+            "counters and search index. Existing rows with the same primary keys are overwritten, as with "
+            "loaddata.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*',
+                            help="Fixture files or directories of *.json files (default: the bundled data).")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Number of objects inserted per bulk_create.")
+        parser.add_argument('--skip-derived', action='store_true',
+                            help="Do not rebuild the rollups, counters and search index afterwards.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        files = self.fixture_files(options['paths'] or [DATA_DIR])
+        if not files:
+            raise CommandError("No fixture files found.")
+        self.batch_size = options['batch_size']
+
+        # A first pass only finds the models of every file, so they can be loaded in dependency order
+        files_by_model = defaultdict(list)
+        for path in files:
+            for label in sorted({entry['model'].lower() for entry in iter_fixture(path)}):
+                files_by_model[self.get_model(path, label)].append(path)
+
+        loaded = Counter()
+        with transaction.atomic():
+            for model in self.load_order(list(files_by_model)):
+                for path in files_by_model[model]:
+                    loaded[model] += self.load(model, path)
+            self.reset_sequences(list(loaded))
+
+        for model, count in loaded.items():
+            # bulk_create bypasses the signals that invalidate the cached pages
+            bump_model_version(model)
+            self.stdout.write(f"{model._meta.label}: {count} objects.")
+        if not options['skip_derived']:
+            call_command('rebuild_rollups', stdout=self.stdout)
+            call_command('repair_counters', stdout=self.stdout)
+            if SearchIndex.enabled():
+                call_command('rebuild_search_index', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {sum(loaded.values())} objects from {len(files)} files in {time.perf_counter() - start:.1f} s."
+        ))
+
+    @staticmethod
+    def fixture_files(paths):
+        files = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files.extend(sorted(path.glob('*.json')))
+            elif path.exists():
+                files.append(path)
+            else:
+                raise CommandError(f"No such fixture: {path}")
+        return files
+
+    @staticmethod
+    def get_model(path, label):
+        try:
+            return apps.get_model(label)
+        except (LookupError, ValueError):
+            raise CommandError(f"{path}: unknown model {label!r}.")
+
+    @staticmethod
+    def load_order(models):
+        """Return ``models`` sorted so every model comes after the models its foreign keys point to."""
+        graph = {
+            model: {field.related_model for field in model._meta.concrete_fields
+                    if field.is_relation and field.related_model in models and field.related_model is not model}
+            for model in models
+        }
+        try:
+            return list(TopologicalSorter(graph).static_order())
+        except CycleError as error:
+            raise CommandError(f"Circular foreign keys between {', '.join(m._meta.label for m in error.args[1])}.")
+
+    def build(self, model, entry, fields):
+        """Return the unsaved instance described by a fixture entry."""
+        if entry.get('pk') is None:
+            raise CommandError(f"{model._meta.label}: fixture entries need a primary key.")
+        values = {}
+        for name, value in entry.get('fields', {}).items():
+            field = fields.get(name)
+            if field is None:
+                raise CommandError(f"{model._meta.label} has no field {name!r}.")
+            if value is not None:
+                value = (field.target_field if field.is_relation else field).to_python(value)
+                if isinstance(field, DateTimeField) and settings.USE_TZ and timezone.is_naive(value):
+                    value = timezone.make_aware(value)
+            values[field.attname] = value
+        instance = model(**values)
+        instance.pk = model._meta.pk.to_python(entry['pk'])
+        if isinstance(instance, SearchNameModel):
+            instance.search_name = instance.build_search_name()
+        return instance
+
+    def load(self, model, path) -> int:
+        """Insert the objects of ``model`` found in ``path`` and return their number."""
+        concrete = model._meta.concrete_fields
+        if any(field.many_to_many for field in model._meta.get_fields()):
+            raise CommandError(f"{model._meta.label}: many-to-many fields are not supported.")
+        # Fixtures may name a foreign key by its field or by its column ("owner" or "owner_id")
+        fields = {**{field.name: field for field in concrete}, **{field.attname: field for field in concrete}}
+        update_fields = [field.name for field in concrete if not field.primary_key]
+        label = model._meta.label_lower
+
+        count = 0
+        batch = []
+        for entry in iter_fixture(path):
+            if entry['model'].lower() != label:
+                continue
+            batch.append(self.build(model, entry, fields))
+            if len(batch) == self.batch_size:
+                count += self.insert(model, batch, update_fields)
+                batch = []
+        if batch:
+            count += self.insert(model, batch, update_fields)
+        return count
+
+    def insert(self, model, batch, update_fields) -> int:
+        if not update_fields:
+            model.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+        else:
+            model.objects.bulk_create(batch, batch_size=self.batch_size, update_conflicts=True,
+                                      unique_fields=[model._meta.pk.name], update_fields=update_fields)
+        return len(batch)
+
+    @staticmethod
+    def reset_sequences(models):
+        """Move the primary-key sequences past the loaded keys (a no-op on SQLite)."""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
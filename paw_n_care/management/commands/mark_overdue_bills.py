@@ -0,0 +1,47 @@
+"""Mark the pending bills older than the payment term as overdue."""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from paw_n_care.models import Billing, PaymentStatus
+from paw_n_care.transitions import apply_transition
+from paw_n_care.utils import pk_chunks
+
+
+class Command(BaseCommand):
+    help = ("Move the pending bills dated more than --days ago to overdue, one short transaction per primary-key "
+            "chunk, so the other writers are never held up for long. Schedule it (e.g. nightly from cron); "
+            "running it again only moves the bills that became overdue since.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.BILL_OVERDUE_DAYS,
+                            help="Age in days after which a pending bill is overdue.")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Range of bill IDs moved per transaction.")
+        parser.add_argument('--pause', type=float, default=0,
+                            help="Seconds to wait between chunks, leaving the database to other writers.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['chunk_size'] < 1:
+            raise CommandError("--days must not be negative and --chunk-size must be positive.")
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Served by the (payment_status, payment_date) index
+        due = Billing.objects.filter(payment_status=PaymentStatus.PENDING, payment_date__lt=cutoff)
+
+        started = time.perf_counter()
+        marked = chunks = 0
+        for chunk in pk_chunks(Billing, options['chunk_size'], queryset=due):
+            # Each chunk is locked, moved and its derived tables refreshed in its own transaction
+            marked += apply_transition(chunk, PaymentStatus.OVERDUE).updated
+            chunks += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"{marked} bills pending since before {timezone.localtime(cutoff):%Y-%m-%d %H:%M} "
+                          f"marked overdue in {chunks} chunks, {elapsed:.2f} s "
+                          f"({marked / elapsed if elapsed else 0:.0f} bills/s).")
+        self.stdout.write(self.style.SUCCESS("Overdue bills marked."))
@@ -0,0 +1,27 @@
+"""Refresh the SQLite query planner statistics and checkpoint the write-ahead log."""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = ("Run ANALYZE and PRAGMA optimize on the SQLite database and truncate the write-ahead log. "
+            "Schedule it (e.g. nightly from cron) next to the cheaper per-process optimization.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-analyze', action='store_true',
+                            help="Only run PRAGMA optimize, which analyzes the tables that need it.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("optimize_database only applies to SQLite databases.")
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            if not options['skip_analyze']:
+                cursor.execute('ANALYZE')
+            cursor.execute('PRAGMA optimize')
+            cursor.execute('PRAGMA journal_mode')
+            if cursor.fetchone()[0].lower() == 'wal':
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        self.stdout.write(self.style.SUCCESS(f"Database optimized in {time.perf_counter() - start:.2f} s."))
@@ -0,0 +1,85 @@
+"""Rebuild the statistic rollup tables from the clinic data."""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from paw_n_care.models import (
+    Appointment, Billing, MedicalRecord,
+    DailyAppointmentRollup, DailyBillingRollup, VetPetRollup, MedicalRecordRollup,
+)
+from paw_n_care.rollups import ROLLUP_MODELS, as_date
+from paw_n_care.utils import pk_chunks
+
+
+class Command(BaseCommand):
+    help = "Rebuild the appointment, billing and medical record rollups in primary-key chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help="Number of source rows aggregated per query.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of rollup rows inserted per INSERT.")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        batch_size = options['batch_size']
+
+        appointments = defaultdict(int)
+        vet_pets = defaultdict(int)
+        for chunk in pk_chunks(Appointment, chunk_size):
+            for row in chunk.values('vet_id', 'appointment_date', 'status').annotate(count=Count('appointment_id')):
+                appointments[(row['vet_id'], row['appointment_date'], row['status'])] += row['count']
+            for row in chunk.values('vet_id', 'pet_id').annotate(count=Count('appointment_id')):
+                vet_pets[(row['vet_id'], row['pet_id'])] += row['count']
+
+        bills = defaultdict(lambda: [0, Decimal('0')])
+        for chunk in pk_chunks(Billing, chunk_size):
+            # Payment days are bucketed in local time, so group the timestamps in Python
+            for row in chunk.values('appointment__vet_id', 'payment_date', 'payment_status', 'payment_method') \
+                    .annotate(count=Count('bill_id'), total=Sum('total_amount')):
+                key = (row['appointment__vet_id'], as_date(row['payment_date']),
+                       row['payment_status'], row['payment_method'])
+                bills[key][0] += row['count']
+                bills[key][1] += row['total']
+
+        records = defaultdict(lambda: [0, 0])
+        for chunk in pk_chunks(MedicalRecord, chunk_size):
+            for row in chunk.values('diagnosis', 'treatment').annotate(
+                    count=Count('record_id'),
+                    medication=Count('record_id', filter=Q(prescribed_medication__isnull=False))):
+                records[(row['diagnosis'], row['treatment'])][0] += row['count']
+                records[(row['diagnosis'], row['treatment'])][1] += row['medication']
+
+        with transaction.atomic():
+            for model in ROLLUP_MODELS:
+                model.objects.all().delete()
+            DailyAppointmentRollup.objects.bulk_create(
+                (DailyAppointmentRollup(vet_id=vet_id, date=date, status=status, appointment_count=count)
+                 for (vet_id, date, status), count in appointments.items()),
+                batch_size=batch_size,
+            )
+            VetPetRollup.objects.bulk_create(
+                (VetPetRollup(vet_id=vet_id, pet_id=pet_id, appointment_count=count)
+                 for (vet_id, pet_id), count in vet_pets.items()),
+                batch_size=batch_size,
+            )
+            DailyBillingRollup.objects.bulk_create(
+                (DailyBillingRollup(vet_id=vet_id, date=date, payment_status=status, payment_method=method,
+                                    bill_count=count, total_amount=total)
+                 for (vet_id, date, status, method), (count, total) in bills.items()),
+                batch_size=batch_size,
+            )
+            MedicalRecordRollup.objects.bulk_create(
+                (MedicalRecordRollup(diagnosis=diagnosis, treatment=treatment,
+                                     record_count=count, medication_count=medication)
+                 for (diagnosis, treatment), (count, medication) in records.items()),
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(appointments)} appointment, {len(vet_pets)} vet/pet, "
+            f"{len(bills)} billing and {len(records)} medical record rollup rows."
+        ))
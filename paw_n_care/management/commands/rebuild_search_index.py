@@ -0,0 +1,24 @@
+"""Rebuild the full-text search index from the clinic data."""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from paw_n_care.search import SEARCH_INDEXES, SearchIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 search tables used by the all-categories search, in primary-key chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Number of rows indexed per chunk.")
+
+    def handle(self, *args, **options):
+        if not SearchIndex.enabled():
+            raise CommandError("The full-text search index is only available on SQLite.")
+
+        for index in SEARCH_INDEXES.values():
+            with transaction.atomic():
+                chunks = index.rebuild(chunk_size=options['chunk_size'])
+            self.stdout.write(f"Indexed {index.model.__name__} in {chunks} chunk(s).")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,75 @@
+"""Recompute the appointment and billing counters of owners, pets and vets."""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from paw_n_care.cache import bump_model_version
+from paw_n_care.models import Appointment, AppointmentStatus, Billing, Owner, Pet, Veterinarian
+from paw_n_care.utils import pk_chunks
+
+# model: (appointment column of the row, billing column of the row or None)
+COUNTED = {
+    Owner: ('owner_id', 'appointment__owner_id'),
+    Pet: ('pet_id', None),
+    Veterinarian: ('vet_id', 'appointment__vet_id'),
+}
+# SQLite sums decimals as floats, so totals are rounded back to the column's precision
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = ("Recompute the appointment counts, completed counts and billed totals stored on owners, pets and "
+            "vets in primary-key chunks, fixing the rows that drifted.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Number of owners, pets or vets recomputed per transaction.")
+
+    def handle(self, *args, **options):
+        for model in COUNTED:
+            checked, fixed = self.repair(model, options['chunk_size'])
+            if fixed:
+                # bulk_update bypasses the signals that invalidate the cached pages
+                bump_model_version(model)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {fixed} of {checked} rows fixed.")
+        self.stdout.write(self.style.SUCCESS("Counters repaired."))
+
+    @staticmethod
+    def expected_counters(model, pks):
+        """Return ``{pk: {counter: value}}`` computed from the appointments and bills of ``pks``."""
+        appointment_column, billing_column = COUNTED[model]
+        expected = {pk: {field: 0 for field in model.counter_fields} for pk in pks}
+        aggregates = {'appointment_count': Count('appointment_id')}
+        if 'completed_count' in model.counter_fields:
+            aggregates['completed_count'] = Count('appointment_id', filter=Q(status=AppointmentStatus.COMPLETED))
+        for row in Appointment.objects.filter(**{f'{appointment_column}__in': pks}) \
+                .values(appointment_column).annotate(**aggregates).order_by():
+            expected[row[appointment_column]].update({field: row[field] for field in aggregates})
+        if billing_column:
+            for row in Billing.objects.filter(**{f'{billing_column}__in': pks}) \
+                    .values(billing_column).annotate(total=Sum('total_amount')).order_by():
+                expected[row[billing_column]]['billed_total'] = (row['total'] or Decimal('0')).quantize(CENT)
+        return expected
+
+    def repair(self, model, chunk_size):
+        """Recompute the counters of ``model`` and return the numbers of rows checked and fixed."""
+        checked = fixed = 0
+        fields = list(model.counter_fields)
+        for chunk in pk_chunks(model, chunk_size):
+            with transaction.atomic():
+                # Locking the rows keeps concurrent increments from landing between the count and the write
+                rows = list(chunk.select_for_update().only(*fields))
+                expected = self.expected_counters(model, [row.pk for row in rows])
+                stale = []
+                for row in rows:
+                    values = expected[row.pk]
+                    if any(getattr(row, field) != values[field] for field in fields):
+                        for field in fields:
+                            setattr(row, field, values[field])
+                        stale.append(row)
+                model.objects.bulk_update(stale, fields)
+            checked += len(rows)
+            fixed += len(stale)
+        return checked, fixed
@@ -0,0 +1,30 @@
+"""Copy the primary SQLite database into the local replica file."""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from paw_n_care.sqlite import backup
+
+
+class Command(BaseCommand):
+    help = ("Copy the primary SQLite database into the replica configured with DB_REPLICA_NAME, with SQLite's "
+            "online backup. Run it periodically (e.g. every minute from cron) to emulate a read replica locally.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024,
+                            help="Number of pages copied per backup step.")
+
+    def handle(self, *args, **options):
+        replica = settings.REPLICA_DATABASE
+        if not replica:
+            raise CommandError("No replica is configured; set DB_REPLICA_NAME or DATABASE_REPLICA_URL.")
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[replica]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError("sync_replica only copies SQLite files; other replicas are kept in sync by "
+                               "the database server.")
+        start = time.perf_counter()
+        backup(primary, replica, pages=options['pages'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Replica {replica.settings_dict['NAME']} synced in {time.perf_counter() - start:.2f} s."))
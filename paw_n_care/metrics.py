@@ -0,0 +1,136 @@
+"""Per-request timing metrics.
+
+:class:`paw_n_care.middleware.RequestMetricsMiddleware` opens a
+:class:`RequestMetrics` for every request. SQL queries are timed with a
+database execute wrapper and top-level template renders with the
+:class:`TimedDjangoTemplates` backend, both of which add to the metrics of
+the current request through a context variable. Finished requests are
+added to per-view latency histograms that live in the worker process.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+_current_metrics: ContextVar[Optional['RequestMetrics']] = ContextVar('paw_n_care_request_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    """Counters of one request; times are in milliseconds."""
+    queries: int = 0
+    db_ms: float = 0.0
+    template_ms: float = 0.0
+    total_ms: float = 0.0
+
+    def server_timing(self) -> str:
+        """Return the value of the ``Server-Timing`` header."""
+        return (f'db;dur={self.db_ms:.1f};desc="{self.queries} queries", '
+                f'tpl;dur={self.template_ms:.1f}, total;dur={self.total_ms:.1f}')
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Return the metrics of the request being processed, if any."""
+    return _current_metrics.get()
+
+
+def start_request() -> Any:
+    """Open the metrics of a new request and return the token that closes them."""
+    return _current_metrics.set(RequestMetrics())
+
+
+def finish_request(token):
+    _current_metrics.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query to the current request."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend that records the render time of each top-level template."""
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class LatencyHistograms:
+    """Thread-safe per-view histograms of the request latency, plus DB and template time totals."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, view_name: str, metrics: RequestMetrics):
+        with self._lock:
+            view = self._views.setdefault(view_name, {
+                'buckets': [0] * len(LATENCY_BUCKETS_MS),
+                'count': 0, 'total_ms': 0.0, 'db_ms': 0.0, 'template_ms': 0.0, 'queries': 0,
+            })
+            for position, bound in enumerate(LATENCY_BUCKETS_MS):
+                if metrics.total_ms <= bound:
+                    view['buckets'][position] += 1
+                    break
+            view['count'] += 1
+            view['total_ms'] += metrics.total_ms
+            view['db_ms'] += metrics.db_ms
+            view['template_ms'] += metrics.template_ms
+            view['queries'] += metrics.queries
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the histograms with cumulative bucket counts, keyed by view name."""
+        with self._lock:
+            views = {}
+            for view_name, view in sorted(self._views.items()):
+                cumulative, buckets = 0, {}
+                for bound, count in zip(LATENCY_BUCKETS_MS, view['buckets']):
+                    cumulative += count
+                    buckets['+Inf' if bound == float('inf') else str(bound)] = cumulative
+                views[view_name] = {
+                    'count': view['count'],
+                    'buckets_ms': buckets,
+                    'sum_ms': round(view['total_ms'], 3),
+                    'db_sum_ms': round(view['db_ms'], 3),
+                    'template_sum_ms': round(view['template_ms'], 3),
+                    'queries': view['queries'],
+                }
+            return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+histograms = LatencyHistograms()
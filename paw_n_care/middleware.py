@@ -0,0 +1,73 @@
+"""Middleware of the paw_n_care app."""
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from paw_n_care import metrics
+from paw_n_care.routers import STICKY_COOKIE
+
+logger = logging.getLogger('paw_n_care.metrics')
+
+
+class RequestMetricsMiddleware:
+    """Record the queries, DB time, template time and total time of every request.
+
+    The figures are sent back in a ``Server-Timing`` header, logged as one JSON
+    line on the ``paw_n_care.metrics`` logger and added to the per-view latency
+    histograms served by the metrics endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.time_query))
+                response = self.get_response(request)
+            request_metrics = metrics.current_metrics()
+            request_metrics.total_ms = (time.perf_counter() - start) * 1000
+        finally:
+            metrics.finish_request(token)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else 'unresolved'
+        metrics.histograms.observe(view_name, request_metrics)
+        response['Server-Timing'] = request_metrics.server_timing()
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': request_metrics.queries,
+            'db_ms': round(request_metrics.db_ms, 3),
+            'template_ms': round(request_metrics.template_ms, 3),
+            'total_ms': round(request_metrics.total_ms, 3),
+        }))
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """Pin a client that has just written to the primary database.
+
+    Every response to a POST sets a short-lived cookie; while it is present the
+    read-only views read from the primary instead of a replica that may not
+    have received the write yet.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method == 'POST' and settings.REPLICA_STICKY_SECONDS:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0003_medicalrecord_appointment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MedicalRecordRollup',
+            fields=[
+                ('rollup_id', models.AutoField(primary_key=True, serialize=False)),
+                ('diagnosis', models.TextField()),
+                ('treatment', models.TextField()),
+                ('record_count', models.IntegerField(default=0)),
+                ('medication_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('diagnosis', 'treatment'), name='unique_medical_record_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyAppointmentRollup',
+            fields=[
+                ('rollup_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('appointment_count', models.IntegerField(default=0)),
+                ('vet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointment_rollups', to='paw_n_care.veterinarian')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'status'], name='appointment_rollup_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vet', 'date', 'status'), name='unique_appointment_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyBillingRollup',
+            fields=[
+                ('rollup_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('payment_status', models.CharField(max_length=20)),
+                ('payment_method', models.CharField(max_length=20)),
+                ('bill_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('vet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='billing_rollups', to='paw_n_care.veterinarian')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='billing_rollup_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vet', 'date', 'payment_status', 'payment_method'), name='unique_billing_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VetPetRollup',
+            fields=[
+                ('rollup_id', models.AutoField(primary_key=True, serialize=False)),
+                ('appointment_count', models.IntegerField(default=0)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vet_rollups', to='paw_n_care.pet')),
+                ('vet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pet_rollups', to='paw_n_care.veterinarian')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('vet', 'pet'), name='unique_vet_pet_rollup')],
+            },
+        ),
+    ]
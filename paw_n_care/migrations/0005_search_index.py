@@ -0,0 +1,96 @@
+from django.db import migrations
+
+# FTS5 tables backing the "all_categories" search. Each column holds one
+# non-date field of the matching search configuration; decimals keep their two
+# places, as the indexer writes them.
+SEARCH_TABLES = {
+    'paw_n_care_appointment_fts': {
+        'columns': [
+            'appointment_id', 'vet__first_name', 'reason', 'status', 'appointment_time',
+            'pet__name', 'pet__pet_id', 'pet__owner__owner_id', 'pet__owner__first_name',
+        ],
+        'populate': """
+            SELECT a.appointment_id, a.appointment_id, v.first_name, a.reason, a.status, a.appointment_time,
+                   p.name, p.pet_id, o.owner_id, o.first_name
+            FROM paw_n_care_appointment a
+            JOIN paw_n_care_veterinarian v ON v.vet_id = a.vet_id
+            JOIN paw_n_care_pet p ON p.pet_id = a.pet_id
+            JOIN paw_n_care_owner o ON o.owner_id = p.owner_id
+        """,
+    },
+    'paw_n_care_medicalrecord_fts': {
+        'columns': [
+            'record_id', 'appointment__appointment_id', 'pet__pet_id', 'pet__name',
+            'diagnosis', 'treatment', 'prescribed_medication', 'notes',
+        ],
+        'populate': """
+            SELECT m.record_id, m.record_id, m.appointment_id, p.pet_id, p.name,
+                   m.diagnosis, m.treatment, m.prescribed_medication, m.notes
+            FROM paw_n_care_medicalrecord m
+            JOIN paw_n_care_pet p ON p.pet_id = m.pet_id
+        """,
+    },
+    'paw_n_care_billing_fts': {
+        'columns': [
+            'bill_id', 'appointment__appointment_id', 'appointment__owner__first_name',
+            'payment_status', 'payment_method', 'total_amount',
+        ],
+        'populate': """
+            SELECT b.bill_id, b.bill_id, b.appointment_id, o.first_name,
+                   b.payment_status, b.payment_method, printf('%.2f', b.total_amount)
+            FROM paw_n_care_billing b
+            JOIN paw_n_care_appointment a ON a.appointment_id = b.appointment_id
+            JOIN paw_n_care_owner o ON o.owner_id = a.owner_id
+        """,
+    },
+    'paw_n_care_pet_fts': {
+        'columns': [
+            'pet_id', 'name', 'species', 'breed', 'gender', 'weight', 'owner__owner_id', 'owner__first_name',
+        ],
+        'populate': """
+            SELECT p.pet_id, p.pet_id, p.name, p.species, p.breed, p.gender, printf('%.2f', p.weight),
+                   o.owner_id, o.first_name
+            FROM paw_n_care_pet p
+            JOIN paw_n_care_owner o ON o.owner_id = p.owner_id
+        """,
+    },
+    'paw_n_care_owner_fts': {
+        'columns': [
+            'owner_id', 'first_name', 'last_name', 'pets__name', 'address', 'phone_number', 'email',
+        ],
+        'populate': """
+            SELECT o.owner_id, o.owner_id, o.first_name, o.last_name, group_concat(p.name, ' '),
+                   o.address, o.phone_number, o.email
+            FROM paw_n_care_owner o
+            LEFT JOIN paw_n_care_pet p ON p.owner_id = o.owner_id
+            GROUP BY o.owner_id
+        """,
+    },
+}
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, definition in SEARCH_TABLES.items():
+        columns = ', '.join(definition['columns'])
+        schema_editor.execute(f"CREATE VIRTUAL TABLE {table} USING fts5({columns}, tokenize='trigram')")
+        schema_editor.execute(f"INSERT INTO {table} (rowid, {columns}) {definition['populate']}")
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in SEARCH_TABLES:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0004_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
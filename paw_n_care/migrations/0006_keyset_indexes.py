@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'appointment_id'], name='appointment_date_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billing',
+            index=models.Index(fields=['payment_date', 'bill_id'], name='billing_payment_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicalrecord',
+            index=models.Index(fields=['visit_date', 'record_id'], name='record_visit_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='owner',
+            index=models.Index(fields=['registration_date', 'owner_id'], name='owner_registration_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['date_of_birth', 'pet_id'], name='pet_birth_keyset_idx'),
+        ),
+    ]
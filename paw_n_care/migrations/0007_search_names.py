@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:53
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Frozen copy of paw_n_care.utils.normalize_name
+def normalize_name(*parts):
+    text = unicodedata.normalize('NFKD', ' '.join(str(part) for part in parts if part))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())
+
+
+SEARCH_NAME_FIELDS = {
+    'Owner': ('first_name', 'last_name'),
+    'Pet': ('name',),
+    'Veterinarian': ('first_name', 'last_name'),
+}
+
+
+def fill_search_names(apps, schema_editor):
+    for model_name, fields in SEARCH_NAME_FIELDS.items():
+        model = apps.get_model('paw_n_care', model_name)
+        rows = []
+        for row in model.objects.only('pk', *fields).iterator(chunk_size=2000):
+            row.search_name = normalize_name(*(getattr(row, field) for field in fields))
+            rows.append(row)
+            if len(rows) >= 2000:
+                model.objects.bulk_update(rows, ['search_name'], batch_size=500)
+                rows = []
+        model.objects.bulk_update(rows, ['search_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='owner',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='veterinarian',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+    ]
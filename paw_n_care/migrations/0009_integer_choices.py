@@ -0,0 +1,202 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:04
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Integer code of every known spelling of the former free-text values
+CHOICE_CODES = {
+    'status': {'scheduled': 1, 'completed': 2, 'cancelled': 3, 'canceled': 3},
+    'payment_status': {'paid': 1, 'pending': 2, 'overdue': 3},
+    'payment_method': {'creditcard': 1, 'card': 1, 'cash': 2, 'banktransfer': 3, 'transfer': 3},
+    'gender': {'male': 1, 'm': 1, 'female': 2, 'f': 2},
+}
+CHOICE_FIELDS = [
+    ('Appointment', 'status'),
+    ('Billing', 'payment_status'),
+    ('Billing', 'payment_method'),
+    ('Pet', 'gender'),
+]
+LABELS = {
+    'status': {1: 'Scheduled', 2: 'Completed', 3: 'Cancelled'},
+    'payment_status': {1: 'Paid', 2: 'Pending', 3: 'Overdue'},
+    'payment_method': {1: 'Credit Card', 2: 'Cash', 3: 'Bank Transfer'},
+    'gender': {1: 'Male', 2: 'Female'},
+}
+
+# Species offered by the appointment form before they became rows
+DEFAULT_SPECIES = ['Dog', 'Cat', 'Bird']
+
+
+def encode(field, value):
+    key = re.sub(r'[^a-z0-9]', '', str(value).lower())
+    if key.isdigit() and int(key) in LABELS[field]:
+        return int(key)
+    try:
+        return CHOICE_CODES[field][key]
+    except KeyError:
+        raise ValueError(f"Cannot convert {field} value {value!r}; fix the row before migrating.")
+
+
+def encode_values(apps, schema_editor):
+    """Rewrite the free-text values as the integer codes the altered columns will hold."""
+    for model_name, field in CHOICE_FIELDS:
+        model = apps.get_model('paw_n_care', model_name)
+        for value in model.objects.values_list(field, flat=True).distinct():
+            model.objects.filter(**{field: value}).update(**{field: str(encode(field, value))})
+
+    # Rollup keys that differed only by case or spelling are merged
+    rollup = apps.get_model('paw_n_care', 'DailyAppointmentRollup')
+    counts = {}
+    for row in rollup.objects.values('vet_id', 'date', 'status', 'appointment_count'):
+        key = (row['vet_id'], row['date'], encode('status', row['status']))
+        counts[key] = counts.get(key, 0) + row['appointment_count']
+    rollup.objects.all().delete()
+    rollup.objects.bulk_create([
+        rollup(vet_id=vet_id, date=date, status=str(status), appointment_count=count)
+        for (vet_id, date, status), count in counts.items()
+    ], batch_size=500)
+
+    rollup = apps.get_model('paw_n_care', 'DailyBillingRollup')
+    totals = {}
+    for row in rollup.objects.values('vet_id', 'date', 'payment_status', 'payment_method', 'bill_count',
+                                     'total_amount'):
+        key = (row['vet_id'], row['date'], encode('payment_status', row['payment_status']),
+               encode('payment_method', row['payment_method']))
+        count, amount = totals.get(key, (0, 0))
+        totals[key] = (count + row['bill_count'], amount + row['total_amount'])
+    rollup.objects.all().delete()
+    rollup.objects.bulk_create([
+        rollup(vet_id=vet_id, date=date, payment_status=str(status), payment_method=str(method),
+               bill_count=count, total_amount=amount)
+        for (vet_id, date, status, method), (count, amount) in totals.items()
+    ], batch_size=500)
+
+    # Species names become rows of the lookup table, merged case-insensitively
+    species_model = apps.get_model('paw_n_care', 'Species')
+    for name in DEFAULT_SPECIES:
+        species_model.objects.get_or_create(name=name)
+    pet = apps.get_model('paw_n_care', 'Pet')
+    for value in pet.objects.values_list('species', flat=True).distinct():
+        name = ' '.join(value.split()).title()
+        species, _ = species_model.objects.get_or_create(name=name)
+        pet.objects.filter(species=value).update(species=str(species.species_id))
+
+
+def decode_values(apps, schema_editor):
+    for model_name, field in CHOICE_FIELDS:
+        model = apps.get_model('paw_n_care', model_name)
+        for code, label in LABELS[field].items():
+            model.objects.filter(**{field: str(code)}).update(**{field: label})
+    for model_name, fields in [('DailyAppointmentRollup', ['status']),
+                               ('DailyBillingRollup', ['payment_status', 'payment_method'])]:
+        model = apps.get_model('paw_n_care', model_name)
+        for field in fields:
+            for code, label in LABELS[field].items():
+                model.objects.filter(**{field: str(code)}).update(**{field: label})
+    species_model = apps.get_model('paw_n_care', 'Species')
+    pet = apps.get_model('paw_n_care', 'Pet')
+    for species in species_model.objects.all():
+        pet.objects.filter(species=str(species.species_id)).update(species=species.name)
+
+
+# The pet search documents now hold the species name from the lookup table. The
+# weight is written with its two decimal places, as the indexer writes the Decimal.
+PET_SEARCH_COLUMNS = [
+    'pet_id', 'name', 'species__name', 'breed', 'gender', 'weight', 'owner__owner_id', 'owner__first_name',
+]
+
+
+def rebuild_pet_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    columns = ', '.join(PET_SEARCH_COLUMNS)
+    schema_editor.execute("DROP TABLE IF EXISTS paw_n_care_pet_fts")
+    schema_editor.execute(f"CREATE VIRTUAL TABLE paw_n_care_pet_fts USING fts5({columns}, tokenize='trigram')")
+    schema_editor.execute(f"""
+        INSERT INTO paw_n_care_pet_fts (rowid, {columns})
+        SELECT p.pet_id, p.pet_id, p.name, s.name, p.breed,
+               CASE p.gender WHEN 1 THEN 'Male' WHEN 2 THEN 'Female' END,
+               printf('%.2f', p.weight), o.owner_id, o.first_name
+        FROM paw_n_care_pet p
+        JOIN paw_n_care_species s ON s.species_id = p.species_id
+        JOIN paw_n_care_owner o ON o.owner_id = p.owner_id
+    """)
+
+
+def restore_pet_search_table(apps, schema_editor):
+    # Runs before the columns are converted back, so the species are still rows
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    columns = 'pet_id, name, species, breed, gender, weight, owner__owner_id, owner__first_name'
+    schema_editor.execute("DROP TABLE IF EXISTS paw_n_care_pet_fts")
+    schema_editor.execute(f"CREATE VIRTUAL TABLE paw_n_care_pet_fts USING fts5({columns}, tokenize='trigram')")
+    schema_editor.execute(f"""
+        INSERT INTO paw_n_care_pet_fts (rowid, {columns})
+        SELECT p.pet_id, p.pet_id, p.name, s.name, p.breed,
+               CASE p.gender WHEN 1 THEN 'Male' WHEN 2 THEN 'Female' END,
+               printf('%.2f', p.weight), o.owner_id, o.first_name
+        FROM paw_n_care_pet p
+        JOIN paw_n_care_species s ON s.species_id = p.species_id
+        JOIN paw_n_care_owner o ON o.owner_id = p.owner_id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Species',
+            fields=[
+                ('species_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.RunPython(encode_values, decode_values),
+        migrations.AlterField(
+            model_name='appointment',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Scheduled'), (2, 'Completed'), (3, 'Cancelled')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='payment_method',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Credit Card'), (2, 'Cash'), (3, 'Bank Transfer')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='payment_status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Paid'), (2, 'Pending'), (3, 'Overdue')]),
+        ),
+        migrations.AlterField(
+            model_name='dailyappointmentrollup',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Scheduled'), (2, 'Completed'), (3, 'Cancelled')]),
+        ),
+        migrations.AlterField(
+            model_name='dailybillingrollup',
+            name='payment_method',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Credit Card'), (2, 'Cash'), (3, 'Bank Transfer')]),
+        ),
+        migrations.AlterField(
+            model_name='dailybillingrollup',
+            name='payment_status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Paid'), (2, 'Pending'), (3, 'Overdue')]),
+        ),
+        migrations.AlterField(
+            model_name='pet',
+            name='gender',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Male'), (2, 'Female')]),
+        ),
+        migrations.AlterField(
+            model_name='pet',
+            name='species',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='pets', to='paw_n_care.species'),
+        ),
+        migrations.RunPython(rebuild_pet_search_table, restore_pet_search_table),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+COMPLETED = 2
+
+
+def fill_counters(apps, schema_editor):
+    """Compute the counters of the existing rows with one correlated UPDATE per column."""
+    appointment = apps.get_model('paw_n_care', 'Appointment')
+    billing = apps.get_model('paw_n_care', 'Billing')
+
+    def appointments(column, condition=Q()):
+        counts = appointment.objects.filter(condition, **{column: OuterRef('pk')}) \
+            .order_by().values(column).annotate(count=Count('pk')).values('count')
+        return Coalesce(Subquery(counts), 0)
+
+    def billed(column):
+        totals = billing.objects.filter(**{column: OuterRef('pk')}) \
+            .order_by().values(column).annotate(total=Sum('total_amount')).values('total')
+        return Coalesce(Subquery(totals), 0, output_field=models.DecimalField(max_digits=14, decimal_places=2))
+
+    apps.get_model('paw_n_care', 'Owner').objects.update(
+        appointment_count=appointments('owner_id'), billed_total=billed('appointment__owner_id'),
+    )
+    apps.get_model('paw_n_care', 'Pet').objects.update(appointment_count=appointments('pet_id'))
+    apps.get_model('paw_n_care', 'Veterinarian').objects.update(
+        appointment_count=appointments('vet_id'),
+        completed_count=appointments('vet_id', Q(status=COMPLETED)),
+        billed_total=billed('appointment__vet_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0009_integer_choices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='owner',
+            name='appointment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='owner',
+            name='billed_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='appointment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='veterinarian',
+            name='appointment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='veterinarian',
+            name='billed_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='veterinarian',
+            name='completed_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
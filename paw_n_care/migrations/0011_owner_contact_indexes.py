@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0010_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='owner',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='owner_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='owner',
+            index=models.Index(fields=['phone_number'], name='owner_phone_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:50
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0011_owner_contact_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pet',
+            name='weight',
+            field=models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
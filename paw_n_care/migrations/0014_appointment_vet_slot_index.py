@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paw_n_care', '0013_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['vet', 'appointment_date', 'appointment_time'], name='appointment_vet_slot_idx'),
+        ),
+    ]
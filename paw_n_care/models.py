@@ -1,7 +1,131 @@
-from django.db import models
+import datetime
+import re
 
+from django.core.validators import MinValueValidator
+from django.db import connection, models
+from django.db.models.functions import Lower
 
-class Owner(models.Model):
+from paw_n_care.utils import normalize_name
+
+
+class AppointmentStatus(models.IntegerChoices):
+    SCHEDULED = 1, 'Scheduled'
+    COMPLETED = 2, 'Completed'
+    CANCELLED = 3, 'Cancelled'
+
+
+class PaymentStatus(models.IntegerChoices):
+    PAID = 1, 'Paid'
+    PENDING = 2, 'Pending'
+    OVERDUE = 3, 'Overdue'
+
+
+class PaymentMethod(models.IntegerChoices):
+    CREDIT_CARD = 1, 'Credit Card'
+    CASH = 2, 'Cash'
+    BANK_TRANSFER = 3, 'Bank Transfer'
+
+
+class Gender(models.IntegerChoices):
+    MALE = 1, 'Male'
+    FEMALE = 2, 'Female'
+
+
+def _choice_key(value) -> str:
+    return re.sub(r'[^a-z0-9]', '', str(value).lower())
+
+
+def choice_value(choices, value):
+    """Return the member of ``choices`` matching ``value``.
+
+    ``value`` may be the integer code, its string form, the label in any case
+    or spacing ("credit card", "Credit_Card"), or the member name. Raises
+    ``ValueError`` for anything else.
+    """
+    if isinstance(value, choices):
+        return value
+    key = _choice_key(value)
+    for member in choices:
+        if key in (str(member.value), _choice_key(member.label), _choice_key(member.name)):
+            return member
+    raise ValueError(f"{value!r} is not a valid {choices.__name__}")
+
+
+class SearchNameModel(models.Model):
+    """Abstract model keeping an indexed, normalized copy of its display name for prefix lookups."""
+    search_name = models.CharField(max_length=255, default='', editable=False, db_index=True)
+
+    # Fields concatenated, in order, into ``search_name``
+    search_name_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def build_search_name(self) -> str:
+        return normalize_name(*(getattr(self, field) for field in self.search_name_fields))
+
+    def save(self, *args, **kwargs):
+        self.search_name = self.build_search_name()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(self.search_name_fields) & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+
+
+class CounterModel(models.Model):
+    """Abstract model with counter columns maintained by :mod:`paw_n_care.rollups`.
+
+    The counters are only written with ``F()`` updates, so saving an existing
+    row leaves them out and cannot overwrite a concurrent increment.
+    """
+
+    # Columns owned by the rollup maintenance and the repair_counters command
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class StaleEdit(Exception):
+    """Raised when saving a copy of a row that was changed since it was read."""
+
+    @classmethod
+    def of(cls, instance) -> 'StaleEdit':
+        return cls(f"{instance._meta.verbose_name.capitalize()} {instance.pk} was changed by someone else.")
+
+
+class VersionedModel(models.Model):
+    """Abstract model with a version number checked and incremented by every update.
+
+    The UPDATE only matches the row while it still has the version the
+    instance was read with, so saving a stale copy raises :class:`StaleEdit`
+    instead of silently overwriting the newer row.
+    """
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version] + [(version, None, self.version + 1)]
+        if base_qs.filter(pk=pk_val, version=self.version)._update(values) > 0:
+            self.version += 1
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise StaleEdit.of(self)
+        return False
+
+
+class Owner(VersionedModel, CounterModel, SearchNameModel):
     owner_id = models.AutoField(primary_key=True)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -9,26 +133,70 @@ class Owner(models.Model):
     phone_number = models.CharField(max_length=10)
     email = models.EmailField(max_length=255)
     registration_date = models.DateTimeField()
+    appointment_count = models.IntegerField(default=0, editable=False)
+    billed_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+
+    search_name_fields = ('first_name', 'last_name')
+    counter_fields = ('appointment_count', 'billed_total')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['registration_date', 'owner_id'], name='owner_registration_keyset_idx'),
+            # Owner lookups of the CSV import
+            models.Index(Lower('email'), name='owner_email_idx'),
+            models.Index(fields=['phone_number'], name='owner_phone_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 
-class Pet(models.Model):
+class Species(models.Model):
+    """Lookup table of pet species, one row per normalized name."""
+    species_id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Return the stored form of a species name: single-spaced, capitalized words."""
+        return ' '.join(name.split()).title()
+
+    @classmethod
+    def get_for_name(cls, name: str) -> 'Species':
+        """Return the species called ``name`` in any case, creating it if needed."""
+        species, _ = cls.objects.get_or_create(name=cls.normalize(name))
+        return species
+
+
+class Pet(VersionedModel, CounterModel, SearchNameModel):
     pet_id = models.AutoField(primary_key=True)
     owner = models.ForeignKey(Owner, on_delete=models.CASCADE, related_name='pets')
     name = models.CharField(max_length=255)
-    species = models.CharField(max_length=50)
+    species = models.ForeignKey(Species, on_delete=models.PROTECT, related_name='pets')
     breed = models.CharField(max_length=100)
     date_of_birth = models.DateField()
-    gender = models.CharField(max_length=10)
-    weight = models.DecimalField(max_digits=5, decimal_places=2)
+    gender = models.PositiveSmallIntegerField(choices=Gender.choices)
+    weight = models.DecimalField(max_digits=5, decimal_places=2, validators=[MinValueValidator(0)])
+    appointment_count = models.IntegerField(default=0, editable=False)
+
+    search_name_fields = ('name',)
+    counter_fields = ('appointment_count',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_of_birth', 'pet_id'], name='pet_birth_keyset_idx'),
+            # Covers the species weight averages of the statistic page
+            models.Index(fields=['species', 'weight'], name='pet_species_weight_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.pet_id})"
 
 
-class Veterinarian(models.Model):
+class Veterinarian(CounterModel, SearchNameModel):
     vet_id = models.AutoField(primary_key=True)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -36,6 +204,12 @@ class Veterinarian(models.Model):
     license_number = models.CharField(max_length=50)
     phone_number = models.CharField(max_length=15)
     email = models.EmailField(max_length=255)
+    appointment_count = models.IntegerField(default=0, editable=False)
+    completed_count = models.IntegerField(default=0, editable=False)
+    billed_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+
+    search_name_fields = ('first_name', 'last_name')
+    counter_fields = ('appointment_count', 'completed_count', 'billed_total')
 
     @property
     def full_name(self):
@@ -45,7 +219,7 @@ class Veterinarian(models.Model):
         return f"Dr. {self.first_name} {self.last_name} : {self.vet_id}"
 
 
-class Appointment(models.Model):
+class Appointment(VersionedModel):
     appointment_id = models.AutoField(primary_key=True)
     pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='appointments')
     owner = models.ForeignKey(Owner, on_delete=models.CASCADE, related_name='appointments')
@@ -53,13 +227,70 @@ class Appointment(models.Model):
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
     reason = models.TextField()
-    status = models.CharField(max_length=20)
+    status = models.PositiveSmallIntegerField(choices=AppointmentStatus.choices)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['appointment_date', 'appointment_id'], name='appointment_date_keyset_idx'),
+            # Covers the returning owners count (status and date range, grouped by owner)
+            models.Index(fields=['status', 'appointment_date', 'owner'], name='appointment_status_date_idx'),
+            # Range lookups of the bookings of a vet around a start time (double-booking check)
+            models.Index(fields=['vet', 'appointment_date', 'appointment_time'], name='appointment_vet_slot_idx'),
+        ]
+
+    # Columns that place the appointment in its vet's calendar
+    slot_fields = ('vet_id', 'appointment_date', 'appointment_time', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_slot = {name: value for name, value in zip(field_names, values) if name in cls.slot_fields}
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._checked_slot = None
+        saved = kwargs.get('update_fields')
+        stored = getattr(self, '_stored_slot', {})
+        stored.update({name: getattr(self, name) for name in self.slot_fields
+                       if saved is None or name in saved or name.removesuffix('_id') in saved})
+        self._stored_slot = stored
+
+    def slot_changed(self) -> bool:
+        """Return whether the vet, day, time or status differ from the stored row, or are not known to match it."""
+        stored = getattr(self, '_stored_slot', {})
+        return any(name not in stored or stored[name] != value for name, value in zip(self.slot_fields, self.slot()))
+
+    def clean(self):
+        """Refuse a vet already booked at this time, so forms and the admin report it on ``appointment_time``.
+
+        Only appointments whose slot changed are checked, so other edits of an
+        appointment that overlaps older data still go through.
+        """
+        # The scheduling module queries the models
+        from paw_n_care import scheduling
+
+        # Fields missing or invalid are reported by their own validation
+        if self.vet_id is None or not isinstance(self.appointment_date, datetime.date) \
+                or not isinstance(self.appointment_time, datetime.time) or not self.slot_changed():
+            return
+        scheduling.check_vet_is_free(self)
+        if connection.in_atomic_block:
+            # The vet stays locked until the save in the same transaction, which need not check again
+            self._checked_slot = self.slot()
+
+    def slot(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.slot_fields)
+
+    def slot_checked(self) -> bool:
+        """Return whether ``clean`` already checked the current slot within the ongoing transaction."""
+        return connection.in_atomic_block and getattr(self, '_checked_slot', None) == self.slot()
 
     def __str__(self):
         return f"Appointment {self.appointment_id} for {self.pet.name}"
 
 
-class MedicalRecord(models.Model):
+class MedicalRecord(VersionedModel):
     record_id = models.AutoField(primary_key=True)
     appointment = models.OneToOneField(Appointment, on_delete=models.CASCADE, related_name='medical_record', null=True)
     pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='medical_records')
@@ -70,18 +301,30 @@ class MedicalRecord(models.Model):
     prescribed_medication = models.CharField(max_length=255, null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['visit_date', 'record_id'], name='record_visit_keyset_idx'),
+        ]
+
     def __str__(self):
         return f"Record {self.record_id} for {self.pet.name}"
 
 
-class Billing(models.Model):
+class Billing(VersionedModel):
     bill_id = models.AutoField(primary_key=True)
     appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='billing')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
-    payment_status = models.CharField(max_length=20)
-    payment_method = models.CharField(max_length=20)
+    payment_status = models.PositiveSmallIntegerField(choices=PaymentStatus.choices)
+    payment_method = models.PositiveSmallIntegerField(choices=PaymentMethod.choices)
     payment_date = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['payment_date', 'bill_id'], name='billing_payment_keyset_idx'),
+            models.Index(fields=['payment_status', 'payment_date'], name='billing_status_date_idx'),
+            models.Index(fields=['payment_method', 'payment_date'], name='billing_method_date_idx'),
+        ]
+
     def __str__(self):
         return f"Bill {self.bill_id} for Appointment {self.appointment.appointment_id}"
 
@@ -91,5 +334,85 @@ class User(models.Model):
     username = models.CharField(max_length=100)
     password = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['username', 'password'], name='user_login_idx'),
+        ]
+
+    def __str__(self):
+        return self.username
+
+class DailyAppointmentRollup(models.Model):
+    """Number of appointments per vet, per day and per status."""
+    rollup_id = models.AutoField(primary_key=True)
+    vet = models.ForeignKey(Veterinarian, on_delete=models.CASCADE, related_name='appointment_rollups')
+    date = models.DateField()
+    status = models.PositiveSmallIntegerField(choices=AppointmentStatus.choices)
+    appointment_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vet', 'date', 'status'], name='unique_appointment_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'status'], name='appointment_rollup_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.get_status_display()} for vet {self.vet_id}: {self.appointment_count}"
+
+
+class DailyBillingRollup(models.Model):
+    """Number and sum of bills per vet, per payment day, status and method."""
+    rollup_id = models.AutoField(primary_key=True)
+    vet = models.ForeignKey(Veterinarian, on_delete=models.CASCADE, related_name='billing_rollups')
+    date = models.DateField()
+    payment_status = models.PositiveSmallIntegerField(choices=PaymentStatus.choices)
+    payment_method = models.PositiveSmallIntegerField(choices=PaymentMethod.choices)
+    bill_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vet', 'date', 'payment_status', 'payment_method'],
+                                    name='unique_billing_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='billing_rollup_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.get_payment_status_display()}/{self.get_payment_method_display()} for vet {self.vet_id}: {self.total_amount}"
+
+
+class VetPetRollup(models.Model):
+    """Number of appointments a vet had with a pet, used for the pets managed widget."""
+    rollup_id = models.AutoField(primary_key=True)
+    vet = models.ForeignKey(Veterinarian, on_delete=models.CASCADE, related_name='pet_rollups')
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name='vet_rollups')
+    appointment_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vet', 'pet'], name='unique_vet_pet_rollup'),
+        ]
+
+    def __str__(self):
+        return f"Vet {self.vet_id} and pet {self.pet_id}: {self.appointment_count}"
+
+
+class MedicalRecordRollup(models.Model):
+    """Number of medical records per diagnosis and treatment pair."""
+    rollup_id = models.AutoField(primary_key=True)
+    diagnosis = models.TextField()
+    treatment = models.TextField()
+    record_count = models.IntegerField(default=0)
+    medication_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['diagnosis', 'treatment'], name='unique_medical_record_rollup'),
+        ]
+
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return f"{self.diagnosis} / {self.treatment}: {self.record_count}"
@@ -0,0 +1,133 @@
+"""Keyset (cursor) pagination for the home list views.
+
+Pages are selected with a ``WHERE (key) > (last key)`` condition on the sort
+columns instead of ``OFFSET``, so every page costs the same as the first one.
+The cursor handed to the template encodes the sort key of the first or last
+row of the current page.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+
+
+@dataclass
+class KeysetPage:
+    """One page of rows and the cursors of its neighbours."""
+    rows: List[Any]
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` on ``ordering``, whose last field must be unique (normally the pk)."""
+
+    def __init__(self, queryset, ordering: Sequence[str], page_size: Optional[int] = None):
+        self.queryset = queryset
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.page_size = page_size or getattr(settings, 'PAGE_SIZE', DEFAULT_PAGE_SIZE)
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """Return the page designated by ``cursor`` (the first page when it is missing or invalid)."""
+        position = self._decode(cursor)
+        if position is None:
+            rows = list(self._ordered(reverse=False)[:self.page_size + 1])
+            has_next, rows = len(rows) > self.page_size, rows[:self.page_size]
+            return self._build(rows, has_next=has_next, has_previous=False)
+
+        direction, values = position
+        reverse = direction == 'previous'
+        queryset = self._ordered(reverse=reverse).filter(self._beyond(values, reverse))
+        rows = list(queryset[:self.page_size + 1])
+        has_more, rows = len(rows) > self.page_size, rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            return self._build(rows, has_next=True, has_previous=has_more)
+        return self._build(rows, has_next=has_more, has_previous=True)
+
+    def _ordered(self, reverse: bool):
+        """Return the queryset sorted on the keyset, or on its reverse."""
+        return self.queryset.order_by(*[
+            f"{'-' if descending != reverse else ''}{field}" for field, descending in self.ordering
+        ])
+
+    def _beyond(self, values: Sequence[Any], reverse: bool) -> Q:
+        """Return the condition selecting the rows after ``values`` in the (possibly reversed) ordering."""
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def _build(self, rows: List[Any], has_next: bool, has_previous: bool) -> KeysetPage:
+        if not rows:
+            return KeysetPage(rows=rows)
+        return KeysetPage(
+            rows=rows,
+            next_cursor=self._encode('next', rows[-1]) if has_next else None,
+            previous_cursor=self._encode('previous', rows[0]) if has_previous else None,
+        )
+
+    def _key(self, row) -> List[Any]:
+        """Return the sort key of a ``.values()`` dict or a model instance."""
+        if isinstance(row, dict):
+            return [row[field] for field, _ in self.ordering]
+        return [getattr(row, field) for field, _ in self.ordering]
+
+    def _encode(self, direction: str, row) -> str:
+        payload = {
+            'd': direction,
+            'o': [field for field, _ in self.ordering],
+            'k': [value.isoformat() if hasattr(value, 'isoformat') else value for value in self._key(row)],
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def _decode(self, cursor: Optional[str]):
+        """Return ``(direction, key)`` for a cursor of this ordering, or None."""
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction, fields, raw_values = payload['d'], payload['o'], payload['k']
+        except (ValueError, TypeError, KeyError, binascii.Error):
+            return None
+        if direction not in ('next', 'previous') or fields != [field for field, _ in self.ordering]:
+            return None
+        if not isinstance(raw_values, list) or len(raw_values) != len(fields):
+            return None
+        model = self.queryset.model
+        try:
+            values = [model._meta.get_field(field).to_python(value) for field, value in zip(fields, raw_values)]
+        except ValidationError:
+            return None
+        return direction, values
+
+
+def paginate(request, queryset, search_config) -> KeysetPage:
+    """Return the page of ``queryset`` requested by the ``cursor`` and ``sort`` GET parameters.
+
+    Rows are sorted on the primary key, or newest first on the first date field
+    of the search configuration when ``sort=date``.
+    """
+    pk_name = queryset.model._meta.pk.name
+    ordering = [pk_name]
+    if request.GET.get('sort') == 'date' and search_config.get('date_fields'):
+        ordering = [f"-{search_config['date_fields'][0]}", f'-{pk_name}']
+    return KeysetPaginator(queryset, ordering).page(request.GET.get('cursor'))
@@ -0,0 +1,204 @@
+"""Incremental maintenance of the statistic rollup tables.
+
+Every tracked row contributes a set of deltas to one or more rollup rows. When
+a row is saved its previous contributions are subtracted and the new ones are
+added; when it is deleted its contributions are subtracted. The rollups can be
+rebuilt from scratch with ``python manage.py rebuild_rollups``.
+
+The same contributions maintain the counter columns of owners, pets and
+vets; those are recomputed with ``python manage.py repair_counters``. Bulk
+writes, which bypass the signals, apply the contributions of all their rows
+at once with :func:`apply_contributions_in_bulk`.
+"""
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, Billing, MedicalRecord, Owner, Pet, Veterinarian,
+    DailyAppointmentRollup, DailyBillingRollup, VetPetRollup, MedicalRecordRollup,
+)
+
+# (rollup model, lookup keys, counter deltas)
+Contribution = Tuple[Any, Dict[str, Any], Dict[str, Any]]
+
+ROLLUP_MODELS = [DailyAppointmentRollup, DailyBillingRollup, VetPetRollup, MedicalRecordRollup]
+# Models whose rows carry counters but are never created by a contribution
+COUNTER_MODELS = [Owner, Pet, Veterinarian]
+
+
+def as_date(value) -> datetime.date:
+    """Return the calendar day of a date, datetime or ISO string (local time for aware datetimes)."""
+    if isinstance(value, str):
+        value = parse_datetime(value) or parse_date(value)
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def appointment_contributions(appointment: Appointment) -> List[Contribution]:
+    """Return the rollup rows and counters an appointment is counted in."""
+    completed = 1 if appointment.status == AppointmentStatus.COMPLETED else 0
+    return [
+        (DailyAppointmentRollup,
+         {'vet_id': appointment.vet_id, 'date': as_date(appointment.appointment_date), 'status': appointment.status},
+         {'appointment_count': 1}),
+        (VetPetRollup,
+         {'vet_id': appointment.vet_id, 'pet_id': appointment.pet_id},
+         {'appointment_count': 1}),
+        (Veterinarian, {'vet_id': appointment.vet_id}, {'appointment_count': 1, 'completed_count': completed}),
+        (Owner, {'owner_id': appointment.owner_id}, {'appointment_count': 1}),
+        (Pet, {'pet_id': appointment.pet_id}, {'appointment_count': 1}),
+    ]
+
+
+def billing_contributions(billing: Billing, vet_id=None, owner_id=None) -> List[Contribution]:
+    """Return the rollup rows and counters a bill is counted in, attributed to the appointment's vet and owner."""
+    if vet_id is None:
+        vet_id = billing.appointment.vet_id
+    if owner_id is None:
+        owner_id = billing.appointment.owner_id
+    amount = Decimal(str(billing.total_amount))
+    return [
+        (DailyBillingRollup,
+         {'vet_id': vet_id, 'date': as_date(billing.payment_date),
+          'payment_status': billing.payment_status, 'payment_method': billing.payment_method},
+         {'bill_count': 1, 'total_amount': amount}),
+        (Veterinarian, {'vet_id': vet_id}, {'billed_total': amount}),
+        (Owner, {'owner_id': owner_id}, {'billed_total': amount}),
+    ]
+
+
+def medical_record_contributions(record: MedicalRecord) -> List[Contribution]:
+    """Return the rollup rows a medical record is counted in."""
+    return [
+        (MedicalRecordRollup,
+         {'diagnosis': record.diagnosis, 'treatment': record.treatment},
+         {'record_count': 1, 'medication_count': 1 if record.prescribed_medication is not None else 0}),
+    ]
+
+
+CONTRIBUTIONS = {
+    Appointment: appointment_contributions,
+    Billing: billing_contributions,
+    MedicalRecord: medical_record_contributions,
+}
+
+
+def previous_contributions(instance) -> List[Contribution]:
+    """Load the stored version of ``instance`` and return its contributions."""
+    model = type(instance)
+    if instance.pk is None:
+        return []
+    queryset = model.objects.filter(pk=instance.pk)
+    if model is Billing:
+        queryset = queryset.select_related('appointment')
+    stored = queryset.first()
+    if stored is None:
+        return []
+    return CONTRIBUTIONS[model](stored)
+
+
+def merge_contributions(contributions: Iterable[Contribution]) -> List[Contribution]:
+    """Sum the deltas of the contributions to the same row, so bulk writes update each row once."""
+    merged = {}
+    for model, keys, deltas in contributions:
+        key = (model, tuple(sorted(keys.items())))
+        if key not in merged:
+            merged[key] = (model, keys, dict(deltas))
+            continue
+        totals = merged[key][2]
+        for field, value in deltas.items():
+            totals[field] = totals.get(field, 0) + value
+    return list(merged.values())
+
+
+def apply_contributions(contributions: List[Contribution], sign: int = 1):
+    """Add (``sign=1``) or subtract (``sign=-1``) contributions from the rollup rows."""
+    for model, keys, deltas in contributions:
+        _bump(model, keys, {field: value * sign for field, value in deltas.items()})
+
+
+def _bump(model, keys: Dict[str, Any], deltas: Dict[str, Any]):
+    """Atomically add ``deltas`` to the rollup row identified by ``keys``."""
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**keys).update(**updates):
+        return
+    if model in COUNTER_MODELS or any(value < 0 for value in deltas.values()):
+        # The row was already removed together with its vet or pet
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # Another request created the row first
+        model.objects.filter(**keys).update(**updates)
+
+
+def apply_contributions_in_bulk(contributions: Iterable[Contribution], batch_size: int = 500):
+    """Add the contributions of many rows with a few queries per rollup model.
+
+    Rows receiving the same deltas are updated together with one ``F()``
+    update, and the missing rollup rows are created with ``bulk_create``,
+    instead of one ``UPDATE`` per contribution.
+    """
+    grouped = defaultdict(list)
+    for model, keys, deltas in merge_contributions(contributions):
+        # A row whose change cancels out, such as the owner of a re-stated appointment, is left alone
+        if any(deltas.values()):
+            grouped[model].append((keys, deltas))
+    with transaction.atomic():
+        for model, entries in grouped.items():
+            for start in range(0, len(entries), batch_size):
+                _bulk_bump(model, entries[start:start + batch_size])
+
+
+def _bulk_bump(model, entries: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+    """Add the deltas of ``entries`` to their rows, which all share the same lookup fields."""
+    key_fields = sorted(entries[0][0])
+    pk_name = model._meta.pk.name
+    if key_fields == [pk_name]:
+        stored = {(keys[pk_name],): keys[pk_name] for keys, _ in entries}
+    else:
+        # The lookups select a superset of the rows, matched exactly below
+        lookups = {f'{field}__in': {keys[field] for keys, _ in entries} for field in key_fields}
+        stored = {tuple(row[1:]): row[0]
+                  for row in model.objects.filter(**lookups).values_list(pk_name, *key_fields)}
+
+    pks_by_deltas = defaultdict(list)
+    created = []
+    for keys, deltas in entries:
+        pk = stored.get(tuple(keys[field] for field in key_fields))
+        if pk is not None:
+            pks_by_deltas[tuple(sorted(deltas.items()))].append(pk)
+        elif model not in COUNTER_MODELS and all(value >= 0 for value in deltas.values()):
+            created.append((keys, deltas))
+    for deltas, pks in pks_by_deltas.items():
+        model.objects.filter(pk__in=pks).update(**{field: F(field) + value for field, value in deltas})
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create([model(**keys, **deltas) for keys, deltas in created])
+    except IntegrityError:
+        # Another request created some of the rows first
+        for keys, deltas in created:
+            _bump(model, keys, deltas)
+
+
+def reattribute_bills(appointment: Appointment, previous: List[Contribution]):
+    """Move the bills of ``appointment`` from the vet and owner of its ``previous`` contributions to the current ones."""
+    keys = {model: keys for model, keys, _ in previous}
+    old_vet_id, old_owner_id = keys[Veterinarian]['vet_id'], keys[Owner]['owner_id']
+    if str(old_vet_id) == str(appointment.vet_id) and str(old_owner_id) == str(appointment.owner_id):
+        return
+    for billing in appointment.billing.all():
+        apply_contributions(billing_contributions(billing, vet_id=old_vet_id, owner_id=old_owner_id), sign=-1)
+        apply_contributions(billing_contributions(billing, vet_id=appointment.vet_id,
+                                                  owner_id=appointment.owner_id))
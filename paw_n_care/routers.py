@@ -0,0 +1,79 @@
+"""Read-replica routing.
+
+The read-only list and statistic pages are wrapped in :func:`read_from_replica`,
+which sends the reads of the clinic tables to ``settings.REPLICA_DATABASE``
+while the view runs. Every other read and every write goes to the primary.
+
+A client that has just written (any POST) receives a cookie from
+:class:`paw_n_care.middleware.ReplicaStickinessMiddleware` and keeps reading
+from the primary for ``settings.REPLICA_STICKY_SECONDS``, so it sees its own
+writes before the replica has caught up.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'paw_n_care_primary'
+
+_replica_reads = ContextVar('paw_n_care_replica_reads', default=False)
+
+
+def reading_from_replica() -> bool:
+    """Return True while the reads of the current request may go to the replica."""
+    return _replica_reads.get()
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads of the clinic tables made inside the block to the replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replica(view):
+    """Run a read-only view against the replica unless the client has just written."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or STICKY_COOKIE in request.COOKIES:
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Route the reads of :func:`replica_reads` blocks to the replica and everything else to the primary."""
+
+    app_label = 'paw_n_care'
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(settings, 'REPLICA_DATABASE', None)
+        if replica and reading_from_replica() and model._meta.app_label == self.app_label \
+                and not self.mirrors_primary(replica):
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    @staticmethod
+    def mirrors_primary(alias) -> bool:
+        """Return True when ``alias`` points at the primary database itself, as the test mirror does."""
+        if alias not in connections:
+            return False
+        replica, primary = connections[alias].settings_dict, connections[DEFAULT_DB_ALIAS].settings_dict
+        return all(replica.get(key) == primary.get(key) for key in ('ENGINE', 'NAME', 'HOST', 'PORT'))
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema from the primary
+        return db == DEFAULT_DB_ALIAS
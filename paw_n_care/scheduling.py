@@ -0,0 +1,181 @@
+"""Detection of vets booked for two appointments at the same time.
+
+Every appointment that is not cancelled occupies its vet from its start time
+for ``settings.APPOINTMENT_DURATION_MINUTES``, so two of them overlap when
+they are on the same day and start less than one duration apart. A booking is
+checked with one range query on the (vet, date, time) index that reads at
+most the appointments starting within one duration of it, however large the
+table grows. Bulk writes check all their rows with one query per chunk of
+vets and days.
+
+The free slots of vets over a range of days are read with one range query on
+the same index: the busy intervals of each vet and day are merged in memory
+and the start times left between them within the working hours are offered.
+"""
+import bisect
+import math
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.utils.dateparse import parse_time
+
+from paw_n_care.models import Appointment, AppointmentStatus, Veterinarian
+
+# Fields whose change moves an appointment to another slot or frees it
+SLOT_FIELDS = {'vet', 'vet_id', 'appointment_date', 'appointment_time', 'status'}
+# Days the free-slot finder covers at most in one request
+MAX_AVAILABILITY_DAYS = 31
+
+
+def duration() -> timedelta:
+    return timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES)
+
+
+def _as_value(field: str, value):
+    return Appointment._meta.get_field(field).to_python(value)
+
+
+def slot_bounds(start: time) -> Tuple[Optional[time], Optional[time]]:
+    """Return the exclusive bounds of the start times that overlap a visit starting at ``start``.
+
+    A bound is None when it falls on another day, where nothing is compared.
+    """
+    moment = datetime.combine(date(2000, 1, 1), start)
+    earliest, latest = moment - duration(), moment + duration()
+    return (earliest.time() if earliest.date() == moment.date() else None,
+            latest.time() if latest.date() == moment.date() else None)
+
+
+def conflicting_appointment(vet_id: int, day, start, exclude_pk: Optional[int] = None) -> Optional[Tuple[int, time]]:
+    """Return the primary key and start time of an appointment of the vet overlapping the given slot, if any."""
+    lower, upper = slot_bounds(_as_value('appointment_time', start))
+    queryset = Appointment.objects.filter(vet_id=vet_id, appointment_date=_as_value('appointment_date', day))
+    if lower is not None:
+        queryset = queryset.filter(appointment_time__gt=lower)
+    if upper is not None:
+        queryset = queryset.filter(appointment_time__lt=upper)
+    queryset = queryset.exclude(status=AppointmentStatus.CANCELLED)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.order_by('appointment_time').values_list('pk', 'appointment_time').first()
+
+
+def check_vet_is_free(appointment: Appointment):
+    """Raise ``ValidationError`` on ``appointment_time`` when the appointment's vet is already booked then.
+
+    Within a transaction on backends with row locks the vet row is locked
+    first, so concurrent bookings of one vet are checked one after the other;
+    SQLite serializes the writers by itself.
+    """
+    if appointment.status == AppointmentStatus.CANCELLED:
+        return
+    if connection.features.has_select_for_update and connection.in_atomic_block:
+        list(Veterinarian.objects.select_for_update().filter(pk=appointment.vet_id).values_list('pk'))
+    conflict = conflicting_appointment(appointment.vet_id, appointment.appointment_date,
+                                       appointment.appointment_time, exclude_pk=appointment.pk)
+    if conflict is not None:
+        pk, start = conflict
+        raise ValidationError({'appointment_time': [
+            f"The vet already has appointment {pk} at {start:%H:%M}; "
+            f"visits last {settings.APPOINTMENT_DURATION_MINUTES} minutes."
+        ]})
+
+
+def find_conflicts(appointments: Iterable[Appointment], chunk_size: int = 500) -> Set[int]:
+    """Return the indexes of ``appointments`` overlapping a stored appointment or an earlier one of the list.
+
+    Cancelled appointments never conflict. Stored rows with the primary key
+    of an appointment of the list are ignored, so rows being re-stated can be
+    checked against the others.
+    """
+    candidates = [
+        (index, appointment.pk, appointment.vet_id, _as_value('appointment_date', appointment.appointment_date),
+         _as_value('appointment_time', appointment.appointment_time))
+        for index, appointment in enumerate(appointments) if appointment.status != AppointmentStatus.CANCELLED
+    ]
+    # The stored copies of the listed rows are ignored, the others read once even when several chunks select them
+    seen = {pk for _, pk, _, _, _ in candidates if pk is not None}
+    booked = defaultdict(list)
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        # The lookups select a superset of the (vet, day) pairs, matched exactly below
+        stored = Appointment.objects.filter(
+            vet_id__in={vet_id for _, _, vet_id, _, _ in chunk},
+            appointment_date__in={day for _, _, _, day, _ in chunk},
+        ).exclude(status=AppointmentStatus.CANCELLED)
+        for pk, vet_id, day, moment in stored.values_list('pk', 'vet_id', 'appointment_date', 'appointment_time'):
+            if pk not in seen:
+                seen.add(pk)
+                booked[vet_id, day].append(moment)
+    for times in booked.values():
+        times.sort()
+
+    conflicts = set()
+    for index, _, vet_id, day, start in candidates:
+        times: List[time] = booked[vet_id, day]
+        lower, upper = slot_bounds(start)
+        position = 0 if lower is None else bisect.bisect_right(times, lower)
+        if position < len(times) and (upper is None or times[position] < upper):
+            conflicts.add(index)
+        else:
+            bisect.insort(times, start)
+    return conflicts
+
+
+def _minutes(moment: time) -> int:
+    return moment.hour * 60 + moment.minute
+
+
+def _end_minutes(start: time, length: int) -> int:
+    """Return the first whole minute after a visit starting at ``start``, seconds included as the check does."""
+    return math.ceil(start.hour * 60 + start.minute + (start.second + start.microsecond / 1e6) / 60) + length
+
+
+def _open_starts(busy: List[List[int]], opening: int, closing: int, length: int, step: int) -> List[time]:
+    """Return the start times on the ``step`` grid from ``opening`` whose visit fits between the ``busy`` intervals."""
+    starts = []
+    position = opening
+    for begin, end in busy + [[closing, closing]]:
+        # First grid point of the gap between the previous interval and this one
+        candidate = opening + -(-(position - opening) // step) * step
+        while candidate + length <= min(begin, closing):
+            starts.append(time(candidate // 60, candidate % 60))
+            candidate += step
+        position = max(position, end)
+    return starts
+
+
+def free_slots(vet_ids: Iterable[int], first_day: date, last_day: date) -> Dict[int, Dict[date, List[time]]]:
+    """Return the start times each vet is free for a whole visit on each day from ``first_day`` to ``last_day``.
+
+    The appointments of all the vets are read with a single query; overlapping
+    visits, which older data may hold, merge into one busy interval.
+    """
+    vet_ids = list(vet_ids)
+    length = settings.APPOINTMENT_DURATION_MINUTES
+    rows = Appointment.objects.filter(
+        vet_id__in=vet_ids, appointment_date__gte=first_day, appointment_date__lte=last_day,
+    ).exclude(status=AppointmentStatus.CANCELLED).values_list('vet_id', 'appointment_date', 'appointment_time')
+
+    busy = defaultdict(list)
+    for vet_id, day, start in sorted(rows):
+        begin, end = _minutes(start), _end_minutes(start, length)
+        intervals = busy[vet_id, day]
+        if intervals and begin <= intervals[-1][1]:
+            intervals[-1][1] = max(intervals[-1][1], end)
+        else:
+            intervals.append([begin, end])
+
+    opening = _minutes(parse_time(settings.CLINIC_OPENING_TIME))
+    closing = _minutes(parse_time(settings.CLINIC_CLOSING_TIME))
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    return {
+        vet_id: {day: _open_starts(busy[vet_id, day], opening, closing, length,
+                                   settings.APPOINTMENT_SLOT_STEP_MINUTES)
+                 for day in days}
+        for vet_id in vet_ids
+    }
@@ -0,0 +1,389 @@
+"""Search configuration, the full-text search index and ``handle_search``.
+
+Free-text ("all_categories") searches are answered from one SQLite FTS5 table
+per searchable model. The tables use the trigram tokenizer, so a match is a
+case-insensitive substring match like ``__icontains`` but is served from the
+index instead of a ``LIKE '%q%'`` scan over several joins. The tables are
+kept in sync by the receivers in :mod:`paw_n_care.signals` and can be rebuilt
+with ``python manage.py rebuild_search_index``.
+"""
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from django.db import connection
+from django.db.models import DateTimeField, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from paw_n_care.models import Appointment, Owner, Pet, MedicalRecord, Billing
+from paw_n_care.utils import pk_chunks
+
+# Trigram matching needs at least three characters; shorter queries use LIKE
+MIN_INDEXED_QUERY_LENGTH = 3
+
+APPOINTMENT_SEARCH_CONFIG = {
+    'model': Appointment,
+    'all_fields': [
+        'appointment_id',
+        'vet__first_name',
+        'reason',
+        'status',
+        'appointment_date',
+        'appointment_time',
+        'pet__name',
+        'pet__pet_id',
+        'pet__owner__owner_id',
+        'pet__owner__first_name'
+    ],
+    'field_mappings': {
+        'appointment_id': 'appointment_id',
+        'vet': 'vet__first_name',
+        'reason': 'reason',
+        'status': 'status',
+        'appointment_date': 'appointment_date',
+        'appointment_time': 'appointment_time',
+        'pet_id': 'pet__pet_id',
+        'pet_name': 'pet__name',
+        'owner_id': 'pet__owner__owner_id',
+        'owner_name': 'pet__owner__first_name'
+    },
+    'date_fields': ['appointment_date'],
+    'values_fields': [
+        'appointment_id', 'reason', 'status',
+        'appointment_date', 'appointment_time', 'vet__first_name',
+        'pet__pet_id', 'pet__name', 'pet__owner__owner_id',
+        'pet__owner__first_name'
+    ]
+}
+
+MEDICAL_RECORD_SEARCH_CONFIG = {
+    'model': MedicalRecord,
+    'all_fields': [
+        'record_id',
+        'appointment__appointment_id',
+        'pet__pet_id',
+        'pet__name',
+        'diagnosis',
+        'treatment',
+        'prescribed_medication',
+        'visit_date',
+        'notes'
+    ],
+    'field_mappings': {
+        'record_id': 'record_id',
+        'appointment_id': 'appointment__appointment_id',
+        'pet_id': 'pet__pet_id',
+        'pet_name': 'pet__name',
+        'diagnosis': 'diagnosis',
+        'treatment': 'treatment',
+        'prescribed_medication': 'prescribed_medication',
+        'visit_date': 'visit_date',
+        'notes': 'notes'
+
+    },
+    'date_fields': ['visit_date'],
+    'select_related': ['appointment', 'pet', 'vet', 'diagnosis', 'treatment', 'prescribed_medication'],
+    'values_fields': [
+        'record_id', 'appointment__appointment_id', 'pet__name',
+        'pet__pet_id', 'vet__first_name', 'vet__last_name',
+        'visit_date', 'diagnosis', 'treatment', 'prescribed_medication', 'notes'
+    ]
+}
+
+BILLING_SEARCH_CONFIG = {
+    'model': Billing,
+    'all_fields': [
+        'bill_id',
+        'appointment__appointment_id',
+        'appointment__owner__first_name',
+        'payment_status',
+        'payment_method',
+        'payment_date',
+        'total_amount'
+    ],
+    'field_mappings': {
+        'bill_id': 'bill_id',
+        'appointment_id': 'appointment__appointment_id',
+        'owner_name': 'appointment__owner__first_name',
+        'payment_status': 'payment_status',
+        'payment_method': 'payment_method',
+        'payment_date': 'payment_date'
+    },
+    'date_fields': ['payment_date'],
+    'select_related': ['appointment', 'appointment__pet', 'appointment__vet'],
+    'values_fields': [
+        'bill_id', 'appointment__appointment_id',
+        'appointment__owner__owner_id', 'appointment__owner__first_name',
+        'appointment__owner__last_name', 'appointment__pet__name',
+        'appointment__pet_id', 'total_amount', 'payment_status',
+        'payment_method', 'payment_date'
+    ]
+}
+
+PET_SEARCH_CONFIG = {
+    'model': Pet,
+    'all_fields': [
+        'pet_id',
+        'name',
+        'species__name',
+        'breed',
+        'date_of_birth',
+        'gender',
+        'weight',
+        'owner__owner_id',
+        'owner__first_name'
+    ],
+    'field_mappings': {
+        'pet_id': 'pet_id',
+        'name': 'name',
+        'species': 'species__name',
+        'breed': 'breed',
+        'date_of_birth': 'date_of_birth',
+        'gender': 'gender',
+        'weight': 'weight',
+        'owner_id': 'owner__owner_id',
+        'owner_name': 'owner__first_name'
+    },
+    'date_fields': ['date_of_birth'],
+    'select_related': ['owner'],
+    'values_fields': [
+        'pet_id',
+        'name',
+        'species__name',
+        'breed',
+        'date_of_birth',
+        'gender',
+        'weight',
+        'owner__owner_id',
+        'owner__first_name'
+    ]
+}
+
+OWNER_SEARCH_CONFIG = {
+    'model': Owner,
+    'all_fields': [
+        'owner_id',
+        'first_name',
+        'last_name',
+        'pets__name',
+        'address',
+        'phone_number',
+        'email',
+        'registration_date'
+    ],
+    'field_mappings': {
+        'owner_id': 'owner_id',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'pet': 'pets__name',
+        'pet_name': 'pets__name',
+        'address': 'address',
+        'phone_number': 'phone_number',
+        'email': 'email',
+        'registration_date': 'registration_date'
+    },
+    'date_fields': ['registration_date'],
+    'prefetch_related': ['pets'],
+    'values_fields': [
+        'owner_id',
+        'first_name',
+        'last_name',
+        'address',
+        'phone_number',
+        'email',
+        'registration_date'
+    ]
+}
+
+
+def model_field(model, path: str):
+    """Return the model field a ``__``-separated lookup path ends on."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class SearchIndex:
+    """An SQLite FTS5 table holding the searchable text columns of one model.
+
+    The columns are the non-date ``all_fields`` of a search configuration. The
+    rowid of each document is the primary key of the indexed row.
+    """
+
+    def __init__(self, table: str, model, search_config: Dict[str, Any]):
+        self.table = table
+        self.model = model
+        date_fields = search_config.get('date_fields', [])
+        self.fields = [field for field in search_config['all_fields'] if field not in date_fields]
+        self.dependencies = self._related_paths()
+        # Integer-coded columns are indexed by their labels, which is what users search for
+        self.labels = [dict(model_field(model, field).flatchoices) or None for field in self.fields]
+
+    def _related_paths(self) -> List[Tuple[Any, str]]:
+        """Return the (related model, lookup path) pairs whose columns are copied into the documents."""
+        paths = {}
+        for field in self.fields:
+            parts = field.split('__')
+            model = self.model
+            for depth, name in enumerate(parts[:-1], start=1):
+                model = model._meta.get_field(name).related_model
+                # The primary key of the last relation is stored on the parent row itself
+                if depth == len(parts) - 1 and parts[-1] == model._meta.pk.name:
+                    break
+                paths['__'.join(parts[:depth])] = model
+        return [(model, path) for path, model in paths.items()]
+
+    @staticmethod
+    def enabled() -> bool:
+        """Return True when the database supports the FTS5 search tables."""
+        return connection.vendor == 'sqlite'
+
+    def documents(self, queryset) -> Iterable[Tuple[int, List[str]]]:
+        """Yield ``(pk, columns)`` for the rows of ``queryset``; multi-valued columns are joined."""
+        documents = {}
+        for pk, *values in queryset.order_by('pk').values_list('pk', *self.fields):
+            columns = documents.setdefault(pk, [[] for _ in self.fields])
+            for column, labels, value in zip(columns, self.labels, values):
+                if labels and value in labels:
+                    value = labels[value]
+                if value is not None and str(value) not in column:
+                    column.append(str(value))
+        for pk, columns in documents.items():
+            yield pk, [' '.join(column) for column in columns]
+
+    def _write(self, cursor, queryset):
+        """Insert the documents of ``queryset`` into the FTS table."""
+        columns = ', '.join(['rowid'] + self.fields)
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+        cursor.executemany(
+            f'INSERT INTO {self.table} ({columns}) VALUES ({placeholders})',
+            [(pk, *document) for pk, document in self.documents(queryset)],
+        )
+
+    def refresh(self, pks: Iterable[int], chunk_size: int = 500):
+        """Re-index the rows with the given primary keys, dropping the ones that no longer exist."""
+        if not self.enabled():
+            return
+        pks = sorted(pk for pk in set(pks) if pk is not None)
+        with connection.cursor() as cursor:
+            for start in range(0, len(pks), chunk_size):
+                chunk = pks[start:start + chunk_size]
+                cursor.execute(
+                    f'DELETE FROM {self.table} WHERE rowid IN ({", ".join(["%s"] * len(chunk))})', chunk
+                )
+                self._write(cursor, self.model.objects.filter(pk__in=chunk))
+
+    def rebuild(self, chunk_size: int = 5000) -> int:
+        """Re-index every row of the model in primary-key chunks and return the number of chunks."""
+        chunks = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            for chunk in pk_chunks(self.model, chunk_size):
+                self._write(cursor, chunk)
+                chunks += 1
+        return chunks
+
+    def match(self, search_query: str) -> RawSQL:
+        """Return a subquery selecting the primary keys of the documents containing ``search_query``."""
+        phrase = '"{}"'.format(search_query.replace('"', '""'))
+        return RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [phrase])
+
+    def can_match(self, search_query: str) -> bool:
+        """Return True when ``search_query`` can be answered from the index."""
+        return self.enabled() and len(search_query) >= MIN_INDEXED_QUERY_LENGTH
+
+
+SEARCH_INDEXES = {
+    Appointment: SearchIndex('paw_n_care_appointment_fts', Appointment, APPOINTMENT_SEARCH_CONFIG),
+    MedicalRecord: SearchIndex('paw_n_care_medicalrecord_fts', MedicalRecord, MEDICAL_RECORD_SEARCH_CONFIG),
+    Billing: SearchIndex('paw_n_care_billing_fts', Billing, BILLING_SEARCH_CONFIG),
+    Pet: SearchIndex('paw_n_care_pet_fts', Pet, PET_SEARCH_CONFIG),
+    Owner: SearchIndex('paw_n_care_owner_fts', Owner, OWNER_SEARCH_CONFIG),
+}
+
+
+def indexed_rows(instance) -> Dict[SearchIndex, Set[int]]:
+    """Return, per search index, the primary keys of the documents that include ``instance``."""
+    model = type(instance)
+    affected = {}
+    for index in SEARCH_INDEXES.values():
+        pks = set()
+        if index.model is model:
+            pks.add(instance.pk)
+        if instance.pk is not None:
+            for related_model, path in index.dependencies:
+                if related_model is model:
+                    pks.update(index.model.objects.filter(**{path: instance.pk}).values_list('pk', flat=True))
+        if pks:
+            affected[index] = pks
+    return affected
+
+
+def date_condition(model, field: str, day) -> Q:
+    """Return the condition matching ``day`` on a date field, as a range of the local day on datetime fields."""
+    if isinstance(model._meta.get_field(field), DateTimeField):
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return Q(**{f'{field}__gte': start, f'{field}__lt': start + timedelta(days=1)})
+    return Q(**{field: day})
+
+
+def text_condition(model, field: str, search_query: str) -> Q:
+    """Return the substring condition of a text field; choice fields are matched on their labels."""
+    choices = model_field(model, field).flatchoices
+    if choices:
+        query = search_query.casefold()
+        return Q(**{f'{field}__in': [value for value, label in choices if query in str(label).casefold()]})
+    return Q(**{f'{field}__icontains': search_query})
+
+
+def filter_search(queryset, search_category: str, search_query: str, search_config: Dict[str, Any]):
+    """Return ``queryset`` filtered by the search category and query of a search configuration."""
+    if not search_query:
+        return queryset
+
+    # Handle select_related if specified
+    if search_config.get('select_related'):
+        queryset = queryset.select_related(*search_config['select_related'])
+
+    # Build the search query
+    if search_category == 'all_categories':
+        q_objects = Q()
+        index = SEARCH_INDEXES.get(queryset.model)
+        use_index = index is not None and index.can_match(search_query)
+        if use_index:
+            # The text columns are answered by the full-text index
+            q_objects |= Q(pk__in=index.match(search_query))
+        for field in search_config['all_fields']:
+            if field in search_config.get('date_fields', []):
+                try:
+                    date_query = parse_date(search_query)
+                    if date_query:
+                        q_objects |= date_condition(queryset.model, field, date_query)
+                except ValueError:
+                    continue
+            elif not use_index:
+                q_objects |= text_condition(queryset.model, field, search_query)
+        queryset = queryset.filter(q_objects)
+    else:
+        # Get the actual field name from the mapping
+        field_name = search_config['field_mappings'].get(search_category)
+        if field_name:
+            if field_name in search_config.get('date_fields', []):
+                try:
+                    date_query = parse_date(search_query)
+                    if date_query:
+                        queryset = queryset.filter(date_condition(queryset.model, field_name, date_query))
+                except ValueError:
+                    pass
+            else:
+                queryset = queryset.filter(text_condition(queryset.model, field_name, search_query))
+
+    return queryset
+
+
+def handle_search(queryset, search_category: str, search_query: str, search_config: Dict[str, Any]) -> tuple:
+    """Handle the search functionality for the given queryset and search configuration."""
+    queryset = filter_search(queryset, search_category, search_query, search_config)
+    return queryset.values(*search_config['values_fields']), search_query, search_category
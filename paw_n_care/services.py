@@ -0,0 +1,310 @@
+"""Write services behind the data entry forms.
+
+A service validates its whole input before writing anything, checks the rows
+it refers to with a single query, assigns foreign keys by id instead of
+loading the related objects, and writes all of its rows in one atomic block,
+so a failure never leaves part of the change behind. Invalid input raises a
+``ValidationError`` keyed by the name of the form field.
+
+The edit services only write the columns whose POSTed value differs from the
+stored one. The form sends back the ``version`` of the row it was rendered
+from, and saving a row that was changed since then raises ``StaleEdit``.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, Billing, Gender, MedicalRecord, Owner, PaymentMethod, PaymentStatus, Pet,
+    Species, StaleEdit, Veterinarian, choice_value,
+)
+
+# Model fields whose form input has another name
+FORM_FIELDS = {
+    Owner: {'phone_number': 'phone'},
+    Pet: {'name': 'pet_name'},
+}
+
+# Form inputs of the edit pages, by model field
+EDIT_FIELDS = {
+    Appointment: {'appointment_date': 'appointment_date', 'appointment_time': 'appointment_time',
+                  'reason': 'reason', 'status': 'status', 'vet_id': 'vet'},
+    Pet: {'name': 'name', 'species': 'species', 'breed': 'breed', 'date_of_birth': 'date_of_birth',
+          'gender': 'gender', 'weight': 'weight'},
+    Owner: {'first_name': 'first_name', 'last_name': 'last_name', 'address': 'address',
+            'phone_number': 'phone', 'email': 'email'},
+    MedicalRecord: {'visit_date': 'visit_date', 'diagnosis': 'diagnosis', 'treatment': 'treatment',
+                    'prescribed_medication': 'prescribed_medication', 'notes': 'notes'},
+    Billing: {'total_amount': 'total_amount', 'payment_status': 'payment_status',
+              'payment_method': 'payment_method', 'payment_date': 'payment_date'},
+}
+# Pet and owner inputs of the appointment edit page, which use the names of the booking form
+APPOINTMENT_PET_FIELDS = {'name': 'pet_name', 'weight': 'weight', 'version': 'pet_version'}
+APPOINTMENT_OWNER_FIELDS = {'phone_number': 'phone', 'email': 'email', 'address': 'address',
+                            'version': 'owner_version'}
+CHOICE_FIELDS = {
+    'status': AppointmentStatus, 'gender': Gender,
+    'payment_status': PaymentStatus, 'payment_method': PaymentMethod,
+}
+
+
+def _collect(errors: Dict[str, List[str]], instance, exclude: List[str], names: Optional[Dict[str, str]] = None):
+    """Convert and validate the fields of ``instance`` in place, adding their errors to ``errors``.
+
+    Foreign keys must be excluded: validating them would load the related rows.
+    The fields the form does not fill (search names, counters) are skipped.
+    The errors are keyed by the form inputs in ``names``, which default to
+    those of the booking form.
+    """
+    exclude = [*exclude, *(field.name for field in instance._meta.concrete_fields if not field.editable)]
+    try:
+        instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+    except ValidationError as error:
+        if names is None:
+            names = FORM_FIELDS.get(type(instance), {})
+        for field, messages in error.message_dict.items():
+            errors.setdefault(names.get(field, field), []).extend(messages)
+
+
+def _choice(errors: Dict[str, List[str]], choices, value, field: str):
+    try:
+        return choice_value(choices, value)
+    except ValueError:
+        errors.setdefault(field, []).append(f"Select one of {', '.join(choices.labels)}.")
+
+
+def _id(errors: Dict[str, List[str]], value, field: str, required: bool = True) -> Optional[int]:
+    if value in (None, ''):
+        if required:
+            errors.setdefault(field, []).append("This field is required.")
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        errors.setdefault(field, []).append(f"{value!r} is not a valid id.")
+
+
+def _references(vet_id: int, pet_id: Optional[int], owner_id: Optional[int],
+                species: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return the vet and, when given, the pet's owner, the owner and the species found, in one query.
+
+    Returns None when the vet does not exist.
+    """
+    annotations = {}
+    if pet_id is not None:
+        annotations['pet_owner'] = Subquery(Pet.objects.filter(pk=pet_id).values('owner_id'))
+    if owner_id is not None:
+        annotations['owner'] = Subquery(Owner.objects.filter(pk=owner_id).values('pk'))
+    if species:
+        annotations['species'] = Subquery(Species.objects.filter(name=species).values('pk'))
+    return Veterinarian.objects.filter(pk=vet_id).values('pk', **annotations).first()
+
+
+def book_appointment(data) -> Appointment:
+    """Create an appointment from the booking form, with a new owner and pet when the form describes them.
+
+    ``data`` holds the POSTed fields: the appointment, then either
+    ``existing_pet``, or a new pet for ``existing_owner`` or for a new owner.
+    Raises ``ValidationError`` with every invalid field; nothing is written
+    in that case.
+    """
+    errors = {}
+    appointment = Appointment(
+        appointment_date=data.get('appointment_date'),
+        appointment_time=data.get('appointment_time'),
+        reason=data.get('reason'),
+        status=_choice(errors, AppointmentStatus, data.get('status'), 'status'),
+    )
+    _collect(errors, appointment, exclude=['pet', 'owner', 'vet', 'status'])
+    vet_id = _id(errors, data.get('vet'), 'vet')
+    pet_id = _id(errors, data.get('existing_pet'), 'existing_pet', required=False)
+
+    owner_id = owner = pet = species = None
+    if pet_id is None:
+        owner_id = _id(errors, data.get('existing_owner'), 'existing_owner', required=False)
+        if owner_id is None:
+            owner = Owner(
+                first_name=data.get('first_name'), last_name=data.get('last_name'), address=data.get('address'),
+                phone_number=data.get('phone'), email=data.get('email'), registration_date=timezone.now(),
+            )
+            owner.search_name = owner.build_search_name()
+            _collect(errors, owner, exclude=[])
+        species = data.get('species') or ''
+        if species.lower() == 'other':
+            species = data.get('new_species') or ''
+        species = Species.normalize(species)
+        if not species:
+            errors.setdefault('species', []).append("This field is required.")
+        pet = Pet(
+            name=data.get('pet_name'), breed=(data.get('breed') or '').lower(), date_of_birth=data.get('date_of_birth'),
+            gender=_choice(errors, Gender, data.get('gender'), 'gender'), weight=data.get('weight'),
+        )
+        pet.search_name = pet.build_search_name()
+        _collect(errors, pet, exclude=['owner', 'species', 'gender'])
+    if errors:
+        raise ValidationError(errors)
+
+    references = _references(vet_id, pet_id, owner_id, species)
+    if references is None:
+        raise ValidationError({'vet': [f"No veterinarian {vet_id}."]})
+    if pet_id is not None and references['pet_owner'] is None:
+        raise ValidationError({'existing_pet': [f"No pet {pet_id}."]})
+    if owner_id is not None and references['owner'] is None:
+        raise ValidationError({'existing_owner': [f"No owner {owner_id}."]})
+
+    with transaction.atomic():
+        if pet is not None:
+            if owner is not None:
+                owner.save(force_insert=True)
+                owner_id = owner.pk
+            pet.owner_id = owner_id
+            pet.species_id = references['species'] or Species.get_for_name(species).pk
+            pet.save(force_insert=True)
+            pet_id = pet.pk
+        else:
+            owner_id = references['pet_owner']
+        appointment.pet_id, appointment.owner_id, appointment.vet_id = pet_id, owner_id, vet_id
+        appointment.save(force_insert=True)
+    return appointment
+
+
+def _posted(data, names: Dict[str, str]) -> Dict[str, Any]:
+    """Return the POSTed values of the model fields in ``names`` (model field to form input) that were sent."""
+    return {field: data[name] for field, name in names.items() if name in data}
+
+
+def _changes(errors: Dict[str, List[str]], instance, values: Dict[str, Any], names: Dict[str, str]) -> List[str]:
+    """Set ``values`` on ``instance`` and return the names of the fields whose value changed.
+
+    The values are converted and validated like the booking form's; the
+    ``version`` the form was rendered from is compared with the stored one.
+    """
+    values = dict(values)
+    version = _id(errors, values.pop('version', instance.version), names.get('version', 'version'))
+    if version is not None and version != instance.version:
+        raise StaleEdit.of(instance)
+    for field, choices in CHOICE_FIELDS.items():
+        if field in values:
+            values[field] = _choice(errors, choices, values[field], names.get(field, field))
+            if values[field] is None:
+                del values[field]
+    previous = {field: getattr(instance, field) for field in values}
+    for field, value in values.items():
+        setattr(instance, field, value)
+    # Foreign keys were converted by the caller
+    exclude = [field.name for field in instance._meta.concrete_fields
+               if field.is_relation or (field.name not in values and field.attname not in values)]
+    _collect(errors, instance, exclude, names)
+
+    changed = []
+    for field, value in previous.items():
+        current = getattr(instance, field)
+        if isinstance(current, datetime) and timezone.is_naive(current):
+            # datetime-local inputs carry no time zone
+            current = timezone.make_aware(current)
+            setattr(instance, field, current)
+        if current != value:
+            changed.append(field)
+    return changed
+
+
+def _save_changes(instance, changed: List[str]):
+    """Write the ``changed`` columns of ``instance``, if any, with a single UPDATE."""
+    if changed:
+        instance.save(update_fields=changed)
+
+
+def _raise_errors(errors: Dict[str, List[str]]):
+    if errors:
+        raise ValidationError(errors)
+
+
+def _check_vet(appointment: Appointment, changed: List[str]):
+    if 'vet_id' in changed and not Veterinarian.objects.filter(pk=appointment.vet_id).exists():
+        raise ValidationError({'vet': [f"No veterinarian {appointment.vet_id}."]})
+
+
+def edit_appointment(appointment: Appointment, data) -> List[str]:
+    """Apply the appointment edit form to ``appointment``, with the pet and owner fields it also shows.
+
+    Only the fields that were POSTed and changed are written; the appointment,
+    its pet and its owner are saved in one transaction. Returns the names of
+    the changed appointment fields.
+    """
+    errors = {}
+    names = {**EDIT_FIELDS[Appointment], 'version': 'version'}
+    values = _posted(data, names)
+    if 'vet_id' in values:
+        # The vet list of the form starts with a placeholder, which is not sent
+        values['vet_id'] = _id(errors, values['vet_id'], 'vet')
+    changed = _changes(errors, appointment, values, names)
+
+    pet_values = _posted(data, APPOINTMENT_PET_FIELDS)
+    owner_values = _posted(data, APPOINTMENT_OWNER_FIELDS)
+    pet_changed = owner_changed = []
+    if pet_values:
+        pet_changed = _changes(errors, appointment.pet, pet_values, APPOINTMENT_PET_FIELDS)
+    if owner_values:
+        owner_changed = _changes(errors, appointment.owner, owner_values, APPOINTMENT_OWNER_FIELDS)
+    _raise_errors(errors)
+    _check_vet(appointment, changed)
+
+    if not (changed or pet_changed or owner_changed):
+        return changed
+    with transaction.atomic():
+        _save_changes(appointment.pet, pet_changed)
+        _save_changes(appointment.owner, owner_changed)
+        _save_changes(appointment, changed)
+    return changed
+
+
+def edit_pet(pet: Pet, data) -> List[str]:
+    """Apply the pet edit form to ``pet`` and return the names of the changed fields."""
+    errors = {}
+    names = {**EDIT_FIELDS[Pet], 'version': 'version'}
+    values = _posted(data, names)
+    species = Species.normalize(values.pop('species', None) or pet.species.name)
+    if 'breed' in values:
+        values['breed'] = (values['breed'] or '').lower()
+    changed = _changes(errors, pet, values, names)
+    _raise_errors(errors)
+    if not changed and species == pet.species.name:
+        return changed
+
+    with transaction.atomic():
+        if species != pet.species.name:
+            pet.species = Species.get_for_name(species)
+            changed.append('species')
+        _save_changes(pet, changed)
+    return changed
+
+
+def _edit(instance: models.Model, data) -> List[str]:
+    """Apply the edit form of a row without related fields and return the names of the changed fields."""
+    errors = {}
+    names = {**EDIT_FIELDS[type(instance)], 'version': 'version'}
+    changed = _changes(errors, instance, _posted(data, names), names)
+    _raise_errors(errors)
+    if changed:
+        with transaction.atomic():
+            _save_changes(instance, changed)
+    return changed
+
+
+def edit_owner(owner: Owner, data) -> List[str]:
+    """Apply the owner edit form to ``owner`` and return the names of the changed fields."""
+    return _edit(owner, data)
+
+
+def edit_medical_record(medical_record: MedicalRecord, data) -> List[str]:
+    """Apply the medical record edit form to ``medical_record`` and return the names of the changed fields."""
+    return _edit(medical_record, data)
+
+
+def edit_billing(billing: Billing, data) -> List[str]:
+    """Apply the billing edit form to ``billing`` and return the names of the changed fields."""
+    return _edit(billing, data)
@@ -0,0 +1,150 @@
+"""Signal receivers that keep derived tables in sync with the clinic data and refuse double bookings."""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from paw_n_care import rollups, scheduling, search
+from paw_n_care.cache import bump_model_version
+from paw_n_care.models import Appointment, Billing, MedicalRecord, Owner, Pet, Species, Veterinarian
+
+# Models whose counter columns are maintained from the rows of each sender
+COUNTED_BY = {
+    Appointment: [Owner, Pet, Veterinarian],
+    Billing: [Owner, Veterinarian],
+}
+
+
+@receiver(pre_save, sender=Owner)
+@receiver(pre_save, sender=Pet)
+@receiver(pre_save, sender=Veterinarian)
+def fill_search_name(sender, instance, raw=False, **kwargs):
+    """Fill the prefix-lookup column of rows loaded from fixtures, which bypass ``Model.save``."""
+    if raw:
+        instance.search_name = instance.build_search_name()
+
+
+@receiver(pre_save, sender=Appointment)
+def refuse_double_booking(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refuse to save an appointment moved to a time its vet is already booked."""
+    if raw or (update_fields is not None and not scheduling.SLOT_FIELDS & set(update_fields)) \
+            or not instance.slot_changed() or instance.slot_checked():
+        return
+    scheduling.check_vet_is_free(instance)
+
+
+@receiver(pre_save, sender=Appointment)
+@receiver(pre_save, sender=Billing)
+@receiver(pre_save, sender=MedicalRecord)
+def remember_rollup_contributions(sender, instance, raw=False, **kwargs):
+    """Remember what the stored row contributed to the rollups before it is overwritten."""
+    if raw:
+        return
+    instance._rollup_contributions = rollups.previous_contributions(instance)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=Billing)
+@receiver(post_save, sender=MedicalRecord)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    """Replace the previous rollup contributions of a saved row with the new ones."""
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_contributions', [])
+    current = rollups.CONTRIBUTIONS[sender](instance)
+    if previous == current:
+        return
+    with transaction.atomic():
+        rollups.apply_contributions(previous, sign=-1)
+        rollups.apply_contributions(current)
+        if sender is Appointment and previous:
+            rollups.reattribute_bills(instance, previous)
+    instance._rollup_contributions = current
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=Billing)
+@receiver(post_delete, sender=MedicalRecord)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    """Subtract the rollup contributions of a deleted row."""
+    with transaction.atomic():
+        rollups.apply_contributions(rollups.CONTRIBUTIONS[sender](instance), sign=-1)
+
+
+@receiver(pre_save, sender=Appointment)
+@receiver(pre_save, sender=Billing)
+@receiver(pre_save, sender=MedicalRecord)
+@receiver(pre_save, sender=Owner)
+@receiver(pre_save, sender=Pet)
+@receiver(pre_save, sender=Species)
+@receiver(pre_save, sender=Veterinarian)
+def remember_indexed_rows(sender, instance, raw=False, **kwargs):
+    """Remember which search documents include the stored version of an updated row."""
+    if raw or instance.pk is None:
+        return
+    instance._search_rows = search.indexed_rows(instance)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=Billing)
+@receiver(post_save, sender=MedicalRecord)
+@receiver(post_save, sender=Owner)
+@receiver(post_save, sender=Pet)
+@receiver(post_save, sender=Species)
+@receiver(post_save, sender=Veterinarian)
+def update_search_index_on_save(sender, instance, created, raw=False, **kwargs):
+    """Re-index the search documents that include the saved row, before and after the change."""
+    if raw:
+        return
+    affected = getattr(instance, '_search_rows', {})
+    # A new row is also listed in the documents of the rows it references, such as a new pet in its owner's
+    current = search.indexed_rows(instance)
+    for index in set(affected) | set(current):
+        index.refresh(affected.get(index, set()) | current.get(index, set()))
+    instance._search_rows = {}
+
+
+@receiver(pre_delete, sender=Appointment)
+@receiver(pre_delete, sender=Billing)
+@receiver(pre_delete, sender=MedicalRecord)
+@receiver(pre_delete, sender=Owner)
+@receiver(pre_delete, sender=Pet)
+@receiver(pre_delete, sender=Species)
+@receiver(pre_delete, sender=Veterinarian)
+def remember_indexed_rows_on_delete(sender, instance, **kwargs):
+    """Remember which search documents include a row that is about to be deleted."""
+    instance._search_rows = search.indexed_rows(instance)
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=Billing)
+@receiver(post_delete, sender=MedicalRecord)
+@receiver(post_delete, sender=Owner)
+@receiver(post_delete, sender=Pet)
+@receiver(post_delete, sender=Species)
+@receiver(post_delete, sender=Veterinarian)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    """Drop the document of a deleted row and re-index the documents that included it."""
+    for index, pks in getattr(instance, '_search_rows', {}).items():
+        index.refresh(pks)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=Billing)
+@receiver(post_save, sender=MedicalRecord)
+@receiver(post_save, sender=Owner)
+@receiver(post_save, sender=Pet)
+@receiver(post_save, sender=Species)
+@receiver(post_save, sender=Veterinarian)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=Billing)
+@receiver(post_delete, sender=MedicalRecord)
+@receiver(post_delete, sender=Owner)
+@receiver(post_delete, sender=Pet)
+@receiver(post_delete, sender=Species)
+@receiver(post_delete, sender=Veterinarian)
+def invalidate_search_cache(sender, **kwargs):
+    """Make the cached search pages that read the changed table unreachable."""
+    bump_model_version(sender)
+    # The counter columns of these rows changed along with the appointment or bill
+    for model in COUNTED_BY.get(sender, []):
+        bump_model_version(model)
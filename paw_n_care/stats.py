@@ -0,0 +1,248 @@
+"""Statistics engine for the statistic page.
+
+Every scalar widget on the page is collected with one conditional-aggregation
+query per table instead of one COUNT/SUM/AVG query per widget. Appointment,
+billing and medical record figures are read from the rollup tables maintained
+by :mod:`paw_n_care.rollups`, so their cost does not grow with the history.
+Per-vet figures and the top vet come from the counter columns of the vets.
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, PaymentMethod, PaymentStatus, Pet, Veterinarian,
+    DailyAppointmentRollup, DailyBillingRollup, VetPetRollup, MedicalRecordRollup,
+)
+
+
+def _percentage(part, whole) -> int:
+    """Return ``part`` as a rounded percentage of ``whole`` (0 when ``whole`` is empty)."""
+    return round(part / whole * 100) if whole else 0
+
+
+@dataclass
+class ClinicStatistics:
+    """Typed result of :func:`collect_statistics`."""
+
+    # Individual statistics for the selected veterinarian
+    appointments: int = 0
+    pets_managed: int = 0
+    bills_paid: Decimal = Decimal('0')
+
+    # Totals for all veterinarians
+    total_appointments: int = 0
+    total_pets_managed: int = 0
+    total_bills_paid: Decimal = Decimal('0')
+
+    # Clinic-wide statistics
+    monthly_appointments: int = 0
+    returning_owners: int = 0
+    most_frequent_species: str = 'N/A'
+    appointments_with_medications: int = 0
+
+    # Pet average weight statistics
+    dog_avg_weight: Decimal = Decimal('0')
+    cat_avg_weight: Decimal = Decimal('0')
+    other_avg_weight: Decimal = Decimal('0')
+
+    # Appointment statistics
+    top_vet_full_name: str = ''
+    scheduled_count: int = 0
+    completed_count: int = 0
+    cancelled_count: int = 0
+    top_3_diagnoses: List[Dict[str, Any]] = field(default_factory=list)
+    top_3_treatments: List[Dict[str, Any]] = field(default_factory=list)
+
+    # Billing & payment analysis
+    avg_billing_amount: Decimal = Decimal('0')
+    sum_billing_this_month: Decimal = Decimal('0')
+    total_invoices: int = 0
+    paid_count: int = 0
+    pending_count: int = 0
+    overdue_count: int = 0
+    credit_card_count: int = 0
+    cash_count: int = 0
+    bank_transfer_count: int = 0
+
+    def as_context(self) -> Dict[str, Any]:
+        """Return the template context used by ``statistic.html``."""
+        return {
+            # Individual vet statistics
+            'appointments': self.appointments,
+            'pets_managed': self.pets_managed,
+            'bills_paid': self.bills_paid,
+            'appointment_percentage': _percentage(self.appointments, self.total_appointments),
+            'pets_managed_percentage': _percentage(self.pets_managed, self.total_pets_managed),
+            'bills_paid_percentage': _percentage(self.bills_paid, self.total_bills_paid),
+
+            # Clinic-wide statistics
+            'avg_monthly_appointments': self.monthly_appointments,
+            'returning_owners': self.returning_owners,
+            'most_frequent_species': self.most_frequent_species,
+            'medication_percentage': _percentage(self.appointments_with_medications, self.total_appointments),
+
+            # Pet Average Weight Statistics
+            'dog_avg_weight': self.dog_avg_weight,
+            'cat_avg_weight': self.cat_avg_weight,
+            'other_avg_weight': self.other_avg_weight,
+
+            # Appointment Statistics
+            'top_vets': self.top_vet_full_name,
+            'scheduled_count': self.scheduled_count,
+            'completed_count': self.completed_count,
+            'cancelled_count': self.cancelled_count,
+            'top_3_diagnoses': self.top_3_diagnoses,
+            'top_3_treatments': self.top_3_treatments,
+
+            # Billing & Payment Analysis
+            'avg_billing_amount': self.avg_billing_amount,
+            'sum_billing_this_month': self.sum_billing_this_month,
+            'paid_percentage': _percentage(self.paid_count, self.total_invoices),
+            'pending_percentage': _percentage(self.pending_count, self.total_invoices),
+            'overdue_percentage': _percentage(self.overdue_count, self.total_invoices),
+            'total_invoices': self.total_invoices,
+            # Invoice Status Overview
+            'credit_card_percentage': _percentage(self.credit_card_count, self.total_invoices),
+            'cash_percentage': _percentage(self.cash_count, self.total_invoices),
+            'bank_transfer_percentage': _percentage(self.bank_transfer_count, self.total_invoices),
+        }
+
+
+def collect_statistics(selected_vet_id: Optional[Any]) -> ClinicStatistics:
+    """Collect every statistic shown on the statistic page for ``selected_vet_id``."""
+    stats = ClinicStatistics()
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+    last_year = today - timedelta(days=365)
+    last_six_months = today - timedelta(days=180)
+
+    _collect_vet_statistics(stats, selected_vet_id)
+    _collect_appointment_statistics(stats, selected_vet_id, month_start, next_month_start, last_year)
+    _collect_billing_statistics(stats, month_start, next_month_start)
+    _collect_pet_statistics(stats)
+    _collect_medical_record_statistics(stats)
+    _collect_returning_owners(stats, last_six_months)
+    return stats
+
+
+def _collect_vet_statistics(stats, selected_vet_id):
+    """Fill the per-vet and all-vet totals and the top vet from the vet counters, one row per vet."""
+    vets = list(Veterinarian.objects.order_by('vet_id').values(
+        'vet_id', 'first_name', 'last_name', 'appointment_count', 'completed_count', 'billed_total'
+    ))
+    stats.total_appointments = sum(vet['appointment_count'] for vet in vets)
+    stats.total_bills_paid = sum((vet['billed_total'] for vet in vets), Decimal('0'))
+    for vet in vets:
+        if str(vet['vet_id']) == str(selected_vet_id):
+            stats.appointments = vet['appointment_count']
+            stats.bills_paid = vet['billed_total']
+    top_vet = max(vets, key=lambda vet: vet['completed_count'], default=None)
+    if top_vet and top_vet['completed_count'] > 0:
+        stats.top_vet_full_name = f"{top_vet['first_name']} {top_vet['last_name']}"
+
+
+def _collect_appointment_statistics(stats, selected_vet_id, month_start, next_month_start, last_year):
+    """Fill the appointment counters from the daily appointment rollups."""
+    in_last_year = Q(date__gte=last_year)
+    totals = DailyAppointmentRollup.objects.aggregate(
+        monthly=Sum('appointment_count', filter=Q(date__gte=month_start, date__lt=next_month_start)),
+        scheduled=Sum('appointment_count', filter=Q(status=AppointmentStatus.SCHEDULED) & in_last_year),
+        completed=Sum('appointment_count', filter=Q(status=AppointmentStatus.COMPLETED) & in_last_year),
+        cancelled=Sum('appointment_count', filter=Q(status=AppointmentStatus.CANCELLED) & in_last_year),
+    )
+    stats.monthly_appointments = totals['monthly'] or 0
+    stats.scheduled_count = totals['scheduled'] or 0
+    stats.completed_count = totals['completed'] or 0
+    stats.cancelled_count = totals['cancelled'] or 0
+    stats.pets_managed = VetPetRollup.objects.filter(
+        vet_id=selected_vet_id, appointment_count__gt=0
+    ).count()
+
+
+def _collect_billing_statistics(stats, month_start, next_month_start):
+    """Fill the billing sums and invoice counters from the daily billing rollups."""
+    totals = DailyBillingRollup.objects.aggregate(
+        this_month=Sum('total_amount', filter=Q(date__gte=month_start, date__lt=next_month_start)),
+        invoices=Sum('bill_count'),
+        paid=Sum('bill_count', filter=Q(payment_status=PaymentStatus.PAID)),
+        pending=Sum('bill_count', filter=Q(payment_status=PaymentStatus.PENDING)),
+        overdue=Sum('bill_count', filter=Q(payment_status=PaymentStatus.OVERDUE)),
+        credit_card=Sum('bill_count', filter=Q(payment_method=PaymentMethod.CREDIT_CARD)),
+        cash=Sum('bill_count', filter=Q(payment_method=PaymentMethod.CASH)),
+        bank_transfer=Sum('bill_count', filter=Q(payment_method=PaymentMethod.BANK_TRANSFER)),
+    )
+    stats.sum_billing_this_month = totals['this_month'] or 0
+    stats.total_invoices = totals['invoices'] or 0
+    stats.avg_billing_amount = stats.total_bills_paid / stats.total_invoices if stats.total_invoices else 0
+    stats.paid_count = totals['paid'] or 0
+    stats.pending_count = totals['pending'] or 0
+    stats.overdue_count = totals['overdue'] or 0
+    stats.credit_card_count = totals['credit_card'] or 0
+    stats.cash_count = totals['cash'] or 0
+    stats.bank_transfer_count = totals['bank_transfer'] or 0
+
+
+def _collect_pet_statistics(stats):
+    """Fill the pet totals, species weights and most frequent species."""
+    common_species = ['Dog', 'Cat']
+    totals = Pet.objects.aggregate(
+        total=Count('pet_id'),
+        dog=Avg('weight', filter=Q(species__name='Dog')),
+        cat=Avg('weight', filter=Q(species__name='Cat')),
+        other=Avg('weight', filter=~Q(species__name__in=common_species)),
+    )
+    stats.total_pets_managed = totals['total']
+    stats.dog_avg_weight = totals['dog'] or 0
+    stats.cat_avg_weight = totals['cat'] or 0
+    stats.other_avg_weight = totals['other'] or 0
+
+    # Only the two most frequent species are needed to detect a tie
+    top_species = list(Pet.objects.values('species__name')
+                       .annotate(count=Count('pet_id'))
+                       .order_by('-count')[:2])
+    if len(top_species) > 1 and top_species[0]['count'] == top_species[1]['count']:
+        stats.most_frequent_species = 'N/A'
+    elif top_species:
+        stats.most_frequent_species = top_species[0]['species__name']
+
+
+def _collect_medical_record_statistics(stats):
+    """Fill the medication counter and the top diagnoses and treatments from the medical record rollups."""
+    stats.appointments_with_medications = MedicalRecordRollup.objects.aggregate(
+        total=Sum('medication_count')
+    )['total'] or 0
+    stats.top_3_diagnoses = list(MedicalRecordRollup.objects.values('diagnosis')
+                                 .annotate(count=Sum('record_count'))
+                                 .filter(count__gt=0)
+                                 .order_by('-count')[:3])
+    stats.top_3_treatments = list(MedicalRecordRollup.objects.values('treatment')
+                                  .annotate(count=Sum('record_count'))
+                                  .filter(count__gt=0)
+                                  .order_by('-count')[:3])
+
+
+def returning_owners(since):
+    """Return one row per owner with more than one completed appointment after ``since``.
+
+    The filter is a range on ``(status, appointment_date)`` answered from
+    ``appointment_status_date_idx``, so only the last six months are read.
+    """
+    return Appointment.objects.filter(
+        status=AppointmentStatus.COMPLETED,
+        appointment_date__gt=since,
+    ).values('owner_id').annotate(
+        appointment_count=Count('appointment_id')
+    ).filter(
+        appointment_count__gt=1
+    )
+
+
+def _collect_returning_owners(stats, since):
+    """Count owners with more than one completed appointment since ``since``."""
+    stats.returning_owners = returning_owners(since).count()
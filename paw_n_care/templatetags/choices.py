@@ -0,0 +1,23 @@
+"""Template filters of integer-coded choice fields."""
+from django import template
+
+from paw_n_care.models import AppointmentStatus, Gender, PaymentMethod, PaymentStatus
+
+register = template.Library()
+
+# Choices of the coded columns, by the column name used in ``.values()`` rows
+CHOICES = {
+    'status': AppointmentStatus,
+    'payment_status': PaymentStatus,
+    'payment_method': PaymentMethod,
+    'gender': Gender,
+}
+
+
+@register.filter
+def choice_label(value, field):
+    """Return the label of the code ``value`` of ``field``, e.g. ``{{ row.status|choice_label:'status' }}``."""
+    try:
+        return CHOICES[field](value).label
+    except ValueError:
+        return value
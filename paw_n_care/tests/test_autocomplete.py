@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import Owner, Pet, Species, Veterinarian, Appointment, AppointmentStatus, Gender
+from paw_n_care.utils import normalize_name
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        self.owner = Owner.objects.create(
+            first_name="Zoë", last_name="Martin", address="XYZ Road",
+            phone_number="5555555555", email="zoe@example.com", registration_date=timezone.now()
+        )
+        self.bella = Pet.objects.create(
+            owner=self.owner, name="Bella", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=timezone.localdate() - timedelta(days=365), gender=Gender.FEMALE, weight=10
+        )
+        self.benny = Pet.objects.create(
+            owner=self.owner, name="  benny ", species=Species.get_for_name("Cat"), breed="Persian",
+            date_of_birth=timezone.localdate() - timedelta(days=365), gender=Gender.MALE, weight=4
+        )
+        self.max = Pet.objects.create(
+            owner=self.owner, name="Max", species=Species.get_for_name("Dog"), breed="Poodle",
+            date_of_birth=timezone.localdate() - timedelta(days=365), gender=Gender.MALE, weight=8
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.appointment = Appointment.objects.create(
+            pet=self.max, owner=self.owner, vet=self.vet, appointment_date=timezone.localdate(),
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.SCHEDULED
+        )
+
+    def lookup(self, source, **params):
+        response = self.client.get(reverse('paw_n_care:autocomplete', args=[source]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_search_name_is_normalized_and_kept_up_to_date(self):
+        self.assertEqual(normalize_name("  Zoë ", "MARTIN"), "zoe martin")
+        self.assertEqual(Owner.objects.get(pk=self.owner.pk).search_name, "zoe martin")
+
+        self.max.name = "Maximus"
+        self.max.save(update_fields=['name'])
+        self.assertEqual(Pet.objects.get(pk=self.max.pk).search_name, "maximus")
+
+    def test_pets_match_name_prefix_case_insensitively(self):
+        results = self.lookup('pets', q="BE")
+        self.assertEqual([result['id'] for result in results], [self.bella.pet_id, self.benny.pet_id])
+        self.assertIn("owner: Zoë", results[0]['label'])
+
+    def test_limit_is_applied(self):
+        self.assertEqual(len(self.lookup('pets', q="b", limit=1)), 1)
+        self.assertEqual(self.lookup('pets', q=""), [])
+
+    def test_owners_and_vets(self):
+        self.assertEqual(self.lookup('owners', q="zoe")[0]['id'], self.owner.owner_id)
+        self.assertEqual(self.lookup('vets', q="sara c")[0]['id'], self.vet.vet_id)
+        self.assertEqual(self.lookup('vets', q="connor"), [])
+
+    def test_appointments_match_id_or_pet_name(self):
+        self.assertEqual(self.lookup('appointments', q="max")[0]['id'], self.appointment.appointment_id)
+        self.assertEqual(self.lookup('appointments', q=str(self.appointment.appointment_id))[0]['id'],
+                         self.appointment.appointment_id)
+        self.assertEqual(self.lookup('appointments', q="bella"), [])
+
+    def test_unknown_source(self):
+        response = self.client.get(reverse('paw_n_care:autocomplete', args=['bills']), {'q': 'a'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_forms_do_not_embed_the_tables(self):
+        response = self.client.get(reverse('paw_n_care:appointments'))
+        self.assertNotContains(response, "Bella")
+        self.assertContains(response, reverse('paw_n_care:autocomplete', args=['pets']))
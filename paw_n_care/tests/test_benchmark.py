@@ -0,0 +1,29 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from paw_n_care.management.commands.benchmark_views import Command
+
+
+class BenchmarkViewsTest(TestCase):
+    def setUp(self):
+        call_command('generate_data', appointments=100, seed=3, stdout=StringIO())
+        self.command = Command(stdout=StringIO())
+        self.command.repeat = 2
+        self.command.warm_cache = False
+
+    def test_every_url_is_a_target(self):
+        labels = [label for label, _, _ in self.command.benchmark_targets()]
+        for name in ['login', 'home', 'owner-home', 'appointments', 'statistic', 'edit_appointment',
+                     'edit_billing', 'autocomplete', 'home?search']:
+            self.assertIn(name, labels)
+        self.assertEqual(len(labels), len(set(labels)))
+
+    def test_measure_reports_latency_queries_and_memory(self):
+        measurement = self.command.measure(Client(), '/home/', {})
+        self.assertEqual(measurement['status'], 200)
+        self.assertEqual(measurement['queries'], 1)
+        self.assertGreater(measurement['median_ms'], 0)
+        self.assertGreater(measurement['peak_memory_kb'], 0)
+
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.cache import searched_models
+from paw_n_care.models import Owner, Pet, Species, Veterinarian, Appointment, AppointmentStatus, Gender
+from paw_n_care.search import APPOINTMENT_SEARCH_CONFIG
+
+
+class SearchCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com",
+            registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Maximus", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=today - timedelta(days=365), gender=Gender.MALE, weight=15.2
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=today,
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.SCHEDULED
+        )
+
+    def search(self, query):
+        return self.client.get(reverse('paw_n_care:home'), {
+            'search-dropdown': 'all_categories', 'search-query': query
+        })
+
+    def test_searched_models(self):
+        self.assertEqual(searched_models(APPOINTMENT_SEARCH_CONFIG), [Appointment, Owner, Pet, Veterinarian])
+
+    def test_repeated_search_skips_the_database(self):
+        self.assertEqual(len(self.search('Maximus').context['appointments']), 1)
+        with self.assertNumQueries(0):
+            response = self.search('  maximus ')
+        self.assertEqual(len(response.context['appointments']), 1)
+
+    def test_related_write_invalidates_cached_pages(self):
+        self.assertEqual(len(self.search('Maximus').context['appointments']), 1)
+        self.pet.name = "Rex"
+        self.pet.save()
+        self.assertEqual(len(self.search('Maximus').context['appointments']), 0)
+        self.assertEqual(len(self.search('Rex').context['appointments']), 1)
+
+    def test_delete_invalidates_cached_pages(self):
+        self.assertEqual(len(self.search('Checkup').context['appointments']), 1)
+        Appointment.objects.all().delete()
+        self.assertEqual(len(self.search('Checkup').context['appointments']), 0)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Owner, Pet, Species, Veterinarian, Appointment, Billing,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus, choice_value,
+)
+
+
+class ChoiceValueTest(TestCase):
+    def test_codes_labels_and_names_are_accepted(self):
+        self.assertEqual(choice_value(PaymentMethod, "Credit Card"), PaymentMethod.CREDIT_CARD)
+        self.assertEqual(choice_value(PaymentMethod, "credit_card"), PaymentMethod.CREDIT_CARD)
+        self.assertEqual(choice_value(PaymentMethod, "1"), PaymentMethod.CREDIT_CARD)
+        self.assertEqual(choice_value(AppointmentStatus, " COMPLETED "), AppointmentStatus.COMPLETED)
+        self.assertEqual(choice_value(Gender, 2), Gender.FEMALE)
+        with self.assertRaises(ValueError):
+            choice_value(PaymentStatus, "Refunded")
+
+    def test_species_names_share_one_row(self):
+        self.assertEqual(Species.get_for_name("  golden   retriever"), Species.get_for_name("Golden Retriever"))
+        self.assertEqual(Species.objects.filter(name="Golden Retriever").count(), 1)
+
+
+class ChoiceFormTest(TestCase):
+    def setUp(self):
+        self.owner = Owner.objects.create(
+            first_name="Alexandra", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+
+    def test_new_pet_species_and_labels_are_normalized(self):
+        self.client.post(reverse('paw_n_care:appointments'), {
+            'vet': self.vet.vet_id, 'appointment_date': timezone.localdate().isoformat(),
+            'appointment_time': '10:00', 'reason': 'Checkup', 'status': 'scheduled',
+            'existing_owner': self.owner.owner_id, 'pet_name': 'Rex', 'species': 'other', 'new_species': 'dOG',
+            'breed': 'Beagle', 'date_of_birth': '2020-01-01', 'gender': 'male', 'weight': '12',
+        })
+        pet = Pet.objects.get(name="Rex")
+        self.assertEqual((pet.species.name, pet.gender), ("Dog", Gender.MALE))
+        self.assertEqual(Appointment.objects.get(pet=pet).status, AppointmentStatus.SCHEDULED)
+
+    def test_billing_home_shows_labels(self):
+        pet = Pet.objects.create(
+            owner=self.owner, name="Rex", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=timezone.localdate() - timedelta(days=365), gender=Gender.MALE, weight=12
+        )
+        appointment = Appointment.objects.create(
+            pet=pet, owner=self.owner, vet=self.vet, appointment_date=timezone.localdate(),
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.COMPLETED
+        )
+        Billing.objects.create(
+            appointment=appointment, total_amount=150, payment_status=PaymentStatus.OVERDUE,
+            payment_method=PaymentMethod.BANK_TRANSFER, payment_date=timezone.now()
+        )
+        response = self.client.get(reverse('paw_n_care:billing-home'))
+        self.assertContains(response, "Overdue")
+        self.assertContains(response, "Bank Transfer")
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Owner, Pet, Veterinarian, Appointment, Billing, MedicalRecord,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus, Species,
+)
+
+
+def counters(instance):
+    """Return the stored counter columns of ``instance``."""
+    return type(instance).objects.filter(pk=instance.pk).values(*instance.counter_fields).get()
+
+
+class CounterMaintenanceTest(TestCase):
+    def setUp(self):
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.other_owner = Owner.objects.create(
+            first_name="Jordan", last_name="Kim", address="ABC Road",
+            phone_number="5555555556", email="jordan@example.com", registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=timezone.localdate() - timedelta(days=365), gender=Gender.MALE, weight=15.2
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.other_vet = Veterinarian.objects.create(
+            first_name="Eva", last_name="Jones", specialization="Exotic",
+            license_number="VET321", phone_number="1111222233", email="eva@example.com"
+        )
+        self.appointment = Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=timezone.localdate(),
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.COMPLETED
+        )
+        self.billing = Billing.objects.create(
+            appointment=self.appointment, total_amount=150, payment_status=PaymentStatus.PAID,
+            payment_method=PaymentMethod.CASH, payment_date=timezone.now()
+        )
+
+    def test_counters_follow_creation(self):
+        self.assertEqual(counters(self.owner), {'appointment_count': 1, 'billed_total': Decimal('150')})
+        self.assertEqual(counters(self.pet), {'appointment_count': 1})
+        self.assertEqual(counters(self.vet),
+                         {'appointment_count': 1, 'completed_count': 1, 'billed_total': Decimal('150')})
+
+    def test_counters_follow_updates(self):
+        self.appointment.vet = self.other_vet
+        self.appointment.owner = self.other_owner
+        self.appointment.status = AppointmentStatus.CANCELLED
+        self.appointment.save()
+        self.billing.total_amount = 200
+        self.billing.save()
+
+        self.assertEqual(counters(self.vet), {'appointment_count': 0, 'completed_count': 0, 'billed_total': 0})
+        self.assertEqual(counters(self.other_vet),
+                         {'appointment_count': 1, 'completed_count': 0, 'billed_total': Decimal('200')})
+        self.assertEqual(counters(self.owner), {'appointment_count': 0, 'billed_total': 0})
+        self.assertEqual(counters(self.other_owner), {'appointment_count': 1, 'billed_total': Decimal('200')})
+
+    def test_counters_follow_deletes(self):
+        self.billing.delete()
+        self.assertEqual(counters(self.owner), {'appointment_count': 1, 'billed_total': 0})
+        self.appointment.delete()
+        self.assertEqual(counters(self.pet), {'appointment_count': 0})
+        self.assertEqual(counters(self.vet), {'appointment_count': 0, 'completed_count': 0, 'billed_total': 0})
+
+    def test_saving_a_stale_row_keeps_the_counters(self):
+        stale_owner = Owner.objects.get(pk=self.owner.pk)
+        Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=timezone.localdate(),
+            appointment_time="11:00", reason="Follow up", status=AppointmentStatus.SCHEDULED
+        )
+        stale_owner.address = "New Road"
+        stale_owner.save()
+        self.assertEqual(counters(self.owner)['appointment_count'], 2)
+        self.assertEqual(Owner.objects.get(pk=self.owner.pk).address, "New Road")
+
+    def test_forms_keep_no_row_when_the_counters_fail(self):
+        posts = [
+            ('paw_n_care:billing', Billing, {'total_amount': '80', 'payment_status': 'Paid',
+                                             'payment_method': 'Cash', 'payment_date': '2026-03-01'}),
+            ('paw_n_care:medical-records', MedicalRecord, {'visit_date': '2026-03-01', 'diagnosis': 'Flu',
+                                                           'treatment': 'Rest', 'prescribed_medication': 'None'}),
+        ]
+        for url, model, data in posts:
+            with self.subTest(model=model.__name__), \
+                    mock.patch('paw_n_care.rollups.apply_contributions', side_effect=RuntimeError):
+                before = model.objects.count()
+                self.client.post(reverse(url), {'appointment_id': self.appointment.pk, **data})
+                self.assertEqual(model.objects.count(), before)
+        self.assertEqual(counters(self.owner), {'appointment_count': 1, 'billed_total': Decimal('150')})
+
+    def test_repair_command_fixes_drift(self):
+        Owner.objects.filter(pk=self.owner.pk).update(appointment_count=7, billed_total=1)
+        Veterinarian.objects.update(completed_count=0)
+
+        output = StringIO()
+        call_command('repair_counters', chunk_size=1, stdout=output)
+        self.assertIn("owners: 1 of 2 rows fixed", output.getvalue())
+        self.assertEqual(counters(self.owner), {'appointment_count': 1, 'billed_total': Decimal('150')})
+        self.assertEqual(counters(self.vet)['completed_count'], 1)
+
+    def test_owner_home_shows_counters(self):
+        response = self.client.get(reverse('paw_n_care:owner-home'))
+        self.assertContains(response, "150.00")
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Owner, Pet, Species, Veterinarian, Appointment, Billing,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus,
+)
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.bills = []
+        for number, name in enumerate(["Maximus", "Maxine"]):
+            pet = Pet.objects.create(
+                owner=self.owner, name=name, species=Species.get_for_name("Dog"), breed="Beagle",
+                date_of_birth=today - timedelta(days=365), gender=Gender.MALE, weight=15.2
+            )
+            appointment = Appointment.objects.create(
+                pet=pet, owner=self.owner, vet=self.vet, appointment_date=today,
+                appointment_time=f"1{number}:00", reason="Checkup", status=AppointmentStatus.COMPLETED
+            )
+            self.bills.append(Billing.objects.create(
+                appointment=appointment, total_amount=100 + number,
+                payment_status=[PaymentStatus.PAID, PaymentStatus.OVERDUE][number],
+                payment_method=PaymentMethod.CASH, payment_date=timezone.now()
+            ))
+
+    def export(self, source, **params):
+        response = self.client.get(reverse('paw_n_care:export', args=[source]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode(), response
+
+    def test_csv_export_of_every_row(self):
+        content, response = self.export('billing')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="billing-', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(row['bill_id']) for row in rows], [bill.bill_id for bill in self.bills])
+        self.assertEqual([row['payment_status'] for row in rows], ["Paid", "Overdue"])
+        self.assertEqual(rows[0]['total_amount'], "100.00")
+
+    def test_export_applies_the_search(self):
+        content, _ = self.export('billing', **{'search-dropdown': 'payment_status', 'search-query': 'overdue'})
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(row['bill_id']) for row in rows], [self.bills[1].bill_id])
+
+    def test_jsonl_export(self):
+        content, response = self.export('appointments', format='jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['pet__name'] for row in rows], ["Maximus", "Maxine"])
+        self.assertEqual(rows[0]['status'], "Completed")
+        self.assertEqual(rows[0]['appointment_date'], timezone.localdate().isoformat())
+
+    def test_owners_matching_several_pets_are_exported_once(self):
+        content, _ = self.export('owners', format='jsonl', **{'search-dropdown': 'pet', 'search-query': 'Max'})
+        self.assertEqual([json.loads(line)['owner_id'] for line in content.splitlines()], [self.owner.owner_id])
+
+    def test_every_list_has_an_export(self):
+        for name, source in [('home', 'appointments'), ('pet-home', 'pets'), ('owner-home', 'owners'),
+                             ('medical-record-home', 'medical-records'), ('billing-home', 'billing')]:
+            with self.subTest(source):
+                response = self.client.get(reverse(f'paw_n_care:{name}'), {'search-query': 'Max'})
+                self.assertContains(response, f"{reverse('paw_n_care:export', args=[source])}?search-query=Max")
+                self.export(source)
+
+    def test_unknown_export(self):
+        self.assertEqual(self.client.get(reverse('paw_n_care:export', args=['vets'])).status_code, 404)
+        response = self.client.get(reverse('paw_n_care:export', args=['pets']), {'format': 'xlsx'})
+        self.assertEqual(response.status_code, 404)
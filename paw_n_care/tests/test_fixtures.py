@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from paw_n_care.management.commands.load_fixtures import DATA_DIR, iter_fixture
+from paw_n_care.models import Owner, Pet, Species, Appointment, Billing, MedicalRecord, DailyAppointmentRollup
+from paw_n_care.search import OWNER_SEARCH_CONFIG, handle_search
+
+
+def write_fixture(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as fixture:
+        fixture.write(content if isinstance(content, str) else json.dumps(content))
+    return path
+
+
+class IterFixtureTest(SimpleTestCase):
+    def test_objects_split_across_blocks(self):
+        entries = [{'model': 'paw_n_care.species', 'pk': pk, 'fields': {'name': f'Odd [{pk}], "name" {{'}}
+                   for pk in range(1, 30)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, 'species.json', json.dumps(entries, indent=4))
+            self.assertEqual(list(iter_fixture(path, read_size=7)), entries)
+
+    def test_invalid_fixtures(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for content in ['{"model": "paw_n_care.species"}', '[{"model": "paw_n_care.species"', '[1, 2]']:
+                with self.subTest(content), self.assertRaises(CommandError):
+                    list(iter_fixture(write_fixture(directory, 'bad.json', content), read_size=4))
+
+
+class LoadFixturesTest(TestCase):
+    def load(self, *paths):
+        call_command('load_fixtures', *paths, batch_size=10, stdout=StringIO())
+
+    def test_bundled_data(self):
+        self.load()
+        expected = {}
+        for path in DATA_DIR.glob('*.json'):
+            for entry in iter_fixture(path):
+                expected[entry['model']] = expected.get(entry['model'], 0) + 1
+        for model in (Owner, Pet, Appointment, Billing, MedicalRecord):
+            self.assertEqual(model.objects.count(), expected[model._meta.label_lower], model)
+
+        # The derived tables bypassed by bulk_create are rebuilt
+        owner = Owner.objects.get(pk=1)
+        self.assertEqual(owner.appointment_count, owner.appointments.count())
+        self.assertEqual(owner.search_name, f"{owner.first_name} {owner.last_name}".lower())
+        self.assertTrue(DailyAppointmentRollup.objects.exists())
+        results, _, _ = handle_search(Owner.objects.all(), 'all_categories', owner.first_name, OWNER_SEARCH_CONFIG)
+        self.assertIn(owner.owner_id, [row['owner_id'] for row in results])
+
+    def test_dependency_order_and_overwrites(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Named so the pets would be read before their owner and species
+            pets = write_fixture(directory, 'a_pets.json', [{
+                'model': 'paw_n_care.pet', 'pk': 7, 'fields': {
+                    'owner': 3, 'name': 'Rex', 'species': 9, 'breed': 'Boxer',
+                    'date_of_birth': '2022-03-15', 'gender': 1, 'weight': '20.50',
+                },
+            }])
+            write_fixture(directory, 'b_owners.json', [{
+                'model': 'paw_n_care.owner', 'pk': 3, 'fields': {
+                    'first_name': 'Alex', 'last_name': 'Lee', 'address': 'XYZ Road', 'phone_number': '5555555555',
+                    'email': 'alex@example.com', 'registration_date': '2024-01-10T08:30:00',
+                },
+            }, {'model': 'paw_n_care.species', 'pk': 9, 'fields': {'name': 'Ferret'}}])
+            self.load(directory)
+            pet = Pet.objects.select_related('owner', 'species').get(pk=7)
+            self.assertEqual((pet.owner.first_name, pet.species.name), ('Alex', 'Ferret'))
+            self.assertIsNotNone(pet.owner.registration_date.tzinfo)
+
+            # Loading again overwrites the rows with the same keys, as loaddata does
+            with open(pets) as fixture:
+                content = fixture.read().replace('Rex', 'Max')
+            write_fixture(directory, 'a_pets.json', content)
+            self.load(directory)
+            self.assertEqual(list(Pet.objects.values_list('name', flat=True)), ['Max'])
+            self.assertEqual(Species.objects.get(pk=9).name, 'Ferret')
+
+    def test_unknown_model(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_fixture(directory, 'vets.json', [{'model': 'paw_n_care.nurse', 'pk': 1, 'fields': {}}])
+            with self.assertRaises(CommandError):
+                self.load(directory)
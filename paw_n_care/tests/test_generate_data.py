@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from paw_n_care.models import (
+    Owner, Pet, Veterinarian, Appointment, MedicalRecord, Billing, DailyAppointmentRollup, AppointmentStatus,
+)
+from paw_n_care.scheduling import find_conflicts
+
+
+class GenerateDataCommandTest(TestCase):
+    def generate(self, seed=7):
+        call_command('generate_data', '--end-date=2026-01-31', appointments=300, seed=seed, batch_size=100,
+                     stdout=StringIO())
+
+    def snapshot(self):
+        return list(Appointment.objects.order_by('pk').values_list(
+            'pet_id', 'vet_id', 'appointment_date', 'appointment_time', 'status'))
+
+    def test_dataset_is_sized_and_consistent(self):
+        self.generate()
+        self.assertEqual(Appointment.objects.count(), 300)
+        self.assertEqual(Owner.objects.count(), 37)
+        self.assertEqual(Pet.objects.count(), 55)
+        self.assertFalse(Owner.objects.filter(pets__isnull=True).exists())
+        self.assertFalse(Pet.objects.filter(search_name='').exists())
+        self.assertFalse(Appointment.objects.exclude(owner_id=F('pet__owner_id')).exists())
+        self.assertFalse(MedicalRecord.objects.exclude(appointment__status=AppointmentStatus.COMPLETED).exists())
+        self.assertFalse(Billing.objects.exclude(appointment__status=AppointmentStatus.COMPLETED).exists())
+        self.assertFalse(Appointment.objects.filter(appointment_date__gt='2026-01-31').exclude(
+            status=AppointmentStatus.SCHEDULED).exists())
+        self.assertEqual(find_conflicts(Appointment.objects.all()), set())
+        # Derived tables are rebuilt after the bulk inserts
+        self.assertEqual(DailyAppointmentRollup.objects.aggregate(total=Sum('appointment_count'))['total'], 300)
+
+    def test_same_seed_gives_same_data(self):
+        self.generate()
+        first = self.snapshot()
+        for model in (Billing, MedicalRecord, Appointment, Pet, Owner, Veterinarian):
+            model.objects.all().delete()
+        self.generate()
+        self.assertEqual(self.snapshot(), first)
+        for model in (Billing, MedicalRecord, Appointment, Pet, Owner, Veterinarian):
+            model.objects.all().delete()
+        self.generate(seed=8)
+        self.assertNotEqual(self.snapshot(), first)
@@ -0,0 +1,162 @@
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.imports import IMPORT_COLUMNS, import_appointments
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, DailyAppointmentRollup, Gender, Owner, Pet, Species, Veterinarian,
+)
+
+
+def make_csv(*rows, columns=IMPORT_COLUMNS):
+    lines = [','.join(columns)]
+    lines += [','.join(str(row.get(column, '')) for column in columns) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+class ImportAppointmentsTest(TestCase):
+    def setUp(self):
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="0811111111", email="Alex@Example.com", registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Buddy", species=Species.get_for_name("Dog"), breed="beagle",
+            date_of_birth=date(2020, 1, 1), gender=Gender.MALE, weight=10
+        )
+
+    def row(self, **values):
+        row = {
+            'appointment_date': '2024-03-01', 'appointment_time': '10:30', 'vet_id': self.vet.vet_id,
+            'reason': 'Checkup', 'status': 'Completed',
+            'owner_email': 'new@example.com', 'owner_phone': '0899999999', 'owner_first_name': 'Mia',
+            'owner_last_name': 'Brown', 'owner_address': '1 Silom Road', 'pet_name': 'Luna', 'species': 'cat',
+            'breed': 'Siamese', 'date_of_birth': '2021-05-05', 'gender': 'female', 'weight': '4.2',
+        }
+        row.update(values)
+        return row
+
+    def run_import(self, *rows, batch_size=2):
+        return import_appointments(io.StringIO(make_csv(*rows)), batch_size=batch_size)
+
+    def test_creates_missing_owners_and_pets_once(self):
+        result = self.run_import(
+            self.row(),
+            # The same owner, found by phone only, and the same pet in another batch
+            self.row(owner_email='', pet_name=' luna ', appointment_date='2024-03-02'),
+            self.row(pet_name='Max', species='Dog', breed='Boxer', gender='male', weight='20',
+                     appointment_time='11:00'),
+        )
+        self.assertEqual(result.errors, [])
+        self.assertEqual((result.rows, result.appointments, result.owners, result.pets), (3, 3, 1, 2))
+
+        owner = Owner.objects.get(email='new@example.com')
+        self.assertEqual(owner.search_name, 'mia brown')
+        self.assertEqual(owner.appointment_count, 3)
+        luna = owner.pets.get(name='Luna')
+        self.assertEqual((luna.species.name, luna.breed, luna.gender), ('Cat', 'siamese', Gender.FEMALE))
+        self.assertEqual(luna.appointment_count, 2)
+        self.assertEqual(Veterinarian.objects.get().completed_count, 3)
+        self.assertEqual(DailyAppointmentRollup.objects.get(date=date(2024, 3, 1)).appointment_count, 2)
+
+    def test_matches_existing_owner_and_pet(self):
+        result = self.run_import(
+            self.row(owner_email='alex@example.COM', owner_phone='', pet_name='BUDDY', status='scheduled'),
+            self.row(owner_email='', owner_phone='081 111 1111', pet_name='Buddy', appointment_time='11:00'),
+        )
+        self.assertEqual(result.errors, [])
+        self.assertEqual((result.appointments, result.owners, result.pets), (2, 0, 0))
+        self.assertEqual(Owner.objects.count(), 1)
+        self.assertEqual(Pet.objects.count(), 1)
+        self.assertEqual(list(Appointment.objects.values_list('pet_id', 'owner_id').distinct()),
+                         [(self.pet.pet_id, self.owner.owner_id)])
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.appointment_count, 2)
+
+    def test_rejected_rows_do_not_abort_the_import(self):
+        result = self.run_import(
+            self.row(owner_email='alex@example.com', pet_name='Buddy'),
+            self.row(vet_id=999),
+            self.row(appointment_date='2024-02-30'),
+            self.row(status='Lost'),
+            self.row(owner_email='other@example.com', owner_phone='', owner_first_name='', appointment_time='11:00'),
+            self.row(weight='-1', appointment_time='11:30'),
+            self.row(owner_email='', owner_phone=''),
+        )
+        self.assertEqual(result.appointments, 1)
+        self.assertEqual([line for line, _ in result.errors], [3, 4, 5, 6, 7, 8])
+        messages = dict(result.errors)
+        self.assertIn('vet_id', messages[3])
+        self.assertIn('appointment_date', messages[4])
+        self.assertIn('Scheduled, Completed, Cancelled', messages[5])
+        self.assertIn('owner_first_name', messages[6])
+        self.assertIn('weight', messages[7])
+        self.assertEqual(Owner.objects.count(), 1)
+
+    def test_double_bookings_are_rejected(self):
+        Appointment.objects.create(pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=date(2024, 3, 1),
+                                   appointment_time='10:15', reason='Checkup', status=AppointmentStatus.COMPLETED)
+        result = self.run_import(
+            self.row(),
+            # A visit may start as the previous one ends
+            self.row(appointment_time='10:45'),
+            # Rows are checked against the earlier rows of their batch and of the batches already imported
+            self.row(appointment_time='11:00'),
+            self.row(appointment_time='11:00', status='Cancelled'),
+            self.row(appointment_time='11:10'),
+            batch_size=3,
+        )
+        self.assertEqual(result.appointments, 2)
+        booked = f'appointment_time: vet {self.vet.vet_id} is already booked within 30 minutes of'
+        self.assertEqual(result.errors, [(2, f'{booked} 10:30.'), (4, f'{booked} 11:00.'), (6, f'{booked} 11:10.')])
+
+    def test_rejected_rows_leave_their_slot_free(self):
+        result = self.run_import(self.row(weight='-1'), self.row(pet_name='Max', species='Dog'))
+        self.assertEqual([line for line, _ in result.errors], [2])
+        self.assertIn('weight', result.errors[0][1])
+        self.assertEqual(result.appointments, 1)
+        self.assertEqual(Appointment.objects.get().pet.name, 'Max')
+
+    def test_double_booked_rows_create_no_owner_or_pet(self):
+        Appointment.objects.create(pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=date(2024, 3, 1),
+                                   appointment_time='10:30', reason='Checkup', status=AppointmentStatus.COMPLETED)
+        result = self.run_import(self.row())
+        self.assertEqual((result.rows, result.appointments, result.owners, result.pets), (1, 0, 0, 0))
+        self.assertEqual([line for line, _ in result.errors], [2])
+        self.assertEqual((Owner.objects.count(), Pet.objects.count()), (1, 1))
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(ValueError, 'Missing columns: vet_id'):
+            import_appointments(io.StringIO(make_csv(columns=['appointment_date', 'appointment_time', 'reason',
+                                                              'status', 'pet_name'])))
+
+    def test_upload_view(self):
+        upload = SimpleUploadedFile('visits.csv', make_csv(self.row(), self.row(vet_id='x')).encode('utf-8-sig'))
+        response = self.client.post(reverse('paw_n_care:appointments-import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].appointments, 1)
+        self.assertContains(response, "vet_id: &#x27;x&#x27; is not a number.")
+
+        response = self.client.post(reverse('paw_n_care:appointments-import'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as stream:
+            stream.write(make_csv(self.row(appointment_date=(timezone.localdate() + timedelta(days=1)).isoformat(),
+                                           status='Scheduled')))
+        self.addCleanup(os.remove, stream.name)
+        output = io.StringIO()
+        call_command('import_appointments', stream.name, stdout=output, stderr=io.StringIO())
+        self.assertIn('Imported 1 of 1 appointments, creating 1 owners and 1 pets', output.getvalue())
+        self.assertEqual(Appointment.objects.get().status, AppointmentStatus.SCHEDULED)
@@ -0,0 +1,49 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.metrics import histograms
+from paw_n_care.models import Owner
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        histograms.reset()
+        Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com", registration_date=timezone.now()
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('paw_n_care:owner-home'))
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('desc="2 queries"', header)
+        self.assertIn('tpl;dur=', header)
+        self.assertIn('total;dur=', header)
+
+    def test_structured_log_line(self):
+        with self.assertLogs('paw_n_care.metrics', level='INFO') as logs:
+            self.client.get(reverse('paw_n_care:owner-home'))
+        payload = json.loads(logs.records[0].getMessage())
+        self.assertEqual(payload['view'], 'paw_n_care:owner-home')
+        self.assertEqual(payload['status'], 200)
+        self.assertEqual(payload['queries'], 2)
+        self.assertGreater(payload['template_ms'], 0)
+        self.assertGreaterEqual(payload['total_ms'], payload['template_ms'])
+
+    def test_metrics_endpoint_serves_histograms(self):
+        self.client.get(reverse('paw_n_care:owner-home'))
+        self.client.get(reverse('paw_n_care:owner-home'))
+        views = self.client.get(reverse('paw_n_care:metrics')).json()['views']
+        owner_home = views['paw_n_care:owner-home']
+        self.assertEqual(owner_home['count'], 2)
+        self.assertEqual(owner_home['buckets_ms']['+Inf'], 2)
+        # The second request is answered from the search cache
+        self.assertEqual(owner_home['queries'], 2)
+
+    def test_metrics_endpoint_is_local_only(self):
+        response = self.client.get(reverse('paw_n_care:metrics'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 404)
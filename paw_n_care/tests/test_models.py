@@ -1,6 +1,9 @@
 from django.test import TestCase
 from django.core.exceptions import ValidationError
-from ..models import Owner, Pet, Veterinarian, Appointment, MedicalRecord, Billing
+from ..models import (
+    Owner, Pet, Species, Veterinarian, Appointment, MedicalRecord, Billing,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus,
+)
 from datetime import datetime, timedelta
 from django.urls import reverse
 from django.test import Client
@@ -84,16 +87,16 @@ class PetModelTest(TestCase):
         self.pet = Pet.objects.create(
             owner=self.owner,
             name="Fluffy",
-            species="Cat",
+            species=Species.get_for_name("Cat"),
             breed="Persian",
             date_of_birth=datetime.now() - timedelta(days=365*3),
-            gender="Female",
+            gender=Gender.FEMALE,
             weight=4.5
         )
 
     def test_pet_creation(self):
         self.assertEqual(self.pet.name, "Fluffy")
-        self.assertEqual(self.pet.species, "Cat")
+        self.assertEqual(self.pet.species.name, "Cat")
         self.assertEqual(self.pet.owner.first_name, "John")
         self.assertEqual(str(self.pet), "Fluffy (1)")
 
@@ -102,10 +105,10 @@ class PetModelTest(TestCase):
         pet = Pet(
             owner=self.owner,
             name="Ghost",
-            species="Dog",
+            species=Species.get_for_name("Dog"),
             breed="Husky",
             date_of_birth=datetime.now() - timedelta(days=365),
-            gender="Male",
+            gender=Gender.MALE,
             weight=-2.0
         )
         with self.assertRaises(ValidationError):
@@ -125,10 +128,10 @@ class AppointmentModelTest(TestCase):
         self.pet = Pet.objects.create(
             owner=self.owner,
             name="Fluffy",
-            species="Cat",
+            species=Species.get_for_name("Cat"),
             breed="Persian",
             date_of_birth=datetime.now() - timedelta(days=365*3),
-            gender="Female",
+            gender=Gender.FEMALE,
             weight=4.5
         )
         self.vet = Veterinarian.objects.create(
@@ -146,7 +149,7 @@ class AppointmentModelTest(TestCase):
             appointment_date=datetime.now().date(),
             appointment_time=datetime.now().time(),
             reason="Annual checkup",
-            status="Scheduled"
+            status=AppointmentStatus.SCHEDULED
         )
 
     def test_appointment_creation(self):
@@ -168,10 +171,10 @@ class MedicalRecordModelTest(TestCase):
         self.pet = Pet.objects.create(
             owner=self.owner,
             name="Fluffy",
-            species="Cat",
+            species=Species.get_for_name("Cat"),
             breed="Persian",
             date_of_birth=datetime.now() - timedelta(days=365*3),
-            gender="Female",
+            gender=Gender.FEMALE,
             weight=4.5
         )
         self.vet = Veterinarian.objects.create(
@@ -189,7 +192,7 @@ class MedicalRecordModelTest(TestCase):
             appointment_date=datetime.now().date(),
             appointment_time=datetime.now().time(),
             reason="Annual checkup",
-            status="Scheduled"
+            status=AppointmentStatus.SCHEDULED
         )
         self.record = MedicalRecord.objects.create(
             appointment=self.appointment,
@@ -220,10 +223,10 @@ class BillingModelTest(TestCase):
         self.pet = Pet.objects.create(
             owner=self.owner,
             name="Fluffy",
-            species="Cat",
+            species=Species.get_for_name("Cat"),
             breed="Persian",
             date_of_birth=datetime.now() - timedelta(days=365*3),
-            gender="Female",
+            gender=Gender.FEMALE,
             weight=4.5
         )
         self.vet = Veterinarian.objects.create(
@@ -241,19 +244,19 @@ class BillingModelTest(TestCase):
             appointment_date=datetime.now().date(),
             appointment_time=datetime.now().time(),
             reason="Annual checkup",
-            status="Scheduled"
+            status=AppointmentStatus.SCHEDULED
         )
         self.billing = Billing.objects.create(
             appointment=self.appointment,
             total_amount=100.00,
-            payment_status="Paid",
-            payment_method="Credit Card",
+            payment_status=PaymentStatus.PAID,
+            payment_method=PaymentMethod.CREDIT_CARD,
             payment_date=datetime.now()
         )
 
     def test_billing_creation(self):
         self.assertEqual(self.billing.total_amount, 100.00)
-        self.assertEqual(self.billing.payment_status, "Paid")
+        self.assertEqual(self.billing.payment_status, PaymentStatus.PAID)
         self.assertEqual(str(self.billing), "Bill 1 for Appointment 1")
 
 class LoginTest(TestCase):
@@ -284,9 +287,9 @@ class AppointmentStatusUpdateTest(TestCase):
             registration_date=datetime.now()
         )
         self.pet = Pet.objects.create(
-            owner=self.owner, name="Bobby", species="Dog", breed="Beagle",
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
             date_of_birth=datetime.now() - timedelta(days=365),
-            gender="Male", weight=15.2
+            gender=Gender.MALE, weight=15.2
         )
         self.vet = Veterinarian.objects.create(
             first_name="Sara", last_name="Connor", specialization="Canine",
@@ -296,18 +299,20 @@ class AppointmentStatusUpdateTest(TestCase):
             pet=self.pet, owner=self.owner, vet=self.vet,
             appointment_date=datetime.now().date(),
             appointment_time=datetime.now().time(),
-            reason="Routine Check", status="Scheduled"
+            reason="Routine Check", status=AppointmentStatus.SCHEDULED
         )
 
     def test_update_appointment_status(self):
-        self.appointment.status = "Completed"
+        self.appointment.status = AppointmentStatus.COMPLETED
         self.appointment.save()
         updated = Appointment.objects.get(pk=self.appointment.pk)
-        self.assertEqual(updated.status, "Completed")
+        self.assertEqual(updated.status, AppointmentStatus.COMPLETED)
 
     def test_view_appointment_list(self):
         response = self.client.get(reverse('paw_n_care:appointments'))
         self.assertEqual(response.status_code, 200)
+        # Pets are no longer embedded in the form but offered by the autocomplete endpoint
+        response = self.client.get(reverse('paw_n_care:autocomplete', args=['pets']), {'q': 'Bob'})
         self.assertContains(response, "Bobby")
 
 
@@ -319,9 +324,9 @@ class AppointmentOverlapTest(TestCase):
             registration_date=datetime.now()
         )
         self.pet = Pet.objects.create(
-            owner=self.owner, name="Bobby", species="Dog", breed="Beagle",
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
             date_of_birth=datetime.now() - timedelta(days=365),
-            gender="Male", weight=15.2
+            gender=Gender.MALE, weight=15.2
         )
         self.vet = Veterinarian.objects.create(
             first_name="Sara", last_name="Connor", specialization="Canine",
@@ -335,7 +340,7 @@ class AppointmentOverlapTest(TestCase):
             pet=self.pet, owner=self.owner, vet=self.vet,
             appointment_date=datetime.now().date(),
             appointment_time=self.appointment_time,
-            reason="Checkup", status="Scheduled"
+            reason="Checkup", status=AppointmentStatus.SCHEDULED
         )
 
     def test_overlapping_appointments(self):
@@ -350,7 +355,7 @@ class AppointmentOverlapTest(TestCase):
                 pet=self.pet, owner=self.owner, vet=self.vet,
                 appointment_date=datetime.now().date(),
                 appointment_time=overlapping_time,
-                reason="Emergency", status="Scheduled"
+                reason="Emergency", status=AppointmentStatus.SCHEDULED
             )
 
 class MedicalRecordViewTest(TestCase):
@@ -361,9 +366,9 @@ class MedicalRecordViewTest(TestCase):
             registration_date=datetime.now()
         )
         self.pet = Pet.objects.create(
-            owner=self.owner, name="Bobby", species="Dog", breed="Beagle",
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
             date_of_birth=datetime.now() - timedelta(days=365),
-            gender="Male", weight=15.2
+            gender=Gender.MALE, weight=15.2
         )
         self.vet = Veterinarian.objects.create(
             first_name="Sara", last_name="Connor", specialization="Canine",
@@ -373,7 +378,7 @@ class MedicalRecordViewTest(TestCase):
             pet=self.pet, owner=self.owner, vet=self.vet,
             appointment_date=datetime.now().date(),
             appointment_time=datetime.now().time(),
-            reason="Routine Check", status="Completed"
+            reason="Routine Check", status=AppointmentStatus.COMPLETED
         )
         self.medical_record = MedicalRecord.objects.create(
             appointment=self.appointment,
@@ -409,9 +414,9 @@ class BillingUpdateTest(TestCase):
             registration_date=datetime.now()
         )
         self.pet = Pet.objects.create(
-            owner=self.owner, name="Bobby", species="Dog", breed="Beagle",
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
             date_of_birth=datetime.now() - timedelta(days=365),
-            gender="Male", weight=15.2
+            gender=Gender.MALE, weight=15.2
         )
         self.vet = Veterinarian.objects.create(
             first_name="Sara", last_name="Connor", specialization="Canine",
@@ -421,21 +426,21 @@ class BillingUpdateTest(TestCase):
             pet=self.pet, owner=self.owner, vet=self.vet,
             appointment_date=datetime.now().date(),
             appointment_time=datetime.now().time(),
-            reason="Routine Check", status="Completed"
+            reason="Routine Check", status=AppointmentStatus.COMPLETED
         )
         self.billing = Billing.objects.create(
             appointment=self.appointment,
             total_amount=150.00,
-            payment_status="Pending",
-            payment_method="Cash",
+            payment_status=PaymentStatus.PENDING,
+            payment_method=PaymentMethod.CASH,
             payment_date=datetime.now()
         )
 
     def test_update_payment_status(self):
-        self.billing.payment_status = "Paid"
+        self.billing.payment_status = PaymentStatus.PAID
         self.billing.save()
         updated = Billing.objects.get(pk=self.billing.pk)
-        self.assertEqual(updated.payment_status, "Paid")
+        self.assertEqual(updated.payment_status, PaymentStatus.PAID)
 
     def test_view_billing_list(self):
         user = User.objects.create_user(username="testuser",
@@ -517,10 +522,10 @@ class MedicalRecordUpdateTest(TestCase):
         self.pet = Pet.objects.create(
             owner=self.owner,
             name="Fluffy",
-            species="Cat",
+            species=Species.get_for_name("Cat"),
             breed="Persian",
             date_of_birth=timezone.now() - timedelta(days=365 * 3),
-            gender="Female",
+            gender=Gender.FEMALE,
             weight=4.5
         )
         self.vet = Veterinarian.objects.create(
@@ -538,7 +543,7 @@ class MedicalRecordUpdateTest(TestCase):
             appointment_date=timezone.now().date(),
             appointment_time=timezone.now().time(),
             reason="Annual checkup",
-            status="Completed"
+            status=AppointmentStatus.COMPLETED
         )
         self.medical_record = MedicalRecord.objects.create(
             appointment=self.appointment,
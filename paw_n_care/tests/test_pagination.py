@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import Owner, Pet, Species, Veterinarian, Appointment, AppointmentStatus, Gender
+from paw_n_care.pagination import KeysetPaginator
+
+
+@override_settings(PAGE_SIZE=3)
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com",
+            registration_date=timezone.now()
+        )
+        pet = Pet.objects.create(
+            owner=owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=today - timedelta(days=365), gender=Gender.MALE, weight=15.2
+        )
+        vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        # Two appointments per day so the date ordering needs the pk tie-breaker
+        self.appointments = [
+            Appointment.objects.create(
+                pet=pet, owner=owner, vet=vet, appointment_date=today - timedelta(days=number // 2),
+                appointment_time=f"{10 + number % 2}:00", reason=f"Visit {number}", status=AppointmentStatus.SCHEDULED
+            )
+            for number in range(8)
+        ]
+
+    def walk(self, ordering):
+        """Follow the next cursors to the end, then the previous cursors back to the start."""
+        paginator = KeysetPaginator(Appointment.objects.values('appointment_id', 'appointment_date'), ordering)
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(pages[-1].next_cursor))
+        backwards = [pages[-1]]
+        while backwards[-1].has_previous:
+            backwards.append(paginator.page(backwards[-1].previous_cursor))
+        forward_ids = [[row['appointment_id'] for row in page.rows] for page in pages]
+        backward_ids = [[row['appointment_id'] for row in page.rows] for page in reversed(backwards)]
+        return forward_ids, backward_ids
+
+    def test_primary_key_pages(self):
+        ids = [appointment.appointment_id for appointment in self.appointments]
+        forward, backward = self.walk(['appointment_id'])
+        self.assertEqual(forward, [ids[0:3], ids[3:6], ids[6:8]])
+        self.assertEqual(backward, forward)
+
+    def test_date_pages(self):
+        expected = [
+            appointment.appointment_id for appointment in
+            sorted(self.appointments, key=lambda a: (a.appointment_date, a.appointment_id), reverse=True)
+        ]
+        forward, backward = self.walk(['-appointment_date', '-appointment_id'])
+        self.assertEqual(sum(forward, []), expected)
+        self.assertEqual(backward, forward)
+
+    def test_invalid_cursor_returns_first_page(self):
+        paginator = KeysetPaginator(Appointment.objects.values('appointment_id'), ['appointment_id'])
+        self.assertEqual(paginator.page('not-a-cursor').rows, paginator.page().rows)
+
+    def test_deep_pages_do_not_use_offset(self):
+        response = self.client.get(reverse('paw_n_care:home'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('paw_n_care:home'), {'cursor': response.context['page'].next_cursor})
+        self.assertEqual(len(response.context['appointments']), 3)
+        self.assertTrue(response.context['page'].has_previous)
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+
+    def test_list_views_render_pages(self):
+        for name in ['home', 'pet-home', 'owner-home', 'medical-record-home', 'billing-home']:
+            response = self.client.get(reverse(f'paw_n_care:{name}'), {'sort': 'date'})
+            self.assertEqual(response.status_code, 200, name)
+            self.assertIn('page', response.context)
@@ -0,0 +1,73 @@
+import re
+from datetime import date, time
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Avg, Count, Q
+from django.test import TestCase
+from django.utils import timezone
+
+from paw_n_care.autocomplete import prefix_filter
+from paw_n_care.scheduling import slot_bounds
+from paw_n_care.models import Appointment, AppointmentStatus, Billing, Pet, User, PaymentMethod, PaymentStatus
+from paw_n_care.search import filter_search, BILLING_SEARCH_CONFIG
+from paw_n_care.stats import returning_owners
+
+# A table read without any index; FTS tables are virtual and always scanned through their own index
+FULL_SCAN = re.compile(r'\bSCAN (?!.*\bUSING\b)(?!.*\bVIRTUAL TABLE\b)(\w+)')
+
+
+@skipUnless(connection.vendor == 'sqlite', "Query plans are checked with SQLite's EXPLAIN QUERY PLAN")
+class QueryPlanTest(TestCase):
+    """Fail when a hot query stops using its index and falls back to a full table scan."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertEqual(FULL_SCAN.findall(plan), [], plan)
+        self.assertIn(index_name, plan)
+
+    def test_returning_owners(self):
+        self.assertUsesIndex(returning_owners(date(2024, 1, 1)), 'appointment_status_date_idx')
+
+    def test_login_lookup(self):
+        self.assertUsesIndex(User.objects.filter(username='admin', password='secret'), 'user_login_idx')
+
+    def test_billing_status_and_date_range(self):
+        cutoff = timezone.now()
+        self.assertUsesIndex(Billing.objects.filter(payment_status=PaymentStatus.PENDING, payment_date__lt=cutoff),
+                             'billing_status_date_idx')
+        self.assertUsesIndex(Billing.objects.filter(payment_method=PaymentMethod.CASH, payment_date__gte=cutoff),
+                             'billing_method_date_idx')
+
+    def test_date_search_is_a_range(self):
+        queryset = filter_search(Billing.objects.all(), 'payment_date', '2024-01-05', BILLING_SEARCH_CONFIG)
+        self.assertUsesIndex(queryset, 'billing_payment_keyset_idx')
+
+    def test_vet_slot_lookup(self):
+        lower, upper = slot_bounds(time(10, 0))
+        queryset = Appointment.objects.filter(vet_id=1, appointment_date=date(2024, 1, 5), appointment_time__gt=lower,
+                                              appointment_time__lt=upper).exclude(status=AppointmentStatus.CANCELLED)
+        self.assertUsesIndex(queryset, 'appointment_vet_slot_idx')
+
+    def test_free_slot_lookup(self):
+        queryset = Appointment.objects.filter(vet_id__in=[1, 2], appointment_date__gte=date(2024, 1, 5),
+                                              appointment_date__lte=date(2024, 1, 12))
+        self.assertUsesIndex(queryset, 'appointment_vet_slot_idx')
+
+    def test_newest_first_page(self):
+        queryset = Appointment.objects.order_by('-appointment_date', '-appointment_id')[:50]
+        plan = queryset.explain()
+        self.assertIn('appointment_date_keyset_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_species_weight_statistics(self):
+        queryset = Pet.objects.values('species').annotate(count=Count('pet_id'), weight=Avg('weight'))
+        self.assertIn('COVERING INDEX pet_species_weight_idx', queryset.explain())
+
+    def test_autocomplete_lookups(self):
+        pets = Pet.objects.filter(prefix_filter('search_name', 'bel')).order_by('search_name', 'pet_id')[:10]
+        self.assertUsesIndex(pets, 'search_name')
+        appointments = Appointment.objects.filter(
+            Q(pet_id__in=Pet.objects.filter(prefix_filter('search_name', 'bel')).values('pet_id'))
+        ).order_by('-appointment_date')[:10]
+        self.assertEqual(FULL_SCAN.findall(appointments.explain()), [], appointments.explain())
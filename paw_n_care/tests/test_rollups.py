@@ -0,0 +1,120 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from paw_n_care import rollups
+from paw_n_care.models import (
+    Owner, Pet, Veterinarian, Appointment, MedicalRecord, Billing,
+    DailyAppointmentRollup, DailyBillingRollup, VetPetRollup, MedicalRecordRollup,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus, Species,
+)
+
+
+def rollup_snapshot():
+    """Return the non-empty rollup rows, independent of their primary keys."""
+    return (
+        sorted(DailyAppointmentRollup.objects.filter(appointment_count__gt=0)
+               .values_list('vet_id', 'date', 'status', 'appointment_count')),
+        sorted(DailyBillingRollup.objects.filter(bill_count__gt=0)
+               .values_list('vet_id', 'date', 'payment_status', 'payment_method', 'bill_count', 'total_amount')),
+        sorted(VetPetRollup.objects.filter(appointment_count__gt=0)
+               .values_list('vet_id', 'pet_id', 'appointment_count')),
+        sorted(MedicalRecordRollup.objects.filter(record_count__gt=0)
+               .values_list('diagnosis', 'treatment', 'record_count', 'medication_count')),
+    )
+
+
+class RollupMaintenanceTest(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com",
+            registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=self.today - timedelta(days=365), gender=Gender.MALE, weight=15.2
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.other_vet = Veterinarian.objects.create(
+            first_name="Eva", last_name="Jones", specialization="Exotic",
+            license_number="VET321", phone_number="1111222233", email="eva@example.com"
+        )
+        self.appointment = Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=self.today,
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.SCHEDULED
+        )
+        self.billing = Billing.objects.create(
+            appointment=self.appointment, total_amount=150, payment_status=PaymentStatus.PENDING,
+            payment_method=PaymentMethod.CASH, payment_date=timezone.now()
+        )
+        self.record = MedicalRecord.objects.create(
+            appointment=self.appointment, pet=self.pet, vet=self.vet, visit_date=timezone.now(),
+            diagnosis="Allergy", treatment="Antihistamine", prescribed_medication=None
+        )
+
+    def test_rollups_follow_creation(self):
+        rollup = DailyAppointmentRollup.objects.get(vet=self.vet, date=self.today, status=AppointmentStatus.SCHEDULED)
+        self.assertEqual(rollup.appointment_count, 1)
+        billing_rollup = DailyBillingRollup.objects.get(vet=self.vet, payment_status=PaymentStatus.PENDING)
+        self.assertEqual(billing_rollup.bill_count, 1)
+        self.assertEqual(billing_rollup.total_amount, Decimal('150'))
+        self.assertEqual(MedicalRecordRollup.objects.get(diagnosis="Allergy").medication_count, 0)
+
+    def test_rollups_follow_updates(self):
+        self.appointment.status = AppointmentStatus.COMPLETED
+        self.appointment.vet = self.other_vet
+        self.appointment.save()
+        self.billing.payment_status = PaymentStatus.PAID
+        self.billing.save()
+
+        self.assertEqual(DailyAppointmentRollup.objects.get(vet=self.vet, status=AppointmentStatus.SCHEDULED).appointment_count, 0)
+        self.assertEqual(
+            DailyAppointmentRollup.objects.get(vet=self.other_vet, status=AppointmentStatus.COMPLETED).appointment_count, 1
+        )
+        # The bill follows its appointment to the new vet
+        self.assertEqual(DailyBillingRollup.objects.get(vet=self.other_vet, payment_status=PaymentStatus.PAID).bill_count, 1)
+        self.assertFalse(DailyBillingRollup.objects.filter(vet=self.vet, bill_count__gt=0).exists())
+
+    def test_rollups_follow_deletes(self):
+        self.owner.delete()
+        self.assertEqual(rollup_snapshot(), ([], [], [], []))
+
+    def test_rebuild_matches_incremental_rollups(self):
+        Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.other_vet, appointment_date=self.today,
+            appointment_time="11:00", reason="Follow up", status=AppointmentStatus.COMPLETED
+        )
+        self.billing.total_amount = 175
+        self.billing.save()
+        incremental = rollup_snapshot()
+
+        call_command('rebuild_rollups', chunk_size=1, stdout=open('/dev/null', 'w'))
+        self.assertEqual(rollup_snapshot(), incremental)
+
+    def test_bulk_contributions_match_rebuild(self):
+        appointments = Appointment.objects.bulk_create([
+            Appointment(pet=self.pet, owner=self.owner, vet=vet, appointment_date=self.today + timedelta(days=day),
+                        appointment_time="12:00", reason="Bulk", status=status)
+            for vet in (self.vet, self.other_vet) for day in (0, 1)
+            for status in (AppointmentStatus.SCHEDULED, AppointmentStatus.COMPLETED)
+        ])
+        rollups.apply_contributions_in_bulk(
+            (contribution for appointment in appointments
+             for contribution in rollups.appointment_contributions(appointment)),
+            batch_size=2,
+        )
+        bulk = rollup_snapshot()
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.appointment_count, 9)
+        self.assertEqual(Veterinarian.objects.get(pk=self.other_vet.pk).completed_count, 2)
+
+        call_command('rebuild_rollups', stdout=open('/dev/null', 'w'))
+        self.assertEqual(rollup_snapshot(), bulk)
@@ -0,0 +1,151 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care import routers
+from paw_n_care.cache import search_cache_key
+from paw_n_care.models import Owner, Pet, Species, Veterinarian, Appointment, AppointmentStatus, Gender
+from paw_n_care.routers import STICKY_COOKIE, ReplicaRouter, replica_reads
+from paw_n_care.search import APPOINTMENT_SEARCH_CONFIG
+from paw_n_care.sqlite import backup
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        # The test runner points a configured replica at the test database
+        patcher = mock.patch.object(ReplicaRouter, 'mirrors_primary', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_the_replica_inside_replica_blocks(self):
+        self.assertEqual(self.router.db_for_read(Appointment), 'default')
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Appointment), 'replica')
+            # Sessions and other framework tables stay on the primary
+            self.assertEqual(self.router.db_for_read(Session), 'default')
+        self.assertEqual(self.router.db_for_read(Appointment), 'default')
+
+    def test_writes_go_to_the_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Appointment), 'default')
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_without_a_replica_everything_uses_the_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Appointment), 'default')
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'paw_n_care'))
+        self.assertFalse(self.router.allow_migrate('replica', 'paw_n_care'))
+
+    def test_search_pages_are_cached_per_database(self):
+        keys = {search_cache_key(APPOINTMENT_SEARCH_CONFIG, 'all_categories', 'rex', '', '', database)
+                for database in ('default', 'replica')}
+        self.assertEqual(len(keys), 2)
+
+
+class MirrorDetectionTest(SimpleTestCase):
+    def test_mirror_detection(self):
+        self.assertTrue(ReplicaRouter.mirrors_primary('default'))
+        self.assertFalse(ReplicaRouter.mirrors_primary('missing'))
+
+
+class ReplicaViewsTest(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com", registration_date=timezone.now()
+        )
+        pet = Pet.objects.create(
+            owner=self.owner, name="Maximus", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=today - timedelta(days=365), gender=Gender.MALE, weight=15.2
+        )
+        vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        Appointment.objects.create(
+            pet=pet, owner=self.owner, vet=vet, appointment_date=today,
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.SCHEDULED
+        )
+
+    def replica_reads_of(self, method, url, data=None):
+        """Return the response and whether each clinic read of the request was made in a replica block."""
+        reads = []
+        original = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            if model._meta.app_label == router.app_label:
+                reads.append(routers.reading_from_replica())
+            return original(router, model, **hints)
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', spy):
+            response = getattr(self.client, method)(url, data)
+        return response, reads
+
+    def test_read_only_views_read_from_the_replica(self):
+        for name in ['home', 'pet-home', 'owner-home', 'medical-record-home', 'billing-home', 'statistic']:
+            with self.subTest(name):
+                response, reads = self.replica_reads_of('get', reverse(f'paw_n_care:{name}'))
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(reads)
+                self.assertTrue(all(reads))
+
+    def test_edit_views_read_from_the_primary(self):
+        response, reads = self.replica_reads_of(
+            'get', reverse('paw_n_care:edit_owner', args=[self.owner.owner_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(reads))
+
+    def test_writers_stick_to_the_primary(self):
+        response, reads = self.replica_reads_of('post', reverse('paw_n_care:edit_owner', args=[self.owner.owner_id]), {
+            'first_name': "Jordan", 'last_name': "Lee", 'address': "XYZ Road",
+            'phone': "5555555555", 'email': "alex@example.com",
+        })
+        self.assertFalse(any(reads))
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        response, reads = self.replica_reads_of('get', reverse('paw_n_care:owner-home'))
+        self.assertContains(response, "Jordan")
+        self.assertFalse(any(reads))
+
+
+@skipUnless(connection.vendor == 'sqlite', "The local replica is a copy of the SQLite file")
+class SyncReplicaTest(SimpleTestCase):
+    def open_database(self, path):
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': path, 'OPTIONS': {}}, alias=path)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_backup_copies_the_primary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            primary = self.open_database(os.path.join(directory, 'primary.sqlite3'))
+            replica = self.open_database(os.path.join(directory, 'replica.sqlite3'))
+            with primary.cursor() as cursor:
+                cursor.execute('CREATE TABLE visit (name TEXT)')
+                cursor.execute("INSERT INTO visit VALUES ('Maximus')")
+
+            backup(primary, replica, pages=1)
+            with replica.cursor() as cursor:
+                cursor.execute('SELECT name FROM visit')
+                self.assertEqual(cursor.fetchall(), [('Maximus',)])
+            primary.close()
+            replica.close()
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_command_requires_a_replica(self):
+        with self.assertRaises(CommandError):
+            call_command('sync_replica')
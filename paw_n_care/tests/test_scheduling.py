@@ -0,0 +1,207 @@
+from datetime import date, time
+from unittest import mock
+
+from django.contrib.auth.models import User as AuthUser
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import Appointment, AppointmentStatus, Gender, Owner, Pet, Species, Veterinarian
+from paw_n_care.scheduling import conflicting_appointment, find_conflicts, free_slots, slot_bounds
+from paw_n_care.services import book_appointment, edit_appointment
+from paw_n_care.transitions import apply_transition
+
+
+class SchedulingTestCase(TestCase):
+    def setUp(self):
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.other_vet = Veterinarian.objects.create(
+            first_name="John", last_name="Smith", specialization="Feline",
+            license_number="VET998", phone_number="3333333333", email="john@example.com"
+        )
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="0811111111", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Buddy", species=Species.get_for_name("Dog"), breed="beagle",
+            date_of_birth=date(2020, 1, 1), gender=Gender.MALE, weight=10
+        )
+        self.booked = self.book('10:00')
+
+    def book(self, start, vet=None, status=AppointmentStatus.SCHEDULED, day=date(2026, 3, 1)):
+        return Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=vet or self.vet, appointment_date=day,
+            appointment_time=start, reason='Checkup', status=status
+        )
+
+
+class DoubleBookingTest(SchedulingTestCase):
+    def test_overlapping_visits_are_refused(self):
+        for start in ['09:45', '10:00', '10:29']:
+            with self.subTest(start=start), self.assertRaises(ValidationError) as raised:
+                self.book(start)
+            self.assertEqual(raised.exception.message_dict, {'appointment_time': [
+                f"The vet already has appointment {self.booked.pk} at 10:00; visits last 30 minutes."
+            ]})
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_adjacent_and_unrelated_visits_are_allowed(self):
+        self.book('09:30')
+        self.book('10:30')
+        self.book('10:00', vet=self.other_vet)
+        self.book('10:00', day=date(2026, 3, 2))
+        self.book('10:15', status=AppointmentStatus.CANCELLED)
+        self.assertEqual(Appointment.objects.count(), 6)
+
+    @override_settings(APPOINTMENT_DURATION_MINUTES=60)
+    def test_duration_is_configurable(self):
+        with self.assertRaises(ValidationError):
+            self.book('10:45')
+        self.book('11:00')
+
+    def test_cancelled_visit_frees_its_slot(self):
+        self.booked.status = AppointmentStatus.CANCELLED
+        self.booked.save()
+        replacement = self.book('10:00')
+
+        # Re-scheduling the cancelled visit would book the vet twice
+        self.booked.status = AppointmentStatus.SCHEDULED
+        with self.assertRaises(ValidationError):
+            self.booked.save()
+        result = apply_transition(Appointment.objects.all(), AppointmentStatus.SCHEDULED)
+        self.assertEqual((result.updated, result.skipped), (0, 2))
+        replacement.delete()
+        result = apply_transition(Appointment.objects.all(), AppointmentStatus.SCHEDULED)
+        self.assertEqual((result.updated, result.skipped), (1, 0))
+
+    def test_saving_other_fields_skips_the_check(self):
+        with mock.patch('paw_n_care.scheduling.check_vet_is_free') as check:
+            self.booked.reason = 'Vaccination'
+            self.booked.save(update_fields=['reason'])
+            check.assert_not_called()
+            self.booked.appointment_time = time(10, 10)
+            self.booked.save(update_fields=['reason', 'appointment_time'])
+            check.assert_called_once_with(self.booked)
+        # The appointment is not compared with its own stored row
+        self.booked.save()
+
+    def test_booking_form_reports_the_time(self):
+        with self.assertRaises(ValidationError) as raised:
+            book_appointment({'vet': str(self.vet.vet_id), 'existing_pet': str(self.pet.pet_id),
+                              'appointment_date': '2026-03-01', 'appointment_time': '10:15',
+                              'reason': 'Checkup', 'status': 'Scheduled'})
+        self.assertEqual(list(raised.exception.message_dict), ['appointment_time'])
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_admin_reports_the_time(self):
+        self.client.force_login(AuthUser.objects.create_superuser('admin', 'admin@example.com', 'secret'))
+        response = self.client.post(reverse('admin:paw_n_care_appointment_add'), {
+            'pet': self.pet.pk, 'owner': self.owner.pk, 'vet': self.vet.pk, 'appointment_date': '2026-03-01',
+            'appointment_time': '10:15', 'reason': 'Checkup', 'status': AppointmentStatus.SCHEDULED,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['adminform'].form.errors, {'appointment_time': [
+            f"The vet already has appointment {self.booked.pk} at 10:00; visits last 30 minutes."
+        ]})
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_other_edits_of_an_overlapping_visit_go_through(self):
+        # Older data may already book the vet twice
+        [legacy] = Appointment.objects.bulk_create([Appointment(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=date(2026, 3, 1),
+            appointment_time=time(10, 15), reason='Checkup', status=AppointmentStatus.SCHEDULED,
+        )])
+        legacy = Appointment.objects.get(pk=legacy.pk)
+        form = {'vet': str(self.vet.vet_id), 'appointment_date': '2026-03-01', 'appointment_time': '10:15',
+                'reason': 'Vaccination', 'status': 'Scheduled', 'version': str(legacy.version)}
+        with mock.patch('paw_n_care.scheduling.check_vet_is_free') as check:
+            self.assertEqual(edit_appointment(legacy, form), ['reason'])
+            check.assert_not_called()
+        with self.assertRaises(ValidationError):
+            edit_appointment(legacy, {**form, 'appointment_time': '10:20', 'version': str(legacy.version)})
+
+        self.client.force_login(AuthUser.objects.create_superuser('admin', 'admin@example.com', 'secret'))
+        response = self.client.post(reverse('admin:paw_n_care_appointment_change', args=[legacy.pk]), {
+            'pet': self.pet.pk, 'owner': self.owner.pk, 'vet': self.vet.pk, 'appointment_date': '2026-03-01',
+            'appointment_time': '10:15', 'reason': 'Follow-up', 'status': AppointmentStatus.SCHEDULED,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Appointment.objects.get(pk=legacy.pk).reason, 'Follow-up')
+
+    def test_lookups(self):
+        self.assertEqual(slot_bounds(time(0, 10)), (None, time(0, 40)))
+        self.assertEqual(slot_bounds(time(23, 40)), (time(23, 10), None))
+        self.assertEqual(conflicting_appointment(self.vet.vet_id, '2026-03-01', '10:20'), (self.booked.pk, time(10)))
+        self.assertIsNone(conflicting_appointment(self.vet.vet_id, '2026-03-01', '10:20', exclude_pk=self.booked.pk))
+
+        candidates = [Appointment(vet=vet, appointment_date=date(2026, 3, 1), appointment_time=start, status=status)
+                      for vet, start, status in [(self.vet, time(11), AppointmentStatus.SCHEDULED),
+                                                 (self.vet, time(11, 15), AppointmentStatus.SCHEDULED),
+                                                 (self.vet, time(11, 15), AppointmentStatus.CANCELLED),
+                                                 (self.other_vet, time(11, 15), AppointmentStatus.SCHEDULED),
+                                                 (self.vet, time(9, 45), AppointmentStatus.COMPLETED)]]
+        self.assertEqual(find_conflicts(candidates, chunk_size=2), {1, 4})
+        # A stored row re-stated in the list is not compared with itself
+        self.assertEqual(find_conflicts([self.booked]), set())
+
+
+@override_settings(CLINIC_OPENING_TIME='09:00', CLINIC_CLOSING_TIME='11:00', APPOINTMENT_SLOT_STEP_MINUTES=15)
+class FreeSlotTest(SchedulingTestCase):
+    def slots(self, *starts):
+        return [time.fromisoformat(start) for start in starts]
+
+    def test_gaps_between_visits(self):
+        self.book('10:30', status=AppointmentStatus.CANCELLED)
+        # Older data may hold overlapping visits, merged into one busy interval
+        Appointment.objects.bulk_create([
+            Appointment(pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=date(2026, 3, 2),
+                        appointment_time=start, reason='Checkup', status=AppointmentStatus.SCHEDULED)
+            for start in ['08:50', '09:10', '09:20', '10:40']
+        ])
+        with self.assertNumQueries(1):
+            slots = free_slots([self.vet.vet_id, self.other_vet.vet_id], date(2026, 3, 1), date(2026, 3, 2))
+        self.assertEqual(slots[self.vet.vet_id], {
+            date(2026, 3, 1): self.slots('09:00', '09:15', '09:30', '10:30'),
+            date(2026, 3, 2): self.slots('10:00'),
+        })
+        self.assertEqual(slots[self.other_vet.vet_id][date(2026, 3, 1)],
+                         self.slots('09:00', '09:15', '09:30', '09:45', '10:00', '10:15', '10:30'))
+
+    def test_seconds_keep_the_slot_busy(self):
+        self.book(time(9, 0, 30), vet=self.other_vet)
+        slots = free_slots([self.other_vet.vet_id], date(2026, 3, 1), date(2026, 3, 1))
+        self.assertEqual(slots[self.other_vet.vet_id][date(2026, 3, 1)][0], time(9, 45))
+        # The start the finder skips is the one the check refuses
+        with self.assertRaises(ValidationError):
+            self.book('09:30', vet=self.other_vet)
+        self.book('09:45', vet=self.other_vet)
+
+    def test_view(self):
+        url = reverse('paw_n_care:availability')
+        response = self.client.get(url, {'vet': self.vet.vet_id, 'start': '2026-03-01'})
+        self.assertEqual(response.json(), {'duration': 30, 'vets': [{
+            'id': self.vet.vet_id, 'label': 'Dr.Sara Connor',
+            'days': [{'date': '2026-03-01', 'slots': ['09:00', '09:15', '09:30', '10:30']}],
+        }]})
+
+        response = self.client.get(url, {'specialization': 'feline', 'start': '2026-03-01', 'end': '2026-03-03'})
+        [vet] = response.json()['vets']
+        self.assertEqual((vet['id'], [day['date'] for day in vet['days']]),
+                         (self.other_vet.vet_id, ['2026-03-01', '2026-03-02', '2026-03-03']))
+
+        for params in [{}, {'vet': 'x'}, {'vet': self.vet.vet_id, 'start': '2026-02-30'},
+                       {'vet': self.vet.vet_id, 'start': '2026-03-02', 'end': '2026-03-01'},
+                       {'vet': self.vet.vet_id, 'start': '2026-03-01', 'end': '2026-05-01'}]:
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_booking_form_offers_the_free_times(self):
+        response = self.client.get(reverse('paw_n_care:appointments'))
+        self.assertContains(response, f'data-availability="{reverse("paw_n_care:availability")}"')
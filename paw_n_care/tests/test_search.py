@@ -0,0 +1,167 @@
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Owner, Pet, Species, Veterinarian, Appointment, MedicalRecord, Billing,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus,
+)
+from paw_n_care.search import (
+    SEARCH_INDEXES, SearchIndex, handle_search,
+    APPOINTMENT_SEARCH_CONFIG, OWNER_SEARCH_CONFIG, PET_SEARCH_CONFIG, BILLING_SEARCH_CONFIG,
+)
+
+
+def search_ids(queryset, query, config):
+    results, _, _ = handle_search(queryset, 'all_categories', query, config)
+    pk_name = queryset.model._meta.pk.name
+    return sorted(row[pk_name] for row in results)
+
+
+class SearchBehaviourMixin:
+    """Searches that return the same rows whether or not the full-text index is available."""
+
+    def setUp(self):
+        today = timezone.localdate()
+        self.owner = Owner.objects.create(
+            first_name="Alexandra", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com",
+            registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Maximus", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=today - timedelta(days=365), gender=Gender.MALE, weight=15.2
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.appointment = Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=today,
+            appointment_time="10:00", reason="Limping on the left leg", status=AppointmentStatus.SCHEDULED
+        )
+        self.billing = Billing.objects.create(
+            appointment=self.appointment, total_amount=150, payment_status=PaymentStatus.PENDING,
+            payment_method=PaymentMethod.CASH, payment_date=timezone.now()
+        )
+
+    def test_short_queries_fall_back_to_like(self):
+        results, _, _ = handle_search(Appointment.objects.all(), 'all_categories', 'ma',
+                                      APPOINTMENT_SEARCH_CONFIG)
+        self.assertIn('LIKE', str(results.query))
+        self.assertEqual(len(results), 1)
+
+    def test_related_changes_are_reindexed(self):
+        self.assertEqual(search_ids(Appointment.objects.all(), 'ximu', APPOINTMENT_SEARCH_CONFIG),
+                         [self.appointment.appointment_id])
+
+        self.pet.name = "Rex"
+        self.pet.save()
+        self.owner.first_name = "Jordan"
+        self.owner.save()
+
+        self.assertEqual(search_ids(Appointment.objects.all(), 'ximu', APPOINTMENT_SEARCH_CONFIG), [])
+        self.assertEqual(search_ids(Owner.objects.all(), 'Rex', OWNER_SEARCH_CONFIG), [self.owner.owner_id])
+        self.assertEqual(search_ids(Pet.objects.all(), 'jordan', PET_SEARCH_CONFIG), [self.pet.pet_id])
+        self.assertEqual(search_ids(Billing.objects.all(), 'JORDAN', BILLING_SEARCH_CONFIG),
+                         [self.billing.bill_id])
+
+    def test_new_rows_are_listed_by_the_rows_they_reference(self):
+        Pet.objects.create(
+            owner=self.owner, name="Ladybird", species=Species.get_for_name("Cat"), breed="Siamese",
+            date_of_birth=timezone.localdate(), gender=Gender.FEMALE, weight=3.1
+        )
+        self.assertEqual(search_ids(Owner.objects.all(), 'Ladybird', OWNER_SEARCH_CONFIG), [self.owner.owner_id])
+
+    def test_home_search(self):
+        response = self.client.get(reverse('paw_n_care:home'), {
+            'search-dropdown': 'all_categories', 'search-query': 'Maximus'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Limping on the left leg")
+
+    def test_date_search_matches_the_whole_day(self):
+        payment_day = timezone.localdate(self.billing.payment_date)
+        results, _, _ = handle_search(Billing.objects.all(), 'payment_date', payment_day.isoformat(),
+                                      BILLING_SEARCH_CONFIG)
+        self.assertEqual([row['bill_id'] for row in results], [self.billing.bill_id])
+
+        results, _, _ = handle_search(Billing.objects.all(), 'payment_date',
+                                      (payment_day + timedelta(days=1)).isoformat(), BILLING_SEARCH_CONFIG)
+        self.assertEqual(list(results), [])
+
+    def test_choice_fields_are_searched_by_label(self):
+        results, _, _ = handle_search(Appointment.objects.all(), 'status', 'sched', APPOINTMENT_SEARCH_CONFIG)
+        self.assertEqual([row['appointment_id'] for row in results], [self.appointment.appointment_id])
+        results, _, _ = handle_search(Appointment.objects.all(), 'status', 'complet', APPOINTMENT_SEARCH_CONFIG)
+        self.assertEqual(list(results), [])
+
+        self.assertEqual(search_ids(Billing.objects.all(), 'pending', BILLING_SEARCH_CONFIG), [self.billing.bill_id])
+        self.assertEqual(search_ids(Pet.objects.all(), 'male', PET_SEARCH_CONFIG), [self.pet.pet_id])
+
+    def test_species_renames_are_reindexed(self):
+        self.assertEqual(search_ids(Pet.objects.all(), 'dog', PET_SEARCH_CONFIG), [self.pet.pet_id])
+        species = self.pet.species
+        species.name = "Canine"
+        species.save()
+        self.assertEqual(search_ids(Pet.objects.all(), 'dog', PET_SEARCH_CONFIG), [])
+        self.assertEqual(search_ids(Pet.objects.all(), 'canine', PET_SEARCH_CONFIG), [self.pet.pet_id])
+
+
+@skipUnless(connection.vendor == 'sqlite', "The full-text index uses SQLite FTS5")
+class SearchIndexTest(SearchBehaviourMixin, TestCase):
+    def test_index_is_used_for_all_categories(self):
+        results, _, _ = handle_search(Appointment.objects.all(), 'all_categories', 'limp',
+                                      APPOINTMENT_SEARCH_CONFIG)
+        self.assertIn('paw_n_care_appointment_fts', str(results.query))
+        self.assertNotIn('LIKE', str(results.query))
+        self.assertEqual([row['appointment_id'] for row in results], [self.appointment.appointment_id])
+
+    def test_deleted_rows_leave_the_index(self):
+        self.owner.delete()
+        with connection.cursor() as cursor:
+            for index in SEARCH_INDEXES.values():
+                cursor.execute(f'SELECT COUNT(*) FROM {index.table}')
+                self.assertEqual(cursor.fetchone()[0], 0, index.table)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM paw_n_care_appointment_fts')
+        self.assertEqual(search_ids(Appointment.objects.all(), 'limp', APPOINTMENT_SEARCH_CONFIG), [])
+
+        call_command('rebuild_search_index', chunk_size=1, stdout=open('/dev/null', 'w'))
+        self.assertEqual(search_ids(Appointment.objects.all(), 'limp', APPOINTMENT_SEARCH_CONFIG),
+                         [self.appointment.appointment_id])
+
+    def test_migration_writes_the_indexed_documents(self):
+        migration = import_module('paw_n_care.migrations.0009_integer_choices')
+        index = SEARCH_INDEXES[Pet]
+        with connection.cursor() as cursor:
+            migration.rebuild_pet_search_table(None, SimpleNamespace(connection=connection, execute=cursor.execute))
+            cursor.execute(f'SELECT rowid, * FROM {index.table}')
+            self.assertEqual([(pk, *map(str, columns)) for pk, *columns in cursor.fetchall()],
+                             [(pk, *columns) for pk, columns in index.documents(Pet.objects.all())])
+        self.assertEqual(search_ids(Pet.objects.all(), '15.20', PET_SEARCH_CONFIG), [self.pet.pet_id])
+
+
+class PortableSearchTest(SearchBehaviourMixin, TestCase):
+    """The searches of the backends without the full-text index, such as PostgreSQL."""
+
+    def setUp(self):
+        patcher = mock.patch.object(SearchIndex, 'enabled', staticmethod(lambda: False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_index_is_not_used(self):
+        results, _, _ = handle_search(Appointment.objects.all(), 'all_categories', 'limp',
+                                      APPOINTMENT_SEARCH_CONFIG)
+        self.assertNotIn('_fts', str(results.query))
+        self.assertEqual([row['appointment_id'] for row in results], [self.appointment.appointment_id])
@@ -0,0 +1,233 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, Billing, Gender, Owner, PaymentMethod, PaymentStatus, Pet, Species, StaleEdit,
+    Veterinarian,
+)
+from paw_n_care.services import book_appointment, edit_appointment, edit_billing, edit_owner, edit_pet
+
+NEW_OWNER = {
+    'first_name': 'Mia', 'last_name': 'Brown', 'address': '1 Silom Road', 'phone': '0899999999',
+    'email': 'mia@example.com',
+}
+NEW_PET = {
+    'pet_name': 'Luna', 'species': 'other', 'new_species': 'cat', 'breed': 'Siamese',
+    'date_of_birth': '2021-05-05', 'gender': 'female', 'weight': '4.2',
+}
+
+
+class BookAppointmentTest(TestCase):
+    def setUp(self):
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="0811111111", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Buddy", species=Species.get_for_name("Dog"), breed="beagle",
+            date_of_birth=date(2020, 1, 1), gender=Gender.MALE, weight=10
+        )
+
+    def appointment(self, **values):
+        data = {
+            'vet': str(self.vet.vet_id), 'appointment_date': '2026-03-01', 'appointment_time': '10:30',
+            'reason': 'Checkup', 'status': 'Scheduled',
+        }
+        data.update(values)
+        return data
+
+    def test_existing_pet_is_looked_up_with_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            appointment = book_appointment(self.appointment(existing_pet=str(self.pet.pet_id)))
+        statements = [query['sql'].split()[0] for query in queries if not query['sql'].startswith('SAVEPOINT')]
+        # The vet and the pet's owner come from one query and the vet's bookings around the slot from
+        # another; the rest is the rollup and search maintenance
+        self.assertEqual(statements[:3], ['SELECT', 'SELECT', 'INSERT'])
+        appointment.refresh_from_db()
+        self.assertEqual((appointment.pet_id, appointment.owner_id, appointment.vet_id),
+                         (self.pet.pet_id, self.owner.owner_id, self.vet.vet_id))
+        self.assertEqual((appointment.appointment_date, appointment.status), (date(2026, 3, 1), AppointmentStatus.SCHEDULED))
+
+    def test_new_owner_and_pet(self):
+        appointment = book_appointment(self.appointment(**NEW_OWNER, **NEW_PET))
+        pet = Pet.objects.select_related('owner', 'species').get(pk=appointment.pet_id)
+        self.assertEqual((pet.name, pet.species.name, pet.breed, pet.gender), ('Luna', 'Cat', 'siamese', Gender.FEMALE))
+        self.assertEqual((pet.owner.email, pet.owner.search_name, pet.owner.appointment_count),
+                         ('mia@example.com', 'mia brown', 1))
+        self.assertEqual(appointment.owner_id, pet.owner_id)
+
+    def test_new_pet_of_existing_owner(self):
+        appointment = book_appointment(self.appointment(existing_owner=str(self.owner.owner_id), **NEW_PET))
+        self.assertEqual(appointment.owner_id, self.owner.owner_id)
+        self.assertEqual(self.owner.pets.count(), 2)
+
+    def test_invalid_fields_are_all_reported_and_nothing_is_written(self):
+        data = self.appointment(appointment_date='2026-02-30', status='Lost', vet='', **NEW_OWNER, **NEW_PET)
+        data.update(email='not an email', weight='-1', gender='')
+        with self.assertRaises(ValidationError) as raised:
+            book_appointment(data)
+        self.assertEqual(set(raised.exception.message_dict),
+                         {'appointment_date', 'status', 'vet', 'email', 'weight', 'gender'})
+        self.assertEqual((Owner.objects.count(), Pet.objects.count(), Appointment.objects.count()), (1, 1, 0))
+
+    def test_unknown_references(self):
+        for values, field in [({'vet': '999', 'existing_pet': str(self.pet.pet_id)}, 'vet'),
+                              ({'existing_pet': '999'}, 'existing_pet'),
+                              ({'existing_owner': '999', **NEW_PET}, 'existing_owner')]:
+            with self.subTest(field=field), self.assertRaises(ValidationError) as raised:
+                book_appointment(self.appointment(**values))
+            self.assertEqual(list(raised.exception.message_dict), [field])
+        self.assertEqual(Pet.objects.count(), 1)
+
+    def test_failure_after_the_pet_leaves_no_orphans(self):
+        with mock.patch.object(Appointment, 'save', side_effect=DatabaseError("disk full")), \
+                self.assertRaises(DatabaseError):
+            book_appointment(self.appointment(**NEW_OWNER, **NEW_PET))
+        self.assertFalse(Owner.objects.filter(email='mia@example.com').exists())
+        self.assertFalse(Pet.objects.filter(name='Luna').exists())
+
+    def test_view_reports_errors(self):
+        response = self.client.post(reverse('paw_n_care:appointments'), self.appointment(existing_pet='999'))
+        self.assertRedirects(response, reverse('paw_n_care:appointments'))
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+                         ["Existing pet: No pet 999."])
+
+        response = self.client.post(reverse('paw_n_care:appointments'),
+                                    self.appointment(existing_pet=str(self.pet.pet_id)), follow=True)
+        self.assertContains(response, f"Appointment {Appointment.objects.get().pk} booked.")
+
+
+class EditServiceTest(TestCase):
+    def setUp(self):
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="0811111111", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Buddy", species=Species.get_for_name("Dog"), breed="beagle",
+            date_of_birth=date(2020, 1, 1), gender=Gender.MALE, weight=10
+        )
+        self.appointment = Appointment.objects.create(
+            pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=date(2026, 3, 1),
+            appointment_time='10:30', reason='Checkup', status=AppointmentStatus.SCHEDULED
+        )
+
+    def owner_form(self, **values):
+        data = {'first_name': 'Alex', 'last_name': 'Lee', 'address': 'XYZ Road', 'phone': '0811111111',
+                'email': 'alex@example.com', 'version': '0'}
+        data.update(values)
+        return data
+
+    def appointment_form(self, **values):
+        data = {'vet': str(self.vet.vet_id), 'appointment_date': '2026-03-01', 'appointment_time': '10:30',
+                'reason': 'Checkup', 'status': 'Scheduled', 'version': '0', 'pet_name': 'Buddy', 'weight': '10.00',
+                'pet_version': '0', 'phone': '0811111111', 'email': 'alex@example.com', 'address': 'XYZ Road',
+                'owner_version': '0'}
+        data.update(values)
+        return data
+
+    def test_only_changed_columns_are_written(self):
+        owner = Owner.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            changed = edit_owner(owner, self.owner_form(email='alex@clinic.example'))
+        self.assertEqual(changed, ['email'])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "paw_n_care_owner"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"email"', updates[0])
+        self.assertNotIn('"first_name"', updates[0])
+        self.assertNotIn('"address"', updates[0])
+        owner.refresh_from_db()
+        self.assertEqual((owner.email, owner.version), ('alex@clinic.example', 1))
+
+    def test_unchanged_form_writes_nothing(self):
+        billing = Billing.objects.create(
+            appointment=self.appointment, total_amount='120.50', payment_status=PaymentStatus.PENDING,
+            payment_method=PaymentMethod.CASH, payment_date=timezone.make_aware(timezone.datetime(2026, 3, 1, 11, 0))
+        )
+        billing = Billing.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            changed = edit_billing(billing, {'total_amount': '120.5', 'payment_status': 'Pending',
+                                             'payment_method': 'Cash', 'payment_date': '2026-03-01T11:00',
+                                             'version': '0'})
+        self.assertEqual(changed, [])
+        self.assertEqual(len(queries), 0)
+
+        changed = edit_billing(billing, {'payment_status': 'Paid', 'version': '0'})
+        self.assertEqual(changed, ['payment_status'])
+        billing.refresh_from_db()
+        self.assertEqual((billing.payment_status, billing.version), (PaymentStatus.PAID, 1))
+
+    def test_stale_form_is_rejected(self):
+        edit_owner(Owner.objects.get(), self.owner_form(address='1 Silom Road'))
+        with self.assertRaisesMessage(StaleEdit, f"Owner {self.owner.owner_id} was changed by someone else."):
+            edit_owner(Owner.objects.get(), self.owner_form(first_name='Jordan'))
+        self.assertEqual(Owner.objects.get().first_name, 'Alex')
+
+    def test_concurrent_save_is_rejected(self):
+        first, second = Pet.objects.get(), Pet.objects.get()
+        edit_pet(first, {'weight': '11', 'version': '0'})
+        # The second receptionist read the row before the first one saved it
+        with self.assertRaises(StaleEdit):
+            edit_pet(second, {'name': 'Max', 'version': '0'})
+        second.version = 0
+        with self.assertRaises(StaleEdit), transaction.atomic():
+            second.save(update_fields=['name'])
+        pet = Pet.objects.get()
+        self.assertEqual((pet.name, pet.weight, pet.version), ('Buddy', 11, 1))
+
+    def test_pet_and_owner_of_an_appointment_are_saved_with_it(self):
+        appointment = Appointment.objects.select_related('pet', 'owner').get()
+        changed = edit_appointment(appointment, self.appointment_form(
+            status='Completed', pet_name='Buddy Jr', weight='12.5', phone='0822222222'))
+        self.assertEqual(changed, ['status'])
+        pet, owner = Pet.objects.get(), Owner.objects.get()
+        self.assertEqual((pet.name, pet.search_name, pet.weight), ('Buddy Jr', 'buddy jr', 12.5))
+        self.assertEqual((owner.phone_number, owner.version), ('0822222222', 1))
+        self.assertEqual(Veterinarian.objects.get().completed_count, 1)
+        self.assertEqual(owner.appointment_count, 1)
+
+    def test_stale_owner_rolls_back_the_appointment(self):
+        Owner.objects.update(version=5)
+        appointment = Appointment.objects.select_related('pet', 'owner').get()
+        appointment.owner.version = 0
+        with self.assertRaises(StaleEdit):
+            edit_appointment(appointment, self.appointment_form(status='Cancelled', weight='9', phone='0822222222'))
+        self.assertEqual(Appointment.objects.get().status, AppointmentStatus.SCHEDULED)
+        self.assertEqual(Pet.objects.get().weight, 10)
+
+    def test_invalid_fields_are_reported_by_form_input(self):
+        appointment = Appointment.objects.select_related('pet', 'owner').get()
+        with self.assertRaises(ValidationError) as raised:
+            edit_appointment(appointment, self.appointment_form(
+                appointment_date='2026-02-30', vet='x', weight='-1', email='nope', status='Lost'))
+        self.assertEqual(set(raised.exception.message_dict), {'appointment_date', 'vet', 'weight', 'email', 'status'})
+        with self.assertRaisesMessage(ValidationError, 'No veterinarian 999.'):
+            edit_appointment(appointment, self.appointment_form(vet='999'))
+        self.assertEqual(Appointment.objects.get().version, 0)
+
+    def test_view_reports_stale_edits(self):
+        url = reverse('paw_n_care:edit_owner', args=[self.owner.owner_id])
+        self.assertContains(self.client.get(url), 'name="version" value="0"')
+        response = self.client.post(url, self.owner_form(first_name='Jordan'))
+        self.assertRedirects(response, reverse('paw_n_care:appointments'))
+
+        response = self.client.post(url, self.owner_form(first_name='Sam'), follow=True)
+        self.assertRedirects(response, url)
+        self.assertContains(response, "was changed by someone else")
+        self.assertEqual(Owner.objects.get().first_name, 'Jordan')
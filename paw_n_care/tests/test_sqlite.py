@@ -0,0 +1,65 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from paw_n_care import sqlite
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite tuning")
+class SQLiteProfileTest(SimpleTestCase):
+    def open_file_database(self, directory):
+        settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory, 'tuning.sqlite3'), 'OPTIONS': {}}
+        wrapper = DatabaseWrapper(settings_dict, alias='tuning')
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PROFILE='production', SQLITE_PRAGMAS={'busy_timeout': 9000}, SQLITE_OPTIMIZE_INTERVAL=0)
+    def test_production_profile_is_applied_to_new_connections(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.open_file_database(directory)
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'temp_store'), 2)
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), -64000)
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 9000)
+            wrapper.close()
+
+    @override_settings(SQLITE_PROFILE='default')
+    def test_default_profile_keeps_sqlite_defaults(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.open_file_database(directory)
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+            wrapper.close()
+
+    @override_settings(SQLITE_PROFILE='turbo')
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            sqlite.profile_pragmas()
+
+    @override_settings(SQLITE_OPTIMIZE_INTERVAL=60)
+    def test_optimize_runs_once_per_interval(self):
+        with mock.patch.object(sqlite, '_last_optimized', None), \
+                mock.patch.object(sqlite.time, 'monotonic', side_effect=[1000, 1030, 1061]):
+            self.assertTrue(sqlite.optimize_due())
+            self.assertFalse(sqlite.optimize_due())
+            self.assertTrue(sqlite.optimize_due())
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite tuning")
+class OptimizeDatabaseCommandTest(TestCase):
+    def test_command_runs(self):
+        output = StringIO()
+        call_command('optimize_database', stdout=output)
+        self.assertIn("Database optimized", output.getvalue())
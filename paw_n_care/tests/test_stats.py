@@ -0,0 +1,97 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Owner, Pet, Species, Veterinarian, Appointment, MedicalRecord, Billing,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus,
+)
+from paw_n_care.stats import ClinicStatistics, collect_statistics
+
+
+class StatisticsEngineTest(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="5555555555", email="alex@example.com",
+            registration_date=timezone.now()
+        )
+        self.dog = Pet.objects.create(
+            owner=self.owner, name="Bobby", species=Species.get_for_name("Dog"), breed="Beagle",
+            date_of_birth=today - timedelta(days=365), gender=Gender.MALE, weight=10
+        )
+        self.cat = Pet.objects.create(
+            owner=self.owner, name="Kitty", species=Species.get_for_name("Cat"), breed="Persian",
+            date_of_birth=today - timedelta(days=365), gender=Gender.FEMALE, weight=4
+        )
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.other_vet = Veterinarian.objects.create(
+            first_name="Eva", last_name="Jones", specialization="Exotic",
+            license_number="VET321", phone_number="1111222233", email="eva@example.com"
+        )
+        first = Appointment.objects.create(
+            pet=self.dog, owner=self.owner, vet=self.vet, appointment_date=today,
+            appointment_time="10:00", reason="Checkup", status=AppointmentStatus.COMPLETED
+        )
+        Appointment.objects.create(
+            pet=self.dog, owner=self.owner, vet=self.vet, appointment_date=today,
+            appointment_time="11:00", reason="Follow up", status=AppointmentStatus.COMPLETED
+        )
+        second = Appointment.objects.create(
+            pet=self.cat, owner=self.owner, vet=self.other_vet, appointment_date=today,
+            appointment_time="12:00", reason="Vaccination", status=AppointmentStatus.SCHEDULED
+        )
+        MedicalRecord.objects.create(
+            appointment=first, pet=self.dog, vet=self.vet, visit_date=timezone.now(),
+            diagnosis="Allergy", treatment="Antihistamine", prescribed_medication="Cetirizine"
+        )
+        Billing.objects.create(
+            appointment=first, total_amount=300, payment_status=PaymentStatus.PAID,
+            payment_method=PaymentMethod.CASH, payment_date=timezone.now()
+        )
+        Billing.objects.create(
+            appointment=second, total_amount=100, payment_status=PaymentStatus.PENDING,
+            payment_method=PaymentMethod.CREDIT_CARD, payment_date=timezone.now()
+        )
+
+    def test_collect_statistics_values(self):
+        stats = collect_statistics(self.vet.vet_id)
+        self.assertIsInstance(stats, ClinicStatistics)
+        self.assertEqual(stats.appointments, 2)
+        self.assertEqual(stats.total_appointments, 3)
+        self.assertEqual(stats.pets_managed, 1)
+        self.assertEqual(stats.total_pets_managed, 2)
+        self.assertEqual(stats.bills_paid, Decimal('300'))
+        self.assertEqual(stats.total_bills_paid, Decimal('400'))
+        self.assertEqual(stats.completed_count, 2)
+        self.assertEqual(stats.scheduled_count, 1)
+        self.assertEqual(stats.returning_owners, 1)
+        self.assertEqual(stats.top_vet_full_name, "Sara Connor")
+        self.assertEqual(stats.dog_avg_weight, Decimal('10'))
+        self.assertEqual(stats.cat_avg_weight, Decimal('4'))
+        self.assertEqual(stats.most_frequent_species, 'N/A')
+
+        context = stats.as_context()
+        self.assertEqual(context['appointment_percentage'], 67)
+        self.assertEqual(context['bills_paid_percentage'], 75)
+        self.assertEqual(context['paid_percentage'], 50)
+        self.assertEqual(context['cash_percentage'], 50)
+        self.assertEqual(context['medication_percentage'], 33)
+
+    def test_collect_statistics_query_count(self):
+        # One query per rollup table plus the group-by widgets, independent of the widget count
+        with self.assertNumQueries(10):
+            collect_statistics(self.vet.vet_id)
+
+    def test_statistic_view_uses_engine(self):
+        response = self.client.get(reverse('paw_n_care:statistic'), {'vet': self.vet.vet_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['appointments'], 2)
+        self.assertEqual(response.context['top_vets'], "Sara Connor")
@@ -0,0 +1,154 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User as AuthUser
+from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import (
+    Appointment, AppointmentStatus, Billing, Gender, Owner, PaymentMethod, PaymentStatus, Pet, Species,
+    Veterinarian,
+)
+from paw_n_care.tests.test_rollups import rollup_snapshot
+from paw_n_care.transitions import apply_transition, target_statuses
+
+
+class TransitionTest(TestCase):
+    def setUp(self):
+        self.vet = Veterinarian.objects.create(
+            first_name="Sara", last_name="Connor", specialization="Canine",
+            license_number="VET999", phone_number="2222222222", email="sara@example.com"
+        )
+        self.owner = Owner.objects.create(
+            first_name="Alex", last_name="Lee", address="XYZ Road",
+            phone_number="0811111111", email="alex@example.com", registration_date=timezone.now()
+        )
+        self.pet = Pet.objects.create(
+            owner=self.owner, name="Buddy", species=Species.get_for_name("Dog"), breed="beagle",
+            date_of_birth=date(2020, 1, 1), gender=Gender.MALE, weight=10
+        )
+        self.appointments = [
+            Appointment.objects.create(
+                pet=self.pet, owner=self.owner, vet=self.vet, appointment_date=date(2026, 3, day),
+                appointment_time=start, reason=reason, status=status
+            )
+            for day, start, reason, status in [(1, '10:30', 'Checkup', AppointmentStatus.SCHEDULED),
+                                               (1, '11:00', 'Vaccination', AppointmentStatus.SCHEDULED),
+                                               (2, '10:30', 'Checkup', AppointmentStatus.COMPLETED)]
+        ]
+        self.bills = [
+            Billing.objects.create(
+                appointment=appointment, total_amount=amount, payment_status=status,
+                payment_method=PaymentMethod.CASH, payment_date=timezone.now()
+            )
+            for appointment, amount, status in [(self.appointments[0], 100, PaymentStatus.PENDING),
+                                                (self.appointments[1], 50, PaymentStatus.OVERDUE),
+                                                (self.appointments[2], 80, PaymentStatus.PAID)]
+        ]
+
+    def assert_rollups_match_rebuild(self):
+        maintained = rollup_snapshot()
+        counters = list(Veterinarian.objects.values_list('appointment_count', 'completed_count', 'billed_total'))
+        call_command('rebuild_rollups', stdout=open('/dev/null', 'w'))
+        call_command('repair_counters', stdout=open('/dev/null', 'w'))
+        self.assertEqual(rollup_snapshot(), maintained)
+        self.assertEqual(list(Veterinarian.objects.values_list('appointment_count', 'completed_count',
+                                                               'billed_total')), counters)
+
+    def test_allowed_rows_move_with_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = apply_transition(Appointment.objects.all(), 'completed')
+        self.assertEqual((result.updated, result.skipped), (2, 1))
+        updates = [query for query in queries if query['sql'].startswith('UPDATE "paw_n_care_appointment"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(list(Appointment.objects.order_by('pk').values_list('status', 'version')),
+                         [(AppointmentStatus.COMPLETED, 1), (AppointmentStatus.COMPLETED, 1),
+                          (AppointmentStatus.COMPLETED, 0)])
+        self.assertEqual(Veterinarian.objects.get().completed_count, 3)
+        self.assert_rollups_match_rebuild()
+
+    def test_disallowed_transitions_are_skipped(self):
+        result = apply_transition(Billing.objects.all(), PaymentStatus.OVERDUE)
+        self.assertEqual((result.updated, result.skipped), (1, 2))
+        self.assertEqual(list(Billing.objects.order_by('pk').values_list('payment_status', flat=True)),
+                         [PaymentStatus.OVERDUE, PaymentStatus.OVERDUE, PaymentStatus.PAID])
+
+        result = apply_transition(Billing.objects.filter(pk__in=[self.bills[0].pk, self.bills[1].pk]), 'Paid')
+        self.assertEqual((result.updated, result.skipped), (2, 0))
+        self.assert_rollups_match_rebuild()
+
+        with self.assertRaises(ValueError):
+            apply_transition(Billing.objects.all(), 'Refunded')
+
+    def test_overdue_sweep(self):
+        # Only the pending bill dated before the payment term moves; the sweep can run again
+        for bill in self.bills:
+            bill.payment_date = timezone.now() - timedelta(days=45)
+            bill.save()
+        late = Billing.objects.create(appointment=self.appointments[2], total_amount=20,
+                                      payment_status=PaymentStatus.PENDING, payment_method=PaymentMethod.CASH,
+                                      payment_date=timezone.now() - timedelta(days=10))
+        output = StringIO()
+        call_command('mark_overdue_bills', chunk_size=2, stdout=output)
+        self.assertIn('1 bills pending since before', output.getvalue())
+        self.assertEqual(list(Billing.objects.order_by('pk').values_list('payment_status', flat=True)),
+                         [PaymentStatus.OVERDUE, PaymentStatus.OVERDUE, PaymentStatus.PAID, PaymentStatus.PENDING])
+        self.assert_rollups_match_rebuild()
+
+        call_command('mark_overdue_bills', stdout=output)
+        self.assertIn('0 bills pending', output.getvalue())
+        # Only the primary keys of the due bills are walked, not the table from its first row
+        output = StringIO()
+        call_command('mark_overdue_bills', days=7, chunk_size=2, stdout=output)
+        self.assertIn('1 bills pending since before', output.getvalue())
+        self.assertIn('in 1 chunks', output.getvalue())
+        self.assertEqual(Billing.objects.get(pk=late.pk).payment_status, PaymentStatus.OVERDUE)
+
+    def test_targets(self):
+        self.assertEqual(target_statuses(Appointment), list(AppointmentStatus))
+        self.assertEqual(target_statuses(Billing), [PaymentStatus.PAID, PaymentStatus.OVERDUE])
+
+    def test_view_moves_checked_rows(self):
+        first, second, _ = self.appointments
+        response = self.client.post(reverse('paw_n_care:transition', args=['appointments']), {
+            'ids': [str(first.pk), str(second.pk)], 'status': 'Cancelled', 'scope': 'selected',
+        })
+        self.assertRedirects(response, reverse('paw_n_care:home'))
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+                         ["2 appointments marked Cancelled."])
+        self.assertEqual(Appointment.objects.filter(status=AppointmentStatus.CANCELLED).count(), 2)
+
+    def test_view_moves_search_results(self):
+        url = reverse('paw_n_care:transition', args=['appointments'])
+        data = {'search-dropdown': 'reason', 'search-query': 'Checkup', 'status': 'Completed'}
+        response = self.client.post(url, {**data, 'scope': 'search'})
+        self.assertRedirects(response, reverse('paw_n_care:home') + '?search-dropdown=reason&search-query=Checkup')
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+                         ["1 appointments marked Completed.",
+                          "1 appointments were left unchanged: their status cannot change to Completed."])
+        self.assertEqual(Appointment.objects.get(pk=self.appointments[1].pk).status, AppointmentStatus.SCHEDULED)
+
+        # Without a search the whole table would change
+        response = self.client.post(url, {'status': 'Cancelled', 'scope': 'search'})
+        self.assertEqual([str(message) for message in get_messages(response.wsgi_request)],
+                         ["Search for the appointments to change first."])
+        self.assertFalse(Appointment.objects.filter(status=AppointmentStatus.CANCELLED).exists())
+
+    def test_home_lists_offer_the_transitions(self):
+        response = self.client.get(reverse('paw_n_care:billing-home'))
+        self.assertContains(response, f'name="ids" value="{self.bills[0].pk}"')
+        self.assertContains(response, '<option value="Overdue">Overdue</option>', html=True)
+        self.assertNotContains(response, '<option value="Pending">Pending</option>', html=True)
+
+    def test_admin_action(self):
+        self.client.force_login(AuthUser.objects.create_superuser('admin', 'admin@example.com', 'secret'))
+        response = self.client.post(reverse('admin:paw_n_care_billing_changelist'), {
+            'action': 'mark_paid', '_selected_action': [str(bill.pk) for bill in self.bills],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(Billing.objects.values_list('payment_status', flat=True)), {PaymentStatus.PAID})
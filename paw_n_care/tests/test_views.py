@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from paw_n_care.models import Owner, Pet, Species, Gender
+
+
+class OwnerHomeTest(TestCase):
+    def setUp(self):
+        for number in range(10):
+            owner = Owner.objects.create(
+                first_name=f"Owner{number}", last_name="Lee", address="XYZ Road",
+                phone_number="5555555555", email=f"owner{number}@example.com",
+                registration_date=timezone.now()
+            )
+            for pet_number in range(number % 3):
+                Pet.objects.create(
+                    owner=owner, name=f"Pet{number}-{pet_number}", species=Species.get_for_name("Dog"), breed="Beagle",
+                    date_of_birth=timezone.localdate() - timedelta(days=365), gender=Gender.MALE, weight=10
+                )
+
+    def get_owner_home(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('paw_n_care:owner-home'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_owners(self):
+        # One query for the annotated owners and one prefetch of their pets
+        response, query_count = self.get_owner_home()
+        self.assertEqual(query_count, 2)
+
+        Owner.objects.create(
+            first_name="Extra", last_name="Owner", address="ABC Road",
+            phone_number="5555555555", email="extra@example.com", registration_date=timezone.now()
+        )
+        response, query_count = self.get_owner_home()
+        self.assertEqual(query_count, 2)
+
+    def test_pet_summaries(self):
+        response, _ = self.get_owner_home()
+        owners = {owner.first_name: owner for owner in response.context['owners']}
+        self.assertEqual(owners['Owner2'].pet_count, 2)
+        self.assertEqual([pet.name for pet in owners['Owner2'].pet_list], ['Pet2-0', 'Pet2-1'])
+        self.assertContains(response, "#{} Pet1-0".format(owners['Owner1'].pet_list[0].pet_id))
+        self.assertContains(response, "No pets")
+
+    def test_search_by_pet_name_keeps_pet_count(self):
+        response, _ = self.get_owner_home(**{'search-dropdown': 'pet', 'search-query': 'Pet5-1'})
+        owners = list(response.context['owners'])
+        self.assertEqual([owner.first_name for owner in owners], ['Owner5'])
+        self.assertEqual(owners[0].pet_count, 2)
+
+    def test_search_by_pet_id(self):
+        pet = Pet.objects.get(name='Pet4-0')
+        response, _ = self.get_owner_home(**{'search-query': str(pet.pet_id)})
+        self.assertIn('Owner4', [owner.first_name for owner in response.context['owners']])
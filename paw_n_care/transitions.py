@@ -0,0 +1,124 @@
+"""Status changes applied to many appointments or bills at once.
+
+A transition moves every selected row whose current status allows it, by the
+transition table of its model, to the target status with a single ``UPDATE``;
+the selected rows in any other status are skipped and counted. The UPDATE
+bypasses the signals, so the rollups, counters, search documents and cached
+pages that depend on the status are refreshed here from the rows read before
+the change.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Set
+
+from django.db import transaction
+from django.db.models import F
+
+from paw_n_care import rollups, scheduling
+from paw_n_care.cache import bump_model_version
+from paw_n_care.models import Appointment, AppointmentStatus, Billing, PaymentStatus, choice_value
+from paw_n_care.search import SEARCH_INDEXES
+from paw_n_care.signals import COUNTED_BY
+
+# The statuses each status may move to
+APPOINTMENT_TRANSITIONS = {
+    AppointmentStatus.SCHEDULED: {AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED},
+    AppointmentStatus.CANCELLED: {AppointmentStatus.SCHEDULED},
+    AppointmentStatus.COMPLETED: set(),
+}
+BILLING_TRANSITIONS = {
+    PaymentStatus.PENDING: {PaymentStatus.PAID, PaymentStatus.OVERDUE},
+    PaymentStatus.OVERDUE: {PaymentStatus.PAID},
+    PaymentStatus.PAID: set(),
+}
+
+# Status column, its choices and transition table, by model
+TRANSITIONS = {
+    Appointment: ('status', AppointmentStatus, APPOINTMENT_TRANSITIONS),
+    Billing: ('payment_status', PaymentStatus, BILLING_TRANSITIONS),
+}
+
+# Columns a row's rollup contributions are computed from
+CONTRIBUTION_FIELDS = {
+    Appointment: ['pk', 'vet_id', 'pet_id', 'owner_id', 'appointment_date', 'appointment_time', 'status'],
+    Billing: ['pk', 'total_amount', 'payment_status', 'payment_method', 'payment_date',
+              'appointment__vet_id', 'appointment__owner_id'],
+}
+
+
+@dataclass
+class TransitionResult:
+    """Numbers of selected rows moved to the target status and left alone because their status does not allow it."""
+    updated: int = 0
+    skipped: int = 0
+
+
+def allowed_sources(model, status) -> List[Any]:
+    """Return the statuses of ``model`` that may move to ``status``."""
+    _, _, table = TRANSITIONS[model]
+    return [source for source, targets in table.items() if status in targets]
+
+
+def target_statuses(model) -> List[Any]:
+    """Return the statuses of ``model`` that some status may move to, in choice order."""
+    _, choices, table = TRANSITIONS[model]
+    targets = set().union(*table.values())
+    return [status for status in choices if status in targets]
+
+
+def _contributions(model, row: Dict[str, Any], status) -> List[rollups.Contribution]:
+    field = TRANSITIONS[model][0]
+    values = {name: value for name, value in row.items() if '__' not in name}
+    values[field] = status
+    if model is Billing:
+        return rollups.billing_contributions(Billing(**values), vet_id=row['appointment__vet_id'],
+                                             owner_id=row['appointment__owner_id'])
+    return rollups.CONTRIBUTIONS[model](model(**values))
+
+
+def _double_bookings(model, rows: List[Dict[str, Any]], status) -> Set[int]:
+    """Return the primary keys of the cancelled appointments in ``rows`` that would take a booked slot of their vet."""
+    if model is not Appointment or status == AppointmentStatus.CANCELLED:
+        return set()
+    revived = [Appointment(pk=row['pk'], vet_id=row['vet_id'], appointment_date=row['appointment_date'],
+                           appointment_time=row['appointment_time'], status=status)
+               for row in rows if row['status'] == AppointmentStatus.CANCELLED]
+    return {revived[index].pk for index in scheduling.find_conflicts(revived)}
+
+
+def apply_transition(queryset, status) -> TransitionResult:
+    """Move the rows of ``queryset`` (appointments or bills) whose status allows it to ``status``.
+
+    ``status`` may be any form accepted by :func:`choice_value`; an unknown
+    status raises ``ValueError``. The moved rows get a new version, so the
+    edit forms opened before the change are refused. Cancelled appointments
+    whose slot has since been booked for their vet stay cancelled and are
+    counted as skipped.
+    """
+    model = queryset.model
+    field, choices, _ = TRANSITIONS[model]
+    status = choice_value(choices, status)
+    sources = allowed_sources(model, status)
+    selection = model.objects.filter(pk__in=queryset.values('pk'))
+
+    with transaction.atomic():
+        rows = list(selection.select_for_update(of=('self',)).values(*CONTRIBUTION_FIELDS[model]))
+        moved = [row for row in rows if row[field] in sources]
+        blocked = _double_bookings(model, moved, status)
+        moved = [row for row in moved if row['pk'] not in blocked]
+        result = TransitionResult(skipped=len(rows) - len(moved))
+        if not moved:
+            return result
+        result.updated = selection.filter(**{f'{field}__in': sources}).exclude(pk__in=blocked).update(
+            **{field: status, 'version': F('version') + 1})
+
+        # Each moved row leaves the rollup rows of its old status for those of the new one
+        contributions = []
+        for row in moved:
+            contributions += [(rollup, keys, {name: -value for name, value in deltas.items()})
+                              for rollup, keys, deltas in _contributions(model, row, row[field])]
+            contributions += _contributions(model, row, status)
+        rollups.apply_contributions_in_bulk(contributions)
+        SEARCH_INDEXES[model].refresh(row['pk'] for row in moved)
+        for changed in (model, *COUNTED_BY.get(model, [])):
+            bump_model_version(changed)
+    return result
@@ -14,9 +14,15 @@ urlpatterns = [
     path('home/owner/', views.OwnerHome.as_view(), name='owner-home'),
     path('home/medical-record/', views.MedRecHome.as_view(), name='medical-record-home'),
     path('home/billing/', views.BillingHome.as_view(), name='billing-home'),
+    path('home/export/<str:source>/', views.export_view, name='export'),
+    path('home/transition/<str:source>/', views.transition_view, name='transition'),
     path('appointments/', views.Appointments.as_view(), name='appointments'),
+    path('appointments/import/', views.AppointmentImport.as_view(), name='appointments-import'),
+    path('appointments/availability/', views.availability_view, name='availability'),
     path('medical-records/', views.MedRec.as_view(), name='medical-records'),
     path('billing/', views.Bill.as_view(), name='billing'),
+    path('autocomplete/<str:source>/', views.autocomplete_view, name='autocomplete'),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('statistic/', views.Statistic.as_view(), name='statistic'),
     path('home/edit/appointment/<int:appointment_id>/', views.edit_appointment, name='edit_appointment'),
     path('home/edit/pet/<pet_id>/', views.edit_pet, name='edit_pet'),
@@ -0,0 +1,27 @@
+"""Small helpers shared by the management commands and services."""
+import unicodedata
+
+from django.db.models import Max, Min
+
+
+def pk_chunks(model, chunk_size, queryset=None):
+    """Yield querysets covering ``model`` in consecutive primary-key ranges of ``chunk_size``.
+
+    The ranges span the primary keys of ``queryset`` only, so a filtered
+    queryset is not walked from the start of the table.
+    """
+    pk_name = model._meta.pk.name
+    if queryset is None:
+        queryset = model.objects.all()
+    bounds = queryset.aggregate(first=Min(pk_name), last=Max(pk_name))
+    if bounds['first'] is None:
+        return
+    for start in range(bounds['first'] - 1, bounds['last'], chunk_size):
+        yield queryset.filter(**{f'{pk_name}__gt': start, f'{pk_name}__lte': start + chunk_size})
+
+
+def normalize_name(*parts) -> str:
+    """Return the lower-cased, accent-free, single-spaced form of ``parts`` used for prefix matching."""
+    text = unicodedata.normalize('NFKD', ' '.join(str(part) for part in parts if part))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())
@@ -1,424 +1,275 @@
-from typing import Dict, Any
+import codecs
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse, Http404, StreamingHttpResponse
+from django.contrib import messages
 from django.contrib.auth import logout
-from django.db.models import Count, Sum, Avg, Q
-
-from paw_n_care.models import Appointment, Owner, Pet, Veterinarian, MedicalRecord, Billing, User
-
-APPOINTMENT_SEARCH_CONFIG = {
-    'all_fields': [
-        'appointment_id',
-        'vet__first_name',
-        'reason',
-        'status',
-        'appointment_date',
-        'appointment_time',
-        'pet__name',
-        'pet__pet_id',
-        'pet__owner__owner_id',
-        'pet__owner__first_name'
-    ],
-    'field_mappings': {
-        'appointment_id': 'appointment_id',
-        'vet': 'vet__first_name',
-        'reason': 'reason',
-        'status': 'status',
-        'appointment_date': 'appointment_date',
-        'appointment_time': 'appointment_time',
-        'pet_id': 'pet__pet_id',
-        'pet_name': 'pet__name',
-        'owner_id': 'pet__owner__owner_id',
-        'owner_name': 'pet__owner__first_name'
-    },
-    'date_fields': ['appointment_date'],
-    'values_fields': [
-        'appointment_id', 'reason', 'status',
-        'appointment_date', 'appointment_time', 'vet__first_name',
-        'pet__pet_id', 'pet__name', 'pet__owner__owner_id',
-        'pet__owner__first_name'
-    ]
-}
-
-MEDICAL_RECORD_SEARCH_CONFIG = {
-    'all_fields': [
-        'record_id',
-        'appointment__appointment_id',
-        'pet__pet_id',
-        'pet__name',
-        'diagnosis',
-        'treatment',
-        'prescribed_medication',
-        'visit_date',
-        'notes'
-    ],
-    'field_mappings': {
-        'record_id': 'record_id',
-        'appointment_id': 'appointment__appointment_id',
-        'pet_id': 'pet__pet_id',
-        'pet_name': 'pet__name',
-        'diagnosis': 'diagnosis',
-        'treatment': 'treatment',
-        'prescribed_medication': 'prescribed_medication',
-        'visit_date': 'visit_date',
-        'notes': 'notes'
-
-    },
-    'date_fields': ['visit_date'],
-    'select_related': ['appointment', 'pet', 'vet', 'diagnosis', 'treatment', 'prescribed_medication'],
-    'values_fields': [
-        'record_id', 'appointment__appointment_id', 'pet__name',
-        'pet__pet_id', 'vet__first_name', 'vet__last_name',
-        'visit_date', 'diagnosis', 'treatment', 'prescribed_medication', 'notes'
-    ]
-}
-
-BILLING_SEARCH_CONFIG = {
-    'all_fields': [
-        'bill_id',
-        'appointment__appointment_id',
-        'appointment__owner__first_name',
-        'payment_status',
-        'payment_method',
-        'payment_date',
-        'total_amount'
-    ],
-    'field_mappings': {
-        'bill_id': 'bill_id',
-        'appointment_id': 'appointment__appointment_id',
-        'owner_name': 'appointment__owner__first_name',
-        'payment_status': 'payment_status',
-        'payment_method': 'payment_method',
-        'payment_date': 'payment_date'
-    },
-    'date_fields': ['payment_date'],
-    'select_related': ['appointment', 'appointment__pet', 'appointment__vet'],
-    'values_fields': [
-        'bill_id', 'appointment__appointment_id',
-        'appointment__owner__owner_id', 'appointment__owner__first_name',
-        'appointment__owner__last_name', 'appointment__pet__name',
-        'appointment__pet_id', 'total_amount', 'payment_status',
-        'payment_method', 'payment_date'
-    ]
-}
-
-PET_SEARCH_CONFIG = {
-    'all_fields': [
-        'pet_id',
-        'name',
-        'species',
-        'breed',
-        'date_of_birth',
-        'gender',
-        'weight',
-        'owner__owner_id',
-        'owner__first_name'
-    ],
-    'field_mappings': {
-        'pet_id': 'pet_id',
-        'name': 'name',
-        'species': 'species',
-        'breed': 'breed',
-        'date_of_birth': 'date_of_birth',
-        'gender': 'gender',
-        'weight': 'weight',
-        'owner_id': 'owner__owner_id',
-        'owner_name': 'owner__first_name'
-    },
-    'date_fields': ['date_of_birth'],
-    'select_related': ['owner'],
-    'values_fields': [
-        'pet_id',
-        'name',
-        'species',
-        'breed',
-        'date_of_birth',
-        'gender',
-        'weight',
-        'owner__owner_id',
-        'owner__first_name'
-    ]
-}
-
-OWNER_SEARCH_CONFIG = {
-    'all_fields': [
-        'owner_id',
-        'first_name',
-        'last_name',
-        'pets__name',
-        'address',
-        'phone_number',
-        'email',
-        'registration_date'
-    ],
-    'field_mappings': {
-        'owner_id': 'owner_id',
-        'first_name': 'first_name',
-        'last_name': 'last_name',
-        'pet_name': 'pets__name',
-        'address': 'address',
-        'phone_number': 'phone_number',
-        'email': 'email',
-        'registration_date': 'registration_date'
-    },
-    'date_fields': ['registration_date'],
-    'prefetch_related': ['pets'],
-    'values_fields': [
-        'owner_id',
-        'first_name',
-        'last_name',
-        'address',
-        'phone_number',
-        'email',
-        'registration_date'
-    ]
-}
-
-def handle_search(queryset, search_category: str, search_query: str, search_config: Dict[str, Any]) -> tuple:
-    """Handle the search functionality for the given queryset and search configuration."""
-    if not search_query:
-        return queryset.values(*search_config['values_fields']), search_query, search_category
-
-    # Handle select_related if specified
-    if search_config.get('select_related'):
-        queryset = queryset.select_related(*search_config['select_related'])
-
-    # Build the search query
-    if search_category == 'all_categories':
-        q_objects = Q()
-        for field in search_config['all_fields']:
-            if field in search_config.get('date_fields', []):
-                try:
-                    date_query = parse_date(search_query)
-                    if date_query:
-                        q_objects |= Q(**{field: date_query})
-                except ValueError:
-                    continue
-            else:
-                q_objects |= Q(**{f"{field}__icontains": search_query})
-        queryset = queryset.filter(q_objects)
-    else:
-        # Get the actual field name from the mapping
-        field_name = search_config['field_mappings'].get(search_category)
-        if field_name:
-            if field_name in search_config.get('date_fields', []):
-                try:
-                    date_query = parse_date(search_query)
-                    if date_query:
-                        queryset = queryset.filter(**{field_name: date_query})
-                except ValueError:
-                    pass
-            else:
-                queryset = queryset.filter(**{f"{field_name}__icontains": search_query})
-
-    return queryset.values(*search_config['values_fields']), search_query, search_category
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+
+from paw_n_care import services
+from paw_n_care.autocomplete import AUTOCOMPLETE_SOURCES, autocomplete
+from paw_n_care.models import (
+    Appointment, Owner, Pet, Species, Veterinarian, MedicalRecord, Billing, User,
+    AppointmentStatus, Gender, PaymentMethod, PaymentStatus, StaleEdit, choice_value,
+)
+from paw_n_care.cache import cached_search_page
+from paw_n_care.exports import EXPORT_FORMATS, EXPORT_SOURCES, export_queryset, stream_export
+from paw_n_care.imports import IMPORT_COLUMNS, import_appointments
+from paw_n_care.metrics import histograms
+from paw_n_care.routers import read_from_replica
+from paw_n_care.scheduling import MAX_AVAILABILITY_DAYS, free_slots
+from paw_n_care.search import (
+    handle_search, filter_search, APPOINTMENT_SEARCH_CONFIG, MEDICAL_RECORD_SEARCH_CONFIG, BILLING_SEARCH_CONFIG,
+    PET_SEARCH_CONFIG, OWNER_SEARCH_CONFIG,
+)
+from paw_n_care.stats import collect_statistics
+from paw_n_care.transitions import TRANSITIONS, apply_transition, target_statuses
+
+
+def _report_errors(request, error: ValidationError):
+    for field, field_messages in error.message_dict.items():
+        for message in field_messages:
+            messages.error(request, f"{field.replace('_', ' ').capitalize()}: {message}")
+
+
+def _save_edit(request, edit, instance) -> bool:
+    """Apply the POSTed edit form to ``instance`` with the service ``edit``; return whether it was saved."""
+    try:
+        edit(instance, request.POST)
+    except ValidationError as error:
+        _report_errors(request, error)
+        return False
+    except StaleEdit as error:
+        messages.error(request, f"{error} Your changes were not saved; check the current values and edit it again.")
+        return False
+    return True
 
 
 def edit_appointment(request, appointment_id):
+    appointment = get_object_or_404(Appointment.objects.select_related('pet', 'owner'), pk=appointment_id)
     if request.method == 'POST':
-        appointment = Appointment.objects.get(pk=appointment_id)
-        appointment.status = request.POST.get('status')
-        appointment.reason = request.POST.get('reason')
-        appointment.appointment_date = request.POST.get('appointment_date')
-        appointment.appointment_time = request.POST.get('appointment_time')
-        appointment.pet.name = request.POST.get('pet_name')
-        appointment.pet.weight = request.POST.get('weight')
-        appointment.pet.breed = request.POST.get('breed')
-        appointment.pet.date_of_birth = request.POST.get('date_of_birth')
-        appointment.pet.gender = request.POST.get('gender')
-        appointment.pet.species = request.POST.get('species')
-        appointment.owner.first_name = request.POST.get('first_name')
-        appointment.owner.last_name = request.POST.get('last_name')
-        appointment.owner.address = request.POST.get('address')
-        appointment.owner.phone_number = request.POST.get('phone')
-        appointment.owner.email = request.POST.get('email')
-        appointment.save()
-        return redirect('paw_n_care:home')
-    else:
-        appointment = Appointment.objects.get(pk=appointment_id)
-        vets = Veterinarian.objects.all().values('vet_id', 'first_name', 'last_name')
-        return render(request, 'edit/edit_appointment.html', {'appointment': appointment, 'vets': vets})
+        if _save_edit(request, services.edit_appointment, appointment):
+            return redirect('paw_n_care:home')
+        return redirect('paw_n_care:edit_appointment', appointment_id)
+    vets = Veterinarian.objects.all().values('vet_id', 'first_name', 'last_name')
+    return render(request, 'edit/edit_appointment.html', {'appointment': appointment, 'vets': vets})
 
 
 def edit_pet(request, pet_id):
+    pet = get_object_or_404(Pet.objects.select_related('owner', 'species'), pk=pet_id)
     if request.method == 'POST':
-        pet = Pet.objects.get(pk=pet_id)
-        pet.name = request.POST.get('name')
-        pet.species = request.POST.get('species')
-        pet.breed = request.POST.get('breed')
-        pet.date_of_birth = request.POST.get('date_of_birth')
-        pet.gender = request.POST.get('gender')
-        pet.weight = request.POST.get('weight')
-        pet.save()
-        return redirect('paw_n_care:appointments')
-    else:
-        pet = Pet.objects.get(pk=pet_id)
-        return render(request, 'edit/edit_pet.html', {'pet': pet, owner: owner})
+        if _save_edit(request, services.edit_pet, pet):
+            return redirect('paw_n_care:appointments')
+        return redirect('paw_n_care:edit_pet', pet_id)
+    return render(request, 'edit/edit_pet.html', {
+        'pet': pet, 'owner': pet.owner, 'species_list': Species.objects.order_by('name'),
+    })
 
 
 def edit_owner(request, owner_id):
+    owner = get_object_or_404(Owner, pk=owner_id)
     if request.method == 'POST':
-        owner = Owner.objects.get(pk=owner_id)
-        owner.first_name = request.POST.get('first_name')
-        owner.last_name = request.POST.get('last_name')
-        owner.address = request.POST.get('address')
-        owner.phone_number = request.POST.get('phone')
-        owner.email = request.POST.get('email')
-        owner.save()
-        return redirect('paw_n_care:appointments')
-    else:
-        owner = Owner.objects.get(pk=owner_id)
-        return render(request, 'edit/edit_owner.html', {'owner': owner})
+        if _save_edit(request, services.edit_owner, owner):
+            return redirect('paw_n_care:appointments')
+        return redirect('paw_n_care:edit_owner', owner_id)
+    return render(request, 'edit/edit_owner.html', {'owner': owner})
 
 
 def edit_medical_record(request, medical_record_id):
+    medical_record = get_object_or_404(MedicalRecord, pk=medical_record_id)
     if request.method == 'POST':
-        medical_record = MedicalRecord.objects.get(pk=medical_record_id)
-        medical_record.visit_date = request.POST.get('visit_date')
-        medical_record.diagnosis = request.POST.get('diagnosis')
-        medical_record.treatment = request.POST.get('treatment')
-        medical_record.prescribed_medication = request.POST.get('prescribed_medication')
-        medical_record.notes = request.POST.get('notes')
-        medical_record.save()
-        return redirect('paw_n_care:appointments')
-    else:
-        medical_record = MedicalRecord.objects.get(pk=medical_record_id)
-
-        return render(request, 'edit/edit_medical_record.html', {'medical_record': medical_record})
+        if _save_edit(request, services.edit_medical_record, medical_record):
+            return redirect('paw_n_care:appointments')
+        return redirect('paw_n_care:edit_medical_record', medical_record_id)
+    return render(request, 'edit/edit_medical_record.html', {'medical_record': medical_record})
 
 
 def edit_billing(request, billing_id):
+    billing = get_object_or_404(Billing, pk=billing_id)
     if request.method == 'POST':
-        billing = Billing.objects.get(pk=billing_id)
-        billing.total_amount = request.POST.get('total_amount')
-        billing.payment_status = request.POST.get('payment_status')
-        billing.payment_method = request.POST.get('payment_method')
-        billing.payment_date = request.POST.get('payment_date')
-        billing.save()
-        return redirect('paw_n_care:appointments')
+        if _save_edit(request, services.edit_billing, billing):
+            return redirect('paw_n_care:appointments')
+        return redirect('paw_n_care:edit_billing', billing_id)
+    return render(request, 'edit/edit_billing.html', {'billing': billing})
+
+
+# Home lists with a bulk status change: search configuration, list page and row noun
+TRANSITION_SOURCES = {
+    'appointments': (APPOINTMENT_SEARCH_CONFIG, 'paw_n_care:home', 'appointments'),
+    'billing': (BILLING_SEARCH_CONFIG, 'paw_n_care:billing-home', 'bills'),
+}
+
+
+@require_POST
+def transition_view(request, source):
+    """Move the checked rows of a home list, or with ``scope=search`` every row matching its search, to ``status``."""
+    if source not in TRANSITION_SOURCES:
+        raise Http404(f"Unknown transition source: {source}")
+    search_config, list_url, noun = TRANSITION_SOURCES[source]
+    model = search_config['model']
+    search_category = request.POST.get('search-dropdown', 'all_categories')
+    search_query = request.POST.get('search-query', '').strip()
+    back = reverse(list_url)
+    if search_query:
+        back += '?' + urlencode({'search-dropdown': search_category, 'search-query': search_query})
+
+    if request.POST.get('scope') == 'search':
+        if not search_query:
+            # Without a search the whole table would change
+            messages.error(request, f"Search for the {noun} to change first.")
+            return redirect(back)
+        queryset = filter_search(model.objects.all(), search_category, search_query, search_config)
+    else:
+        ids = [pk for pk in request.POST.getlist('ids') if pk.isdigit()]
+        if not ids:
+            messages.error(request, f"Select the {noun} to change.")
+            return redirect(back)
+        queryset = model.objects.filter(pk__in=ids)
+
+    try:
+        result = apply_transition(queryset, request.POST.get('status'))
+    except ValueError as error:
+        messages.error(request, str(error))
+        return redirect(back)
+    label = choice_value(TRANSITIONS[model][1], request.POST.get('status')).label
+    messages.success(request, f"{result.updated} {noun} marked {label}.")
+    if result.skipped:
+        messages.warning(request, f"{result.skipped} {noun} were left unchanged: their status cannot change to {label}.")
+    return redirect(back)
+
+
+def autocomplete_view(request, source):
+    """Return the typeahead suggestions of ``source`` for the ``q`` GET parameter as JSON."""
+    if source not in AUTOCOMPLETE_SOURCES:
+        raise Http404(f"Unknown autocomplete source: {source}")
+    results = autocomplete(source, request.GET.get('q', ''), request.GET.get('limit'))
+    return JsonResponse({'results': results})
+
+
+def _parse_day(value, default):
+    """Return the date of a ``YYYY-MM-DD`` parameter, ``default`` when empty; raise ``ValueError`` when invalid."""
+    if not value:
+        return default
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+def availability_view(request):
+    """Return the free start times of a vet, or of every vet of a specialization, from ``start`` to ``end`` as JSON.
+
+    The days default to today; a bad parameter is answered with status 400.
+    """
+    vet_id, specialization = request.GET.get('vet', '').strip(), request.GET.get('specialization', '').strip()
+    if vet_id.isdigit():
+        vets = Veterinarian.objects.filter(pk=int(vet_id))
+    elif specialization:
+        vets = Veterinarian.objects.filter(specialization__iexact=specialization)
     else:
-        billing = Billing.objects.get(pk=billing_id)
-        return render(request, 'edit/edit_billing.html', {'billing': billing})
+        return JsonResponse({'error': "Choose a vet or a specialization."}, status=400)
+    try:
+        start = _parse_day(request.GET.get('start'), timezone.localdate())
+        end = _parse_day(request.GET.get('end'), start)
+    except ValueError:
+        return JsonResponse({'error': "Dates must be valid YYYY-MM-DD dates."}, status=400)
+    if not 0 <= (end - start).days < MAX_AVAILABILITY_DAYS:
+        return JsonResponse({'error': f"The range must cover 1 to {MAX_AVAILABILITY_DAYS} days."}, status=400)
+
+    vets = list(vets.order_by('last_name', 'first_name', 'vet_id').values('vet_id', 'first_name', 'last_name'))
+    slots = free_slots([vet['vet_id'] for vet in vets], start, end)
+    return JsonResponse({
+        'duration': settings.APPOINTMENT_DURATION_MINUTES,
+        'vets': [{
+            'id': vet['vet_id'],
+            'label': f"Dr.{vet['first_name']} {vet['last_name']}",
+            'days': [{'date': day.isoformat(), 'slots': [f'{moment:%H:%M}' for moment in starts]}
+                     for day, starts in slots[vet['vet_id']].items()],
+        } for vet in vets],
+    })
+
+
+@read_from_replica
+def export_view(request, source):
+    """Stream every row of a home list matching its search as CSV or, with ``format=jsonl``, JSON Lines."""
+    search_config = EXPORT_SOURCES.get(source)
+    export_format = request.GET.get('format', 'csv')
+    if search_config is None or export_format not in EXPORT_FORMATS:
+        raise Http404(f"Unknown export: {source}.{export_format}")
+    queryset = export_queryset(search_config, request.GET.get('search-dropdown', 'all_categories'),
+                               request.GET.get('search-query', '').strip())
+    # The rows are read after the view returns, so the database is chosen now
+    queryset = queryset.using(queryset.db)
+    response = StreamingHttpResponse(stream_export(search_config, queryset, export_format),
+                                     content_type=EXPORT_FORMATS[export_format])
+    filename = f'{source}-{timezone.localdate().isoformat()}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def metrics_view(request):
+    """Return the per-view latency histograms of this worker process as JSON, to local clients only."""
+    if request.META.get('REMOTE_ADDR') not in ('127.0.0.1', '::1', *settings.INTERNAL_IPS):
+        raise Http404
+    return JsonResponse({'views': histograms.snapshot()})
 
 
 class Appointments(TemplateView):
     template_name = 'appointments.html'
 
     def get(self, request, *args, **kwargs):
-        pets = Pet.objects.all().values('pet_id', 'name', 'species', 'owner__first_name', 'owner__last_name')
-        vets = Veterinarian.objects.all().values('vet_id', 'first_name', 'last_name')
-        owners = Owner.objects.all().values('owner_id', 'first_name', 'last_name')
-        return render(request, self.template_name, {'vets': vets, 'pets': pets, 'owners': owners})
+        # Pets, owners and vets are looked up through the autocomplete endpoint
+        return render(request, self.template_name, {'species_list': Species.objects.order_by('name')})
 
     def post(self, request, *args, **kwargs):
         try:
-            data = request.POST
-
-            appointment_date = data.get('appointment_date')
-            appointment_time = data.get('appointment_time')
-            reason = data.get('reason')
-            status = data.get('status')
-            vet_id = data.get('vet')
-
-            pet_id = data.get('existing_pet')
-            if pet_id:
-                self.create_appointment_for_existing_pet(pet_id, vet_id, appointment_date, appointment_time, reason,
-                                                         status)
-            else:
-                self.create_new_pet_and_appointment(data, vet_id, appointment_date, appointment_time, reason, status)
-
-        except Exception as e:
-            # Handle the error as needed
-            print(f"Error saving appointment: {e}")
-
+            appointment = services.book_appointment(request.POST)
+        except ValidationError as error:
+            _report_errors(request, error)
+        else:
+            messages.success(request, f"Appointment {appointment.pk} booked.")
         return redirect('paw_n_care:appointments')
 
-    @staticmethod
-    def create_appointment_for_existing_pet(pet_id, vet_id, appointment_date, appointment_time, reason, status):
-        """Handle appointment creation for an existing pet."""
-        pet = Pet.objects.get(pet_id=pet_id)
-        owner = pet.owner
-        vet = Veterinarian.objects.get(vet_id=vet_id)
-
-        # Create and save the appointment
-        Appointment.objects.create(
-            pet=pet,
-            owner=owner,
-            vet=vet,
-            appointment_date=appointment_date,
-            appointment_time=appointment_time,
-            reason=reason,
-            status=status
-        )
 
-    @staticmethod
-    def create_new_pet_and_appointment(data, vet_id, appointment_date, appointment_time, reason, status):
-        """Handle the creation of a new owner, pet, and their appointment."""
-        owner_id = data.get('existing_owner')
-        if owner_id:
-            owner = Owner.objects.get(owner_id=owner_id)
-        else:
-            owner = Appointments.create_owner(data)
-
-        pet = Appointments.create_pet(data, owner)
-        vet = Veterinarian.objects.get(vet_id=vet_id)
-
-        # Create and save the appointment
-        Appointment.objects.create(
-            pet=pet,
-            owner=owner,
-            vet=vet,
-            appointment_date=appointment_date,
-            appointment_time=appointment_time,
-            reason=reason,
-            status=status
-        )
+class AppointmentImport(TemplateView):
+    template_name = 'appointments-import.html'
+    # Rejected rows listed on the result page; the command reports all of them
+    errors_shown = 100
 
-    @staticmethod
-    def create_owner(data):
-        """Create a new owner."""
-        return Owner.objects.create(
-            first_name=data.get('first_name'),
-            last_name=data.get('last_name'),
-            address=data.get('address'),
-            phone_number=data.get('phone'),
-            email=data.get('email'),
-            registration_date=timezone.now()
-        )
+    def get(self, request, *args, **kwargs):
+        return render(request, self.template_name, {'columns': IMPORT_COLUMNS})
 
-    @staticmethod
-    def create_pet(data, owner):
-        """Create a new pet."""
-        species = data.get('species').lower()
-        if species == 'other':
-            species = data.get('new_species').lower()
-
-        return Pet.objects.create(
-            owner=owner,
-            name=data.get('pet_name'),
-            species=species.lower(),
-            breed=data.get('breed').lower(),
-            date_of_birth=data.get('date_of_birth'),
-            gender=data.get('gender'),
-            weight=data.get('weight')
-        )
+    def post(self, request, *args, **kwargs):
+        context = {'columns': IMPORT_COLUMNS}
+        upload = request.FILES.get('file')
+        if upload is None:
+            context['error'] = "Choose a CSV file to import."
+            return render(request, self.template_name, context, status=400)
+        try:
+            result = import_appointments(codecs.iterdecode(upload, 'utf-8-sig'))
+        except ValueError as error:
+            context['error'] = str(error)
+            return render(request, self.template_name, context, status=400)
+        context.update(result=result, errors=result.errors[:self.errors_shown])
+        return render(request, self.template_name, context)
 
 
 class MedRec(TemplateView):
     template_name = 'medical-records.html'
 
     def get(self, request, *args, **kwargs):
-        appointments = Appointment.objects.all().values('appointment_id', 'pet__name', 'vet__first_name',
-                                                        'vet__last_name')
-
-        context = {
-            'appointments': appointments
-        }
-        return render(request, self.template_name, context)
+        # Appointments are looked up through the autocomplete endpoint
+        return render(request, self.template_name)
 
     def post(self, request, *args, **kwargs):
         try:
@@ -437,18 +288,19 @@ class MedRec(TemplateView):
             pet = appointment.pet
             vet = appointment.vet
 
-            # Create medical record
-            medrec = MedicalRecord.objects.create(
-                pet=pet,
-                vet=vet,
-                appointment=appointment,
-                visit_date=visit_date,
-                diagnosis=diagnosis,
-                treatment=treatment,
-                prescribed_medication=prescribed_medication,
-                notes=notes
-            )
-            medrec.save()
+            # Create medical record, together with the counters it updates
+            with transaction.atomic():
+                medrec = MedicalRecord.objects.create(
+                    pet=pet,
+                    vet=vet,
+                    appointment=appointment,
+                    visit_date=visit_date,
+                    diagnosis=diagnosis,
+                    treatment=treatment,
+                    prescribed_medication=prescribed_medication,
+                    notes=notes
+                )
+                medrec.save()
 
         except Exception as e:
             # Handle the error as needed
@@ -463,22 +315,16 @@ class Bill(TemplateView):
     template_name = 'billing.html'
 
     def get(self, request, *args, **kwargs):
-        # Fetch all appointments for the user to select one for billing
-        appointments = Appointment.objects.all().values('appointment_id', 'pet__name', 'vet__first_name',
-                                                        'vet__last_name')
-
-        context = {
-            'appointments': appointments
-        }
-        return render(request, self.template_name, context)
+        # Appointments are looked up through the autocomplete endpoint
+        return render(request, self.template_name)
 
     def post(self, request, *args, **kwargs):
         try:
             # Extract form data
             appointment_id = request.POST.get('appointment_id')
             total_amount = request.POST.get('total_amount')
-            payment_status = request.POST.get('payment_status')
-            payment_method = request.POST.get('payment_method')
+            payment_status = choice_value(PaymentStatus, request.POST.get('payment_status'))
+            payment_method = choice_value(PaymentMethod, request.POST.get('payment_method'))
             payment_date = request.POST.get('payment_date')
 
             # Fetch the appointment related to the appointment_id
@@ -488,15 +334,16 @@ class Bill(TemplateView):
             pet = appointment.pet
             vet = appointment.vet
 
-            # Create medical record
-            bill = Billing.objects.create(
-                appointment=appointment,
-                total_amount=total_amount,
-                payment_status=payment_status,
-                payment_method=payment_method,
-                payment_date=payment_date
-            )
-            bill.save()
+            # Create the bill, together with the counters it updates
+            with transaction.atomic():
+                bill = Billing.objects.create(
+                    appointment=appointment,
+                    total_amount=total_amount,
+                    payment_status=payment_status,
+                    payment_method=payment_method,
+                    payment_date=payment_date
+                )
+                bill.save()
 
         except Exception as e:
             # Handle the error as needed
@@ -506,6 +353,7 @@ class Bill(TemplateView):
         return redirect('paw_n_care:billing')
 
 
+@method_decorator(read_from_replica, name='get')
 class Statistic(TemplateView):
     template_name = 'statistic.html'
 
@@ -516,171 +364,14 @@ class Statistic(TemplateView):
         # Get the selected veterinarian ID from the request (default to the first vet)
         selected_vet_id = request.GET.get('vet', veterinarians[0]['vet_id'] if veterinarians else None)
 
-        # "Individual statistics for the selected veterinarian"
-        # Get statistics for the selected veterinarian
-        appointments = Appointment.objects.filter(vet_id=selected_vet_id).count()
-        pets_managed = Pet.objects.filter(appointments__vet_id=selected_vet_id).distinct().count()
-        bills_paid = Billing.objects.filter(appointment__vet_id=selected_vet_id).aggregate(
-            total=Sum('total_amount')
-        )['total'] or 0
-
-        # Get total statistics for all veterinarians
-        total_appointments = Appointment.objects.count()
-        total_pets_managed = Pet.objects.distinct().count()
-        total_bills_paid = Billing.objects.aggregate(
-            total=Sum('total_amount')
-        )['total'] or 0
-
-        # Calculate percentage for each statistic
-        appointment_percentage = (appointments / total_appointments * 100) if total_appointments else 0
-        pets_managed_percentage = (pets_managed / total_pets_managed * 100) if total_pets_managed else 0
-        bills_paid_percentage = (bills_paid / total_bills_paid * 100) if total_bills_paid else 0
-
-        # "Clinic-wide statistics"
-        # Calculate average appointments per month
-        current_month = timezone.now().month
-        current_year = timezone.now().year
-        monthly_appointments = Appointment.objects.filter(
-            appointment_date__month=current_month,
-            appointment_date__year=current_year
-        ).count()
-
-        # Calculate unique returning owners in the last 6 months
-        returning_owners = Owner.objects.filter(
-            appointments__status='Completed',  # Only consider appointments with 'Completed' status
-            appointments__appointment_date__gt=timezone.now() - timezone.timedelta(days=180)  # Last 6 months
-        ).annotate(
-            appointment_count=Count('appointments')  # Count the number of appointments per owner
-        ).filter(
-            appointment_count__gt=1  # Filter owners with more than 1 appointment
-        ).count
-
-
-        # Get most frequent species
-        most_frequent_species = Pet.objects.values('species') \
-            .annotate(count=Count('pet_id')) \
-            .order_by('-count')
-
-        if len(most_frequent_species) > 1 and most_frequent_species[0]['count'] == most_frequent_species[1]['count']:
-            most_frequent_species = {'species': 'N/A', 'count': 0}
-        else:
-            most_frequent_species = most_frequent_species.first()
-
-        # Calculate percentage of appointments resulting in medications
-        appointments_with_medications = MedicalRecord.objects.filter(prescribed_medication__isnull=False).count()
-        medication_percentage = (appointments_with_medications / total_appointments * 100) if total_appointments else 0
-
-        # Calculate Pet Average Weight Statistics for Dogs, Cats, and Other
-        dog_avg_weight = Pet.objects.filter(species='Dog').aggregate(avg_weight=Avg('weight'))['avg_weight'] or 0
-        cat_avg_weight = Pet.objects.filter(species='Cat').aggregate(avg_weight=Avg('weight'))['avg_weight'] or 0
-        other_avg_weight = Pet.objects.exclude(species__in=['Dog', 'Cat']).aggregate(avg_weight=Avg('weight'))[
-                               'avg_weight'] or 0
-
-        # "Appointment Statistics"
-        # Top Vet by Completed Appointments
-        completed_appointments = Appointment.objects.filter(status='Completed')
-        top_vets = completed_appointments.values('vet_id') \
-                       .annotate(completed_count=Count('appointment_id')) \
-                       .order_by('-completed_count')[:1]
-
-        top_vet_full_name = ''
-        if top_vets:
-            vet_detail = Veterinarian.objects.get(vet_id=top_vets[0]['vet_id'])
-            top_vet_full_name = vet_detail.full_name
-
-        # Appointment Status Distribution in a year
-        scheduled_count = Appointment.objects.filter(status='Scheduled',
-                                                     appointment_date__gte=timezone.now() - timezone.timedelta(
-                                                         days=365)).count()
-        completed_count = Appointment.objects.filter(status='Completed',
-                                                     appointment_date__gte=timezone.now() - timezone.timedelta(
-                                                         days=365)).count()
-        cancelled_count = Appointment.objects.filter(status='Cancelled',
-                                                    appointment_date__gte=timezone.now() - timezone.timedelta(
-                                                        days=365)).count()
-        # Top 3 Diagnoses
-        top_3_diagnoses = MedicalRecord.objects.values('diagnosis') \
-                              .annotate(count=Count('record_id')) \
-                              .order_by('-count')[:3]
-        # Top 3 Treatments
-        top_3_treatments = MedicalRecord.objects.values('treatment') \
-                               .annotate(count=Count('record_id')) \
-                               .order_by('-count')[:3]
-
-        # "Billing & Payment Analysis"
-        # Average billing amount
-        avg_billing_amount = Billing.objects.aggregate(Avg('total_amount'))['total_amount__avg'] or 0
-
-        # Sum Billing this month
-        sum_billing_this_month = \
-            Billing.objects.filter(payment_date__month=current_month, payment_date__year=current_year).aggregate(
-                total=Sum('total_amount'))['total'] or 0
-
-        # Invoice Status Overview
-        paid_count = Billing.objects.filter(payment_status='Paid').count()
-        pending_count = Billing.objects.filter(payment_status='Pending').count()
-        overdue_count = Billing.objects.filter(payment_status='Overdue').count()
-        total_invoices = Billing.objects.count()
-        # Calculate percentages
-        paid_percentage = (paid_count / total_invoices * 100) if total_invoices else 0
-        pending_percentage = (pending_count / total_invoices * 100) if total_invoices else 0
-        overdue_percentage = (overdue_count / total_invoices * 100) if total_invoices else 0
-
-        # Payment Methods and Status
-        # Calculate the total number of invoices and the count for each payment method
-        total_invoices = Billing.objects.count()
-        credit_card_count = Billing.objects.filter(payment_method='Credit Card').count()
-        cash_count = Billing.objects.filter(payment_method='Cash').count()
-        bank_transfer_count = Billing.objects.filter(payment_method='Bank Transfer').count()
-
-        # Calculate the percentages for each payment method (rounded)
-        credit_card_percentage = (credit_card_count / total_invoices * 100) if total_invoices else 0
-        cash_percentage = (cash_count / total_invoices * 100) if total_invoices else 0
-        bank_transfer_percentage = (bank_transfer_count / total_invoices * 100) if total_invoices else 0
+        # Every widget is collected by the statistics engine in a handful of queries
+        statistics = collect_statistics(selected_vet_id)
 
         # Return the data to the template, including the selected vet ID
         return render(request, self.template_name, {
             'vets': veterinarians,
             'selected_vet_id': selected_vet_id,
-
-            # Individual vet statistics
-            'appointments': appointments,
-            'pets_managed': pets_managed,
-            'bills_paid': bills_paid,
-            'appointment_percentage': round(appointment_percentage),
-            'pets_managed_percentage': round(pets_managed_percentage),
-            'bills_paid_percentage': round(bills_paid_percentage),
-
-            # Clinic-wide statistics
-            'avg_monthly_appointments': monthly_appointments,
-            'returning_owners': returning_owners,
-            'most_frequent_species': most_frequent_species['species'] if most_frequent_species else 'N/A',
-            'medication_percentage': round(medication_percentage),
-
-            # Pet Average Weight Statistics
-            'dog_avg_weight': dog_avg_weight,
-            'cat_avg_weight': cat_avg_weight,
-            'other_avg_weight': other_avg_weight,
-
-            # Appointment Statistics
-            'top_vets': top_vet_full_name,
-            'scheduled_count': scheduled_count,
-            'completed_count': completed_count,
-            'cancelled_count': cancelled_count,
-            'top_3_diagnoses': top_3_diagnoses,
-            'top_3_treatments': top_3_treatments,
-
-            # Billing & Payment Analysis
-            'avg_billing_amount': avg_billing_amount,
-            'sum_billing_this_month': sum_billing_this_month,
-            'paid_percentage': round(paid_percentage),
-            'pending_percentage': round(pending_percentage),
-            'overdue_percentage': round(overdue_percentage),
-            'total_invoices': total_invoices,
-            # Invoice Status Overview
-            'credit_card_percentage': round(credit_card_percentage),
-            'cash_percentage': round(cash_percentage),
-            'bank_transfer_percentage': round(bank_transfer_percentage),
+            **statistics.as_context(),
         })
 
 
@@ -710,120 +401,145 @@ class Logout(TemplateView):
         return redirect('paw_n_care:login')
 
 
+@method_decorator(read_from_replica, name='get')
 class Home(TemplateView):
     """View for the home page."""
     template_name = 'home/home.html'
 
     def get(self, request, *args, **kwargs):
         search_category = request.GET.get('search-dropdown', 'all_categories')
-        search_query = request.GET.get('search-query', '')
+        search_query = request.GET.get('search-query', '').strip()
 
-        appointments = Appointment.objects.all()
-        appointments, search_query, search_category = handle_search(
-            appointments, search_category, search_query, APPOINTMENT_SEARCH_CONFIG
+        # Repeated searches are answered from the cache until a searched table changes
+        page = cached_search_page(
+            request, APPOINTMENT_SEARCH_CONFIG, search_category, search_query,
+            lambda: handle_search(Appointment.objects.all(), search_category, search_query, APPOINTMENT_SEARCH_CONFIG)[0]
         )
 
         context = {
-            'appointments': appointments,
+            'appointments': page.rows,
+            'page': page,
             'search_query': search_query,
-            'search_category': search_category
+            'search_category': search_category,
+            'transition_statuses': target_statuses(Appointment),
         }
         return render(request, self.template_name, context)
 
 
+@method_decorator(read_from_replica, name='get')
 class MedRecHome(TemplateView):
     """View for the medical record home page."""
     template_name = 'home/medical-record-home.html'
 
     def get(self, request, *args, **kwargs):
         search_category = request.GET.get('search-dropdown', 'all_categories')
-        search_query = request.GET.get('search-query', '')
+        search_query = request.GET.get('search-query', '').strip()
 
-        medical_records = MedicalRecord.objects.all()
-        medical_records, search_query, search_category = handle_search(
-            medical_records, search_category, search_query, MEDICAL_RECORD_SEARCH_CONFIG
+        # Repeated searches are answered from the cache until a searched table changes
+        page = cached_search_page(
+            request, MEDICAL_RECORD_SEARCH_CONFIG, search_category, search_query,
+            lambda: handle_search(MedicalRecord.objects.all(), search_category, search_query, MEDICAL_RECORD_SEARCH_CONFIG)[0]
         )
 
         context = {
-            'medical_records': medical_records,
+            'medical_records': page.rows,
+            'page': page,
             'search_query': search_query,
             'search_category': search_category
         }
         return render(request, self.template_name, context)
 
 
+@method_decorator(read_from_replica, name='get')
 class BillingHome(TemplateView):
     """View for the billing home page."""
     template_name = 'home/billing-home.html'
 
     def get(self, request, *args, **kwargs):
         search_category = request.GET.get('search-dropdown', 'all_categories')
-        search_query = request.GET.get('search-query', '')
+        search_query = request.GET.get('search-query', '').strip()
 
-        bills = Billing.objects.all()
-        bills, search_query, search_category = handle_search(
-            bills, search_category, search_query, BILLING_SEARCH_CONFIG
+        # Repeated searches are answered from the cache until a searched table changes
+        page = cached_search_page(
+            request, BILLING_SEARCH_CONFIG, search_category, search_query,
+            lambda: handle_search(Billing.objects.all(), search_category, search_query, BILLING_SEARCH_CONFIG)[0]
         )
 
         context = {
-            'bills': bills,
+            'bills': page.rows,
+            'page': page,
             'search_query': search_query,
-            'search_category': search_category
+            'search_category': search_category,
+            'transition_statuses': target_statuses(Billing),
         }
         return render(request, self.template_name, context)
 
 
+@method_decorator(read_from_replica, name='get')
 class PetHome(TemplateView):
     """View for the pet home page."""
     template_name = 'home/pet-home.html'
 
     def get(self, request, *args, **kwargs):
         search_category = request.GET.get('search-dropdown', 'all_categories')
-        search_query = request.GET.get('search-query', '')
+        search_query = request.GET.get('search-query', '').strip()
 
-        pets = Pet.objects.all()
-        pets, search_query, search_category = handle_search(
-            pets, search_category, search_query, PET_SEARCH_CONFIG
+        # Repeated searches are answered from the cache until a searched table changes
+        page = cached_search_page(
+            request, PET_SEARCH_CONFIG, search_category, search_query,
+            lambda: handle_search(Pet.objects.all(), search_category, search_query, PET_SEARCH_CONFIG)[0]
         )
 
         context = {
-            'pets': pets,
+            'pets': page.rows,
+            'page': page,
             'search_query': search_query,
             'search_category': search_category
         }
         return render(request, self.template_name, context)
 
 
+@method_decorator(read_from_replica, name='get')
 class OwnerHome(TemplateView):
     """View for the owner home page."""
     template_name = 'home/owner-home.html'
 
     def get(self, request, *args, **kwargs):
         search_category = request.GET.get('search-dropdown', 'all_categories')
-        search_query = request.GET.get('search-query', '')
-
-        base_queryset = Owner.objects.prefetch_related('pets')
+        search_query = request.GET.get('search-query', '').strip()
 
-        if search_category in ['pet_name', 'all_categories'] and search_query:
-            try:
-                pet_id = int(search_query)
-                owners = base_queryset.filter(pets__pet_id=pet_id)
-            except ValueError:
-                owners = base_queryset.filter(pets__name__icontains=search_query)
-        else:
-            filtered_values, search_query, search_category = handle_search(
-                base_queryset, search_category, search_query, OWNER_SEARCH_CONFIG
-            )
-            owner_ids = [owner['owner_id'] for owner in filtered_values]
-            owners = base_queryset.filter(owner_id__in=owner_ids)
+        # Repeated searches are answered from the cache until a searched table changes
+        page = cached_search_page(
+            request, OWNER_SEARCH_CONFIG, search_category, search_query,
+            lambda: self.get_owners(search_category, search_query)
+        )
 
         context = {
-            'owners': owners.distinct(),
+            'owners': page.rows,
+            'page': page,
             'search_query': search_query,
             'search_category': search_category
         }
         return render(request, self.template_name, context)
 
+    @staticmethod
+    def get_owners(search_category, search_query):
+        """Return the matching owners with their pet count and pets."""
+        # Matching owners are selected with a subquery so the pet joins used by the
+        # search do not duplicate owners or inflate the pet count
+        matching = filter_search(Owner.objects.all(), search_category, search_query, OWNER_SEARCH_CONFIG)
+        condition = Q(owner_id__in=matching.values('owner_id'))
+        if search_category in ['pet', 'pet_name', 'all_categories'] and search_query.isdigit():
+            # A number may also be the ID of one of the owner's pets
+            condition |= Q(owner_id__in=Pet.objects.filter(pet_id=int(search_query)).values('owner_id'))
+
+        return Owner.objects.filter(condition).annotate(
+            pet_count=Count('pets')
+        ).prefetch_related(
+            Prefetch('pets', queryset=Pet.objects.only('pet_id', 'name', 'owner_id').order_by('pet_id'),
+                     to_attr='pet_list')
+        )
+
 
 def redirect_to_login(request):
     # Redirect to the login page
@@ -836,7 +552,7 @@ def update_appointment(request, appointment_id):
 
     if request.method == 'POST':
         # Update the appointment fields with POST data
-        appointment.status = request.POST.get('status')
+        appointment.status = choice_value(AppointmentStatus, request.POST.get('status'))
         appointment.reason = request.POST.get('reason')
         appointment.appointment_date = request.POST.get('appointment_date')
         appointment.appointment_time = request.POST.get('appointment_time')
@@ -868,10 +584,10 @@ def update_pet(request, pet_id):
     if request.method == 'POST':
         # Update the pet fields with POST data
         pet.name = request.POST.get('name')
-        pet.species = request.POST.get('species')
+        pet.species = Species.get_for_name(request.POST.get('species'))
         pet.breed = request.POST.get('breed')
         pet.date_of_birth = request.POST.get('date_of_birth')
-        pet.gender = request.POST.get('gender')
+        pet.gender = choice_value(Gender, request.POST.get('gender'))
         pet.weight = request.POST.get('weight')
 
         # Update the owner if provided
@@ -950,8 +666,8 @@ def update_billing(request, billing_id):
     if request.method == 'POST':
         # Update the billing fields with POST data
         billing.total_amount = request.POST.get('total_amount')
-        billing.payment_status = request.POST.get('payment_status')
-        billing.payment_method = request.POST.get('payment_method')
+        billing.payment_status = choice_value(PaymentStatus, request.POST.get('payment_status'))
+        billing.payment_method = choice_value(PaymentMethod, request.POST.get('payment_method'))
         billing.payment_date = request.POST.get('payment_date')
 
         # Save the updated billing
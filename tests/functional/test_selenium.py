@@ -23,7 +23,7 @@ import time
 import datetime
 
 from paw_n_care.models import Owner, Pet, Veterinarian, Appointment, \
-    MedicalRecord, Billing, User
+    MedicalRecord, Billing, User, Species, AppointmentStatus, Gender
 
 
 @override_settings(DEBUG=True)
@@ -74,11 +74,11 @@ class PawNCareSeleniumTests(StaticLiveServerTestCase):
         self.pet = Pet.objects.create(
             owner=self.owner,
             name='Buddy',
-            species='dog',
+            species=Species.get_for_name('dog'),
             breed='labrador',
             date_of_birth=timezone.now().date() - datetime.timedelta(
                 days=365 * 2),  # 2 years old
-            gender='Male',
+            gender=Gender.MALE,
             weight=25.5
         )
 
@@ -91,7 +91,7 @@ class PawNCareSeleniumTests(StaticLiveServerTestCase):
                 days=7),
             appointment_time=timezone.now().time(),
             reason='Annual checkup',
-            status='Scheduled'
+            status=AppointmentStatus.SCHEDULED
         )
 
     def wait_for_element(self, by, value, timeout=10):
@@ -650,7 +650,7 @@ class PawNCareSeleniumTests(StaticLiveServerTestCase):
             # Verify in database
             updated_appointment = Appointment.objects.get(
                 appointment_id=appointment_id.replace('#', ''))
-            self.assertEqual(updated_appointment.status, 'Completed')
+            self.assertEqual(updated_appointment.status, AppointmentStatus.COMPLETED)
 
         except TimeoutException as e:
             self.fail(